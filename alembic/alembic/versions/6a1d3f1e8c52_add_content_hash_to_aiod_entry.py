@@ -0,0 +1,27 @@
+"""Add content hash to aiod entry
+
+Revision ID: 6a1d3f1e8c52
+Revises: 0a23b40cc09c
+Create Date: 2026-10-18 10:12:41.381226
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import Column, String
+
+from database.model.field_length import SHORT
+
+# revision identifiers, used by Alembic.
+revision: str = "6a1d3f1e8c52"
+down_revision: Union[str, None] = "0a23b40cc09c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("aiod_entry", Column("content_hash", String(SHORT), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("aiod_entry", "content_hash")
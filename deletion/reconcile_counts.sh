@@ -0,0 +1,16 @@
+#!/bin/bash
+
+WORK_DIR=/opt/deletion/data/
+
+another_instance()
+{
+    echo $(date -u) "This script is already running in a different thread."
+    exit 1
+}
+exec 9< "$0"
+flock -n -x 9 || another_instance
+
+echo $(date -u) "Starting reconciliation of the resource counts..."
+PYTHONPATH=/app /usr/local/bin/python3 /app/database/counts/reconcile.py \
+      > ${WORK_DIR}/reconcile_counts.log 2>&1
+echo $(date -u) "Reconciliation Done."
@@ -16,16 +16,34 @@ But then the frontend needs to make sure that the permissions are up-to-date. Ev
 should therefore request a new token every X minutes. This is not needed when the back-end
 performs a separate authorization request. The only downside is the overhead of the additional
 keycloak requests - if that becomes prohibitive in the future, we should reevaluate this design.
+
+To limit this overhead, the results of the authorization requests are cached for a short time
+(see TokenCache), so that clients reusing a token for many requests do not perform a keycloak
+request for each of them.
+
+Alternatively, token_verification = "offline" can be configured in config.toml. The backend then
+verifies the signature of the token locally, using the public keys of the realm (see
+JWKSVerifier), and takes the roles from the token. No keycloak requests are performed, except
+for (re)fetching the public keys. The downside is the one described above: the permissions are
+only as up-to-date as the token. Only access tokens of the realm are accepted (not, for instance,
+its ID or refresh tokens), and only if they are issued for this backend: keycloak should add the
+token_audience to the access tokens (using an "Audience" mapper).
 """
 
+import hashlib
 import logging
 import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable
 
 from dotenv import load_dotenv
 from fastapi import HTTPException, Security, status
 from fastapi.security import OpenIdConnect
+from jose import JWTError, jwt
 from keycloak import KeycloakOpenID
 from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 
 from config import KEYCLOAK_CONFIG
 
@@ -56,6 +74,137 @@ class User(BaseModel):
         return bool(set(roles) & self.roles)
 
 
+class TokenCache:
+    """
+    A bounded LRU cache of the users obtained by token introspection, keyed on a hash of the token.
+
+    Entries expire after the ttl (in seconds), or earlier if the token itself expires. Invalid
+    tokens are cached as well (as None), using a separate, typically shorter, ttl. A change of the
+    permissions of a user will therefore take up to ttl seconds to become effective.
+    """
+
+    def __init__(self, max_size: int, ttl: float, negative_ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, User | None]] = OrderedDict()
+
+    def get(self, token: str) -> User | None:
+        """Return the cached user, or None for a cached invalid token. Raises KeyError on a miss"""
+        key = _hash(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            self._entries.pop(key, None)
+            self.misses += 1
+            raise KeyError("Token not in cache")
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, token: str, user: User | None, expires_at: float | None = None):
+        ttl = self.ttl if user is not None else self.negative_ttl
+        expiry = time.time() + ttl
+        if expires_at is not None:
+            expiry = min(expiry, expires_at)
+        key = _hash(token)
+        self._entries[key] = (expiry, user)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+token_cache = TokenCache(
+    max_size=KEYCLOAK_CONFIG.get("token_cache_size", 10_000),
+    ttl=KEYCLOAK_CONFIG.get("token_cache_ttl_seconds", 60),
+    negative_ttl=KEYCLOAK_CONFIG.get("token_cache_negative_ttl_seconds", 10),
+)
+
+
+class JWKSVerifier:
+    """
+    Verifies access tokens locally, using the JSON Web Key Set (JWKS) of the realm: the signature,
+    the expiry, the issuer, the audience, and the type of the token.
+
+    The keys are fetched once and cached. If a token is signed with an unknown key (e.g. because
+    keycloak rotated its keys), the keys are fetched again, at most once per
+    min_seconds_between_fetches. Fetching the keys is a blocking request, performed by
+    refresh_keys, so that it can be run in a separate thread.
+    """
+
+    def __init__(
+        self,
+        fetch_keys: Callable[[], dict],
+        issuer: str,
+        audience: str,
+        min_seconds_between_fetches: float = 10,
+    ):
+        self.fetch_keys = fetch_keys
+        self.issuer = issuer
+        self.audience = audience
+        self.min_seconds_between_fetches = min_seconds_between_fetches
+        self._keys: dict[str, dict] = {}
+        self._last_fetch: float | None = None
+
+    def knows_key(self, token: str) -> bool:
+        """Whether the key the token is signed with is known, without fetching the keys."""
+        return jwt.get_unverified_header(token).get("kid") in self._keys
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """The claims of the access token. Raises a JWTError if the token is not valid."""
+        key_id = jwt.get_unverified_header(token).get("kid")
+        if key_id not in self._keys:
+            raise JWTError(f"Unknown key id {key_id}")
+        key = self._keys[key_id]
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[key.get("alg", "RS256")],
+            audience=self.audience,
+            issuer=self.issuer,
+        )
+        if claims.get("typ") != "Bearer":
+            raise JWTError(f"Not an access token, but of type {claims.get('typ')}")
+        return claims
+
+    def refresh_keys(self):
+        """Fetch the keys again, unless they were fetched less than a short time ago."""
+        now = time.time()
+        if (
+            self._last_fetch is not None
+            and now - self._last_fetch < self.min_seconds_between_fetches
+        ):
+            return
+        self._last_fetch = now
+        self._keys = {key["kid"]: key for key in self.fetch_keys()["keys"] if "kid" in key}
+
+    def clear(self):
+        self._keys = {}
+        self._last_fetch = None
+
+
+jwks_verifier = JWKSVerifier(
+    fetch_keys=lambda: keycloak_openid.certs(),
+    issuer=KEYCLOAK_CONFIG.get(
+        "token_issuer",
+        KEYCLOAK_CONFIG.get("openid_connect_url", "").removesuffix(
+            "/.well-known/openid-configuration"
+        ),
+    ),
+    audience=KEYCLOAK_CONFIG.get("token_audience", KEYCLOAK_CONFIG.get("client_id")),
+)
+
+
 async def _get_user(token) -> User:
     """
     Check the roles of the user for authorization.
@@ -66,7 +215,8 @@ async def _get_user(token) -> User:
         (we don't want to leak information), and status 500 on any request
         if Keycloak is configured incorrectly.
     """
-    if not client_secret:
+    offline = KEYCLOAK_CONFIG.get("token_verification") == "offline"
+    if not client_secret and not offline:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="This instance is not configured correctly. You'll need to set the env var "
@@ -77,16 +227,11 @@ async def _get_user(token) -> User:
         raise NoTokenError("No token found")
     try:
         token = token.replace("Bearer ", "")
-        # query the authorization server to determine the active state of this token and to
-        # determine meta-information.
-        userinfo = keycloak_openid.introspect(token)
-
-        if not userinfo.get("active", False):
+        user = await _verify_offline(token) if offline else await _introspect(token)
+        if user is None:
             logging.error("Invalid userinfo or inactive user.")
             raise InvalidUserError("Invalid userinfo or inactive user")  # caught below
-        return User(
-            name=userinfo["username"], roles=set(userinfo.get("realm_access", {}).get("roles", []))
-        )
+        return user
     except InvalidUserError:
         raise
     except Exception as e:
@@ -98,6 +243,40 @@ async def _get_user(token) -> User:
         )
 
 
+async def _introspect(token: str) -> User | None:
+    """The user of this token, using (cached) introspection, or None if the token is inactive."""
+    try:
+        return token_cache.get(token)
+    except KeyError:
+        # query the authorization server to determine the active state of this token and to
+        # determine meta-information. This is a blocking call, so run it in a separate thread.
+        userinfo = await run_in_threadpool(keycloak_openid.introspect, token)
+        user = None
+        if userinfo.get("active", False):
+            user = User(
+                name=userinfo["username"],
+                roles=set(userinfo.get("realm_access", {}).get("roles", [])),
+            )
+        token_cache.put(token, user, expires_at=userinfo.get("exp"))
+        return user
+
+
+async def _verify_offline(token: str) -> User | None:
+    """The user of this token, based on its claims, or None if the token is invalid or expired."""
+    try:
+        if not jwks_verifier.knows_key(token):
+            # A blocking request to keycloak, so run it in a separate thread.
+            await run_in_threadpool(jwks_verifier.refresh_keys)
+        claims = jwks_verifier.decode(token)
+    except JWTError as e:
+        logging.error(f"Invalid access token: '{e}'")
+        return None
+    return User(
+        name=claims["preferred_username"],
+        roles=set(claims.get("realm_access", {}).get("roles", [])),
+    )
+
+
 async def get_user_or_none(token=Security(oidc)) -> User | None:
     """
     Use this function in Depends() to ask for authentication.
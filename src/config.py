@@ -6,3 +6,6 @@ with open(pathlib.Path(__file__).parent / "config.toml", "rb") as fh:
 
 DB_CONFIG = CONFIG.get("database", {})
 KEYCLOAK_CONFIG = CONFIG.get("keycloak", {})
+SEARCH_INDEX_CONFIG = CONFIG.get("search_index", {})
+RESOURCE_DOCUMENTS_CONFIG = CONFIG.get("resource_documents", {})
+RESPONSES_CONFIG = CONFIG.get("responses", {})
@@ -0,0 +1,147 @@
+"""
+The HTTP client shared by all connectors.
+
+All requests of a run go through a single pooled requests.Session, so that connections to a
+platform are kept alive and reused instead of opening a new TCP+TLS connection per call. Requests
+that fail with a 429 or 5xx status (or a connection error) are retried with an exponential
+backoff, honoring the Retry-After header if the platform sends it. Per-host rate limits make sure
+we stay within the limits of each platform, also when fetching concurrently.
+"""
+
+import collections
+import dataclasses
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class RateLimit:
+    """Allow at most `calls` calls per `period` seconds, sleeping until a call is allowed."""
+
+    def __init__(self, calls: int, period: float):
+        self.calls = calls
+        self.period = period
+        self._timestamps: collections.deque[float] = collections.deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._timestamps and self._timestamps[0] <= now - self.period:
+                    self._timestamps.popleft()
+                if len(self._timestamps) < self.calls:
+                    self._timestamps.append(now)
+                    return
+                time.sleep(self._timestamps[0] + self.period - now)
+
+
+@dataclasses.dataclass
+class HostStatistics:
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.requests if self.requests else 0.0
+
+
+class HttpClient:
+    def __init__(
+        self,
+        max_retries: int = 5,
+        backoff_factor: float = 1.0,
+        max_backoff: float = 120.0,
+        pool_maxsize: int = 16,
+        timeout: float = 60.0,
+    ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.rate_limits: dict[str, list[RateLimit]] = {}
+        self.statistics: dict[str, HostStatistics] = collections.defaultdict(HostStatistics)
+        self._statistics_lock = threading.Lock()
+
+    def add_rate_limit(self, host: str, calls: int, period: float):
+        self.rate_limits.setdefault(host, []).append(RateLimit(calls=calls, period=period))
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Perform a GET request, retrying on a 429 or 5xx status and on connection errors. After the
+        last retry, the response is returned as is (or the connection error raised).
+        """
+        host = urlparse(url).hostname or ""
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            for rate_limit in self.rate_limits.get(host, []):
+                rate_limit.acquire()
+            start = time.monotonic()
+            response = None
+            try:
+                response = self.session.get(url, **kwargs)
+            except requests.ConnectionError:
+                self._record(host, start, attempt, failed=True)
+                if attempt == self.max_retries:
+                    raise
+            else:
+                failed = response.status_code in RETRY_STATUS_CODES
+                self._record(host, start, attempt, failed=failed)
+                if not failed or attempt == self.max_retries:
+                    return response
+            delay = self._delay(response, attempt)
+            reason = "connection error" if response is None else f"status {response.status_code}"
+            logging.warning(f"Request to {url} failed ({reason}), retrying in {delay:.1f}s.")
+            time.sleep(delay)
+            attempt += 1
+
+    def _delay(self, response: requests.Response | None, attempt: int) -> float:
+        """The number of seconds to wait before the next attempt."""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after is not None:
+            try:
+                return min(max(float(retry_after), 0), self.max_backoff)
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+                    return min(max(delay, 0), self.max_backoff)
+                except (TypeError, ValueError):
+                    pass
+        return min(self.backoff_factor * 2**attempt, self.max_backoff)
+
+    def _record(self, host: str, start: float, attempt: int, failed: bool):
+        seconds = time.monotonic() - start
+        with self._statistics_lock:
+            statistics = self.statistics[host]
+            statistics.requests += 1
+            statistics.retries += attempt > 0
+            statistics.failures += failed
+            statistics.total_seconds += seconds
+            statistics.max_seconds = max(statistics.max_seconds, seconds)
+
+    def log_statistics(self):
+        for host, s in sorted(self.statistics.items()):
+            logging.info(
+                f"HTTP {host}: {s.requests} requests ({s.retries} retries, {s.failures} failed), "
+                f"mean latency {s.mean_seconds:.3f}s, max latency {s.max_seconds:.3f}s"
+            )
+
+
+http_client = HttpClient()
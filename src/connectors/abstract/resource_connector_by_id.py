@@ -1,19 +1,27 @@
 import abc
+import collections
 import logging
-from typing import Generic, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Generic, Iterable, Iterator, TypeVar
 from requests.exceptions import HTTPError
 
 from connectors.abstract.resource_connector import ResourceConnector, RESOURCE
 from connectors.record_error import RecordError
 from connectors.resource_with_relations import ResourceWithRelations
 
+T = TypeVar("T")
+
 
 class ResourceConnectorById(ResourceConnector, Generic[RESOURCE]):
     """Connectors that synchronize by filtering the results on identifier. In every subsequent run,
-    only identifiers higher than the highest identifier of the previous run are fetched."""
+    only identifiers higher than the highest identifier of the previous run are fetched.
+
+    Using `workers` > 1, the records of a page can be fetched concurrently (see map_concurrently).
+    The results are still yielded in the order of the page, so the state remains monotonic."""
 
-    def __init__(self, limit_per_iteration: int = 500):
+    def __init__(self, limit_per_iteration: int = 500, workers: int = 1):
         self.limit_per_iteration = limit_per_iteration
+        self.workers = workers
 
     @abc.abstractmethod
     def retry(self, identifier: int) -> RESOURCE | ResourceWithRelations[RESOURCE] | RecordError:
@@ -25,6 +33,28 @@ class ResourceConnectorById(ResourceConnector, Generic[RESOURCE]):
     ) -> Iterator[RESOURCE | ResourceWithRelations[RESOURCE] | RecordError]:
         """Retrieve information of resources"""
 
+    def map_concurrently(self, function: Callable[..., T], arguments: Iterable) -> Iterator[T]:
+        """
+        Apply the function on all arguments using a pool of `self.workers` threads, yielding the
+        results in the order of the arguments. At most 2 * workers results are computed ahead of
+        the consumer, so that a slow consumer (such as the database) doesn't cause an unbounded
+        number of records in memory.
+        """
+        if self.workers <= 1:
+            yield from map(function, arguments)
+            return
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures: collections.deque = collections.deque()
+            for argument in arguments:
+                futures.append(executor.submit(function, argument))
+                if len(futures) >= 2 * self.workers:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
     def run(
         self, state: dict, from_identifier: int | None = None, limit: int | None = None, **kwargs
     ) -> Iterator[RESOURCE | ResourceWithRelations[RESOURCE] | RecordError]:
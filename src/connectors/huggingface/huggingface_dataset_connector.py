@@ -3,10 +3,10 @@ import math
 import typing
 
 import bibtexparser
-import requests
 from huggingface_hub import list_datasets
 from huggingface_hub.hf_api import DatasetInfo
 
+from connectors.abstract.http_client import http_client
 from connectors.abstract.resource_connector_on_start_up import ResourceConnectorOnStartUp
 from connectors.record_error import RecordError
 from connectors.resource_with_relations import ResourceWithRelations
@@ -37,7 +37,7 @@ class HuggingFaceDatasetConnector(ResourceConnectorOnStartUp[Dataset]):
 
     @staticmethod
     def _get(url: str, dataset_id: str) -> typing.List[typing.Dict[str, typing.Any]]:
-        response = requests.get(url, params={"dataset": dataset_id})
+        response = http_client.get(url, params={"dataset": dataset_id})
         response_json = response.json()
         if not response.ok:
             msg = response_json["error"]
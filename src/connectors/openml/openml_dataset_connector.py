@@ -5,12 +5,12 @@ and how to convert the OpenML response to some agreed AIoD format.
 
 import dateutil.parser
 import logging
-import requests
 
 from requests.exceptions import HTTPError
 from sqlmodel import SQLModel
 from typing import Iterator
 
+from connectors.abstract.http_client import http_client
 from connectors.abstract.resource_connector_by_id import ResourceConnectorById
 from connectors.record_error import RecordError
 from database.model import field_length
@@ -40,7 +40,7 @@ class OpenMlDatasetConnector(ResourceConnectorById[Dataset]):
 
     def retry(self, identifier: int) -> SQLModel | RecordError:
         url_qual = f"https://www.openml.org/api/v1/json/data/qualities/{identifier}"
-        response = requests.get(url_qual)
+        response = http_client.get(url_qual)
         if not response.ok:
             msg = response.json()["error"]["message"]
             return RecordError(
@@ -54,7 +54,7 @@ class OpenMlDatasetConnector(ResourceConnectorById[Dataset]):
         self, identifier: int, qualities: list[dict[str, str]]
     ) -> SQLModel | RecordError:
         url_data = f"https://www.openml.org/api/v1/json/data/{identifier}"
-        response = requests.get(url_data)
+        response = http_client.get(url_data)
         if not response.ok:
             msg = response.json()["error"]["message"]
             return RecordError(
@@ -105,7 +105,7 @@ class OpenMlDatasetConnector(ResourceConnectorById[Dataset]):
             "https://www.openml.org/api/v1/json/data/list/"
             f"limit/{self.limit_per_iteration}/offset/{offset}"
         )
-        response = requests.get(url_data)
+        response = http_client.get(url_data)
         if not response.ok:
             status_code = response.status_code
             msg = response.json()["error"]["message"]
@@ -121,17 +121,20 @@ class OpenMlDatasetConnector(ResourceConnectorById[Dataset]):
             yield RecordError(identifier=None, error=e)
             return
 
-        for summary in dataset_summaries:
-            identifier = None
-            try:
-                identifier = summary["did"]
-                if identifier < from_identifier:
-                    yield RecordError(identifier=identifier, error="Id too low", ignore=True)
-                if from_identifier is None or identifier >= from_identifier:
-                    qualities = summary["quality"]
-                    yield self.fetch_record(identifier, qualities)
-            except Exception as e:
-                yield RecordError(identifier=identifier, error=e)
+        yield from self.map_concurrently(
+            lambda summary: self._fetch_summary(summary, from_identifier), dataset_summaries
+        )
+
+    def _fetch_summary(self, summary: dict, from_identifier: int) -> SQLModel | RecordError:
+        identifier = None
+        try:
+            identifier = summary["did"]
+            if identifier < from_identifier:
+                return RecordError(identifier=identifier, error="Id too low", ignore=True)
+            qualities = summary["quality"]
+            return self.fetch_record(identifier, qualities)
+        except Exception as e:
+            return RecordError(identifier=identifier, error=e)
 
 
 def _as_int(v: str) -> int:
@@ -1,17 +1,23 @@
 import argparse
+import hashlib
 import importlib
+import itertools
 import json
 import logging
 import pathlib
 import sys
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
-from sqlmodel import select, Session
+from sqlalchemy import tuple_
+from sqlmodel import select, Session, SQLModel
 
+from connectors.abstract.http_client import http_client
 from connectors.abstract.resource_connector import ResourceConnector, RESOURCE
+from connectors.abstract.resource_connector_by_id import ResourceConnectorById
 from connectors.record_error import RecordError
 from connectors.resource_with_relations import ResourceWithRelations
+from database.model.concept.aiod_entry import AIoDEntryORM
 from database.model.concept.concept import AIoDConcept
 from database.session import DbSession
 from database.setup import _create_or_fetch_related_objects, _get_existing_resource
@@ -75,6 +81,20 @@ def _parse_args() -> argparse.Namespace:
         help="Save the state file every N records. In case the complete program is killed, "
         "you can then resume the next run from the last saved state.",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Save the resources in batches of N records: the existing resources of a batch are "
+        "retrieved using a single query, and all new resources of a batch are inserted in a "
+        "single transaction. If the transaction fails, the resources of that batch are saved "
+        "one by one, so that the errors are recorded per resource.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Only for identifier-based connectors: the number of records that are fetched "
+        "concurrently. The records are still saved in order of their identifier.",
+    )
     return parser.parse_args()
 
 
@@ -99,9 +119,10 @@ def save_to_database(
         existing = _get_existing_resource(
             session, resource_create_instance, connector.resource_class
         )
-        # TODO: if not None, update (https://github.com/aiondemand/AIOD-rest-api/issues/131)
         if existing is None:
-            router.create_resource(session, resource_create_instance)
+            _create(session, router, resource_create_instance)
+        elif isinstance(existing, AIoDConcept) and existing.date_deleted is None:
+            _update(session, router, existing, resource_create_instance)
 
     except Exception as e:
         session.rollback()
@@ -117,6 +138,127 @@ def save_to_database(
     return None
 
 
+def content_hash(resource_create_instance: SQLModel) -> str:
+    """A hash of the metadata of a resource, used to detect whether it changed on the platform."""
+    content = json.dumps(resource_create_instance.dict(), sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _create(session: Session, router: ResourceRouter, resource_create_instance: SQLModel):
+    if not isinstance(router, ResourceRouter):  # An EnumRouter
+        router.create_resource(session, resource_create_instance)
+        return
+    resource = router.build_resource(session, resource_create_instance)
+    resource.aiod_entry.content_hash = content_hash(resource_create_instance)
+    session.add(resource)
+    session.commit()
+
+
+def _update(
+    session: Session,
+    router: ResourceRouter,
+    resource: AIoDConcept,
+    resource_create_instance: SQLModel,
+):
+    """Update the resource in place, unless the metadata did not change since the last sync."""
+    hash_ = content_hash(resource_create_instance)
+    if resource.aiod_entry.content_hash == hash_:
+        return
+    router.update_resource(session, resource, resource_create_instance)
+    resource.aiod_entry.content_hash = hash_
+    session.commit()
+
+
+def save_batch_to_database(
+    session: Session,
+    connector: ResourceConnector,
+    router: ResourceRouter,
+    items: list[RESOURCE | ResourceWithRelations[RESOURCE] | RecordError],
+) -> list[RecordError]:
+    """
+    Save multiple items, inserting all new resources in a single transaction. If this transaction
+    fails, fall back to save_to_database for each item, to obtain the error of each resource.
+    Existing resources of which the metadata changed are updated afterwards, one by one.
+    """
+    errors = [item for item in items if isinstance(item, RecordError)]
+    items = [item for item in items if not isinstance(item, RecordError)]
+    changed = []
+    try:
+        resources = []
+        for item in items:
+            if isinstance(item, ResourceWithRelations):
+                _create_or_fetch_related_objects(session, item)
+                resources.append(item.resource)
+            else:
+                resources.append(item)
+        hashes = _existing_hashes(session, connector.resource_class, resources)
+        for resource_create_instance in resources:
+            key = (
+                resource_create_instance.platform,
+                resource_create_instance.platform_resource_identifier,
+            )
+            hash_ = content_hash(resource_create_instance)
+            if key in hashes:
+                if hashes[key] != hash_:
+                    changed.append(resource_create_instance)
+                continue
+            hashes[key] = hash_  # Only the first occurrence of a resource within a batch is saved
+            resource = router.build_resource(session, resource_create_instance)
+            resource.aiod_entry.content_hash = hash_
+            session.add(resource)
+        session.commit()
+    except Exception:
+        session.rollback()
+        logging.warning(f"Saving a batch of {len(items)} items failed, saving them one by one.")
+        changed = items
+    for item in changed:
+        error = save_to_database(session=session, connector=connector, router=router, item=item)
+        if error:
+            errors.append(error)
+    return errors
+
+
+def _existing_hashes(
+    session: Session, clazz: type[AIoDConcept], resources: list[AIoDConcept]
+) -> dict[tuple[str, str], str | None]:
+    """
+    The content hash of the given resources that already exist, keyed by
+    (platform, platform_resource_identifier).
+    """
+    if not resources:
+        return {}
+    keys = {(r.platform, r.platform_resource_identifier) for r in resources}
+    query = (
+        select(clazz.platform, clazz.platform_resource_identifier, AIoDEntryORM.content_hash)
+        .join(clazz.aiod_entry)
+        .where(tuple_(clazz.platform, clazz.platform_resource_identifier).in_(keys))
+    )
+    return {(platform, id_): hash_ for platform, id_, hash_ in session.execute(query)}
+
+
+def _batches(items: Iterable, batch_size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        yield batch
+
+
+def _log_error(error: RecordError, error_path: pathlib.Path):
+    if error.ignore:
+        return
+    if isinstance(error.error, str):
+        logging.error(f"Error on identifier {error.identifier}: {error.error}")
+    else:
+        logging.error(f"Error on identifier {error.identifier}", exc_info=error.error)
+    with open(error_path, "a") as f:
+        error_cleaned = "".join(c if c.isalnum() or c == "" else "_" for c in str(error.error))
+        f.write(f'"{error.identifier}","{error_cleaned}"\n')
+
+
+def _save_state(state: dict, state_path: pathlib.Path):
+    with open(state_path, "w") as f:
+        json.dump(state, f, indent=4)
+
+
 def main():
     args = _parse_args()
 
@@ -127,6 +269,12 @@ def main():
     connector_cls_name = args.connector.split(".")[-1]
     module = importlib.import_module(module_path)
     connector: ResourceConnector = getattr(module, connector_cls_name)()
+    if args.workers is not None:
+        if not isinstance(connector, ResourceConnectorById):
+            raise ValueError(
+                "The number of workers can only be set for identifier-based connectors"
+            )
+        connector.workers = args.workers
 
     working_dir = pathlib.Path(args.working_dir)
     error_path = working_dir / RELATIVE_PATH_ERROR_CSV
@@ -162,28 +310,32 @@ def main():
         if router.resource_class == connector.resource_class
     ]
 
+    # A single session for the complete run, so that the NamedRelationCache of the session
+    # (e.g. keywords and licenses) is shared by all items.
     with DbSession() as session:
-        for i, item in enumerate(items):
-            error = save_to_database(router=router, connector=connector, session=session, item=item)
-            if error:
-                if not error.ignore:
-                    if isinstance(error.error, str):
-                        logging.error(f"Error on identifier {error.identifier}: {error.error}")
-                    else:
-                        logging.error(
-                            f"Error on identifier {error.identifier}", exc_info=error.error
-                        )
-                    with open(error_path, "a") as f:
-                        error_cleaned = "".join(
-                            c if c.isalnum() or c == "" else "_" for c in str(error.error)
-                        )
-                        f.write(f'"{error.identifier}","{error_cleaned}"\n')
-            if args.save_every and i > 0 and i % args.save_every == 0:
-                logging.info(f"Saving state after handling {i}th result: {json.dumps(state)}")
-                with open(state_path, "w") as f:
-                    json.dump(state, f, indent=4)
-    with open(state_path, "w") as f:
-        json.dump(state, f, indent=4)
+        if args.batch_size and isinstance(router, ResourceRouter):
+            n_handled = 0
+            for batch in _batches(items, args.batch_size):
+                for error in save_batch_to_database(session, connector, router, batch):
+                    _log_error(error, error_path)
+                n_previous, n_handled = n_handled, n_handled + len(batch)
+                if args.save_every and n_previous // args.save_every < n_handled // args.save_every:
+                    logging.info(
+                        f"Saving state after handling {n_handled} results: {json.dumps(state)}"
+                    )
+                    _save_state(state, state_path)
+        else:
+            for i, item in enumerate(items):
+                error = save_to_database(
+                    router=router, connector=connector, session=session, item=item
+                )
+                if error:
+                    _log_error(error, error_path)
+                if args.save_every and i > 0 and i % args.save_every == 0:
+                    logging.info(f"Saving state after handling {i}th result: {json.dumps(state)}")
+                    _save_state(state, state_path)
+    _save_state(state, state_path)
+    http_client.log_statistics()
     logging.info("Done")
 
 
@@ -0,0 +1,118 @@
+"""
+Incremental parsing of Zenodo OAI-PMH (oai_datacite) ListRecords responses.
+
+Instead of converting each complete record into nested dictionaries, the response is parsed
+using iterparse, only the fields of the datacite resource that are used by the
+ZenodoDatasetConnector are kept, and all elements are cleared as soon as they are processed. The
+kept fields have the same format as xmltodict would produce, so that they can be processed in the
+same way. The resumptionToken and the OAI-PMH error (if any) are read in the same pass, so that a
+response does not need to be parsed again to request the next page.
+"""
+
+import dataclasses
+from typing import IO, Iterator
+from xml.etree import ElementTree
+
+from sickle.models import ResumptionToken
+
+XML_NAMESPACE = "{http://www.w3.org/XML/1998/namespace}"
+RESOURCE_FIELDS = frozenset(
+    {"creators", "titles", "descriptions", "dates", "publisher", "rightsList", "subjects"}
+)
+
+
+@dataclasses.dataclass
+class OaiRecord:
+    identifier: str | None = None
+    datestamp: str | None = None
+    resource_type: str | None = None
+    resource: dict | None = None  # Only the RESOURCE_FIELDS of the datacite resource
+
+
+@dataclasses.dataclass
+class OaiPage:
+    """The records of a ListRecords response, and the resumptionToken of the next page."""
+
+    records: list[OaiRecord] = dataclasses.field(default_factory=list)
+    resumption_token: ResumptionToken | None = None
+    error_code: str | None = None
+    error_message: str | None = None
+
+
+def parse_page(source: IO[bytes]) -> OaiPage:
+    """Parse an OAI-PMH ListRecords response."""
+    page = OaiPage()
+    page.records.extend(iterparse_records(source, page))
+    return page
+
+
+def iterparse_records(source: IO[bytes], page: OaiPage | None = None) -> Iterator[OaiRecord]:
+    """
+    Yield the records of an OAI-PMH response, one by one. The resumptionToken and error of the
+    response are stored on the page, if given.
+    """
+    path: list[str] = []
+    record = OaiRecord()
+    for event, element in ElementTree.iterparse(source, events=("start", "end")):
+        name = _local_name(element.tag)
+        if event == "start":
+            path.append(name)
+            if path[-2:] == ["payload", "resource"]:
+                record.resource = {}
+            continue
+        path.pop()
+        parent = path[-1] if path else None
+        if parent == "header" and name in ("identifier", "datestamp"):
+            setattr(record, name, (element.text or "").strip())
+        elif parent == "ListRecords" and name == "resumptionToken" and page is not None:
+            page.resumption_token = ResumptionToken(
+                token=element.text,
+                cursor=element.attrib.get("cursor"),
+                complete_list_size=element.attrib.get("completeListSize"),
+                expiration_date=element.attrib.get("expirationDate"),
+            )
+        elif parent == "OAI-PMH" and name == "error" and page is not None:
+            page.error_code = element.attrib.get("code", "UNKNOWN")
+            page.error_message = element.text or ""
+        elif parent == "resource" and record.resource is not None:
+            if name in RESOURCE_FIELDS:
+                record.resource[name] = _as_xmltodict(element)
+            elif name == "resourceType":
+                record.resource_type = element.attrib.get("resourceTypeGeneral")
+            element.clear()
+            continue
+        elif "resource" in path:
+            continue  # Part of a resource field, cleared together with the field
+        if name == "record":
+            yield record
+            record = OaiRecord()
+        element.clear()
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _attribute_name(key: str) -> str:
+    if key.startswith(XML_NAMESPACE):
+        return "xml:" + key.removeprefix(XML_NAMESPACE)
+    return _local_name(key)
+
+
+def _as_xmltodict(element: ElementTree.Element) -> dict | str | None:
+    """The element in the format of xmltodict.parse (without namespace prefixes)."""
+    result: dict = {f"@{_attribute_name(k)}": v for k, v in element.attrib.items()}
+    for child in element:
+        name, value = _local_name(child.tag), _as_xmltodict(child)
+        if name not in result:
+            result[name] = value
+        elif isinstance(result[name], list):
+            result[name].append(value)
+        else:
+            result[name] = [result[name], value]
+    text = ((element.text or "") + "".join(child.tail or "" for child in element)).strip()
+    if not result:
+        return text or None
+    if text:
+        result["#text"] = text
+    return result
@@ -1,18 +1,22 @@
+import io
+import itertools
 import logging
 import requests
 import xmltodict
 
 from datetime import datetime, timedelta, timezone
-from ratelimit import limits, sleep_and_retry
 from requests.exceptions import HTTPError
-from sickle import Sickle
-from sickle.iterator import BaseOAIIterator
+from sickle import Sickle, oaiexceptions
+from sickle.iterator import BaseOAIIterator, OAIItemIterator
+from sickle.models import ResumptionToken
 from starlette import status
 from typing import Iterator, Tuple
 
+from connectors.abstract.http_client import RateLimit, http_client
 from connectors.abstract.resource_connector_by_date import ResourceConnectorByDate
 from connectors.record_error import RecordError
 from connectors.resource_with_relations import ResourceWithRelations
+from connectors.zenodo.oai_parser import OaiPage, OaiRecord, parse_page
 from database.model import field_length
 from database.model.agent.contact import Contact
 from database.model.ai_asset.distribution import Distribution
@@ -30,8 +34,37 @@ GLOBAL_MAX_CALLS_HOUR = 2000
 ONE_MINUTE = 60
 ONE_HOUR = 3600
 
+HARVESTING_RATE_LIMIT = RateLimit(calls=HARVESTING_MAX_CALLS_PER_MIN, period=ONE_MINUTE)
+http_client.add_rate_limit("zenodo.org", calls=GLOBAL_MAX_CALLS_MINUTE, period=ONE_MINUTE)
+http_client.add_rate_limit("zenodo.org", calls=GLOBAL_MAX_CALLS_HOUR, period=ONE_HOUR)
+
+
+class HttpClientSickle(Sickle):
+    """
+    Sickle performing its requests through the shared http_client, so that the OAI-PMH requests
+    reuse the pooled connections, are retried on a 429 or 5xx status, respect the rate limits
+    of Zenodo and are included in the statistics. The retrying of Sickle itself (max_retries)
+    should therefore be left disabled.
+    """
+
+    def _request(self, kwargs: dict) -> requests.Response:
+        if self.http_method != "GET":
+            raise NotImplementedError("Only GET requests are supported.")
+        return http_client.get(self.endpoint, params=kwargs, **self.request_args)
+
 
 class ZenodoDatasetConnector(ResourceConnectorByDate[Dataset]):
+    """
+    Harvests the datasets of Zenodo using OAI-PMH. By default (streaming=True), each OAI-PMH
+    response is parsed once, incrementally, keeping only the fields that are needed and the
+    resumptionToken (see oai_parser); Sickle is then only used to perform the requests. With
+    streaming=False, the responses are iterated using Sickle, which parses each response
+    completely (several times), and each record is converted into a dictionary using xmltodict.
+    """
+
+    def __init__(self, streaming: bool = True):
+        self.streaming = streaming
+
     @property
     def resource_class(self) -> type[Dataset]:
         return Dataset
@@ -61,12 +94,8 @@ class ZenodoDatasetConnector(ResourceConnectorByDate[Dataset]):
         return f"Error while fetching record info: bad format {field}"
 
     @staticmethod
-    @sleep_and_retry
-    @limits(calls=GLOBAL_MAX_CALLS_MINUTE, period=ONE_MINUTE)
-    @limits(calls=GLOBAL_MAX_CALLS_HOUR, period=ONE_HOUR)
     def _get_record(id_number: str) -> requests.Response:
-        response = requests.get(f"https://zenodo.org/api/records/{id_number}/files")
-        return response
+        return http_client.get(f"https://zenodo.org/api/records/{id_number}/files")
 
     def _dataset_from_record(
         self, identifier: str, record: dict
@@ -227,25 +256,74 @@ class ZenodoDatasetConnector(ResourceConnectorByDate[Dataset]):
         return None
 
     @staticmethod
-    @sleep_and_retry
-    @limits(calls=HARVESTING_MAX_CALLS_PER_MIN, period=ONE_MINUTE)
     def _check_harvesting_rate() -> None:
-        pass
+        HARVESTING_RATE_LIMIT.acquire()
+
+    @staticmethod
+    def _expiration_date(resumption_token: ResumptionToken | None) -> datetime:
+        if resumption_token and resumption_token.expiration_date:
+            return datetime.fromisoformat(resumption_token.expiration_date) - timedelta(seconds=10)
+        current_date_time = datetime.utcnow().replace(tzinfo=timezone.utc)
+        return current_date_time + timedelta(seconds=110)
+
+    @staticmethod
+    def _harvest_pages(sickle: Sickle, params: dict) -> Iterator[OaiPage]:
+        """
+        The pages of a ListRecords request, following the resumptionTokens. Sickle is only used
+        to perform the requests: each response is parsed once, by parse_page.
+        """
+        params = {"verb": "ListRecords"} | params
+        while True:
+            oai_response = sickle.harvest(**params)
+            page = parse_page(io.BytesIO(oai_response.http_response.content))
+            if page.error_code is not None:
+                code = page.error_code[0].upper() + page.error_code[1:]
+                error_class = getattr(oaiexceptions, code, oaiexceptions.OAIError)
+                raise error_class(page.error_message)
+            yield page
+            if page.resumption_token is None or not page.resumption_token.token:
+                return
+            params = {"verb": "ListRecords", "resumptionToken": page.resumption_token.token}
+
+    def _fetch_oai_records(self, first_page: OaiPage, pages: Iterator[OaiPage]) -> list[OaiRecord]:
+        """
+        The streaming counterpart of _fetch_record_list: fetches and parses the OAI-PMH responses
+        page by page, until the resumption token expires. Like _fetch_record_list, all records
+        are collected before they are processed, because processing them (which requests the
+        files of every dataset) takes longer than the resumption token is valid. Only the fields
+        that are needed are kept in memory.
+        """
+        expiration_date = self._expiration_date(first_page.resumption_token)
+        records: list[OaiRecord] = []
+        try:
+            for page in itertools.chain([first_page], pages):
+                records.extend(page.records)
+                now = datetime.utcnow().replace(tzinfo=timezone.utc)
+                if now >= expiration_date:
+                    logging.info(f"Resumption token expired at {expiration_date}!")
+                    break
+                self._check_harvesting_rate()
+                logging.info(f"{len(records)} records retrieved")
+        except HTTPError as exc:
+            if (exc.response is not None) and (
+                exc.response.status_code >= status.HTTP_400_BAD_REQUEST
+            ):
+                msg = (
+                    f"Failed to fetch new records. Zenodo returned {exc.response.reason} "
+                    f"with status code ({exc.response.status_code})!"
+                )
+                msg += " Processing the acquired records..." if records else ""
+                logging.info(msg)
+            else:
+                raise exc
+        return records
 
     def _fetch_record_list(self, records_iterator: BaseOAIIterator, batchsize: int) -> list:
         """
         Fetches the maximum number of records available before the resumption token expires.
         It also ensures that the harvesting limit rate is not exceeded.
         """
-        resumption_token = records_iterator.resumption_token
-        if resumption_token and resumption_token.expiration_date:
-            expiration_date = datetime.fromisoformat(resumption_token.expiration_date) - timedelta(
-                seconds=10
-            )
-        else:
-            current_date_time = datetime.utcnow().replace(tzinfo=timezone.utc)
-            expiration_date = current_date_time + timedelta(seconds=110)
-
+        expiration_date = self._expiration_date(records_iterator.resumption_token)
         records_list = []
         i = 0
         try:
@@ -286,15 +364,18 @@ class ZenodoDatasetConnector(ResourceConnectorByDate[Dataset]):
 
         self._check_harvesting_rate()
         logging.info("Retrieving records from Zenodo...")
-        sickle = Sickle("https://zenodo.org/oai2d")
+        sickle = HttpClientSickle("https://zenodo.org/oai2d", iterator=OAIItemIterator)
+        params = {
+            "metadataPrefix": "oai_datacite",
+            "from": from_incl.replace(tzinfo=None).isoformat(),
+            "until": to_excl.replace(tzinfo=None).isoformat(),
+        }
         try:
-            records_iterator = sickle.ListRecords(
-                **{
-                    "metadataPrefix": "oai_datacite",
-                    "from": from_incl.replace(tzinfo=None).isoformat(),
-                    "until": to_excl.replace(tzinfo=None).isoformat(),
-                }
-            )
+            if self.streaming:
+                pages = self._harvest_pages(sickle, params)
+                first_page = next(pages)
+            else:
+                records_iterator = sickle.ListRecords(**params)
         except HTTPError as err:
             if err.response is not None and (
                 err.response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -305,51 +386,76 @@ class ZenodoDatasetConnector(ResourceConnectorByDate[Dataset]):
             else:
                 raise err
 
-        oai_response_dict = xmltodict.parse(records_iterator.oai_response.raw)
-        raw_records = oai_response_dict.get("OAI-PMH", {}).get("ListRecords", {}).get("record", [])
-        batchsize = len(raw_records)
+        records: list
+        if self.streaming:
+            resumption_token = first_page.resumption_token
+            records = self._fetch_oai_records(first_page, pages)
+            batchsize = len(records)
+        else:
+            resumption_token = records_iterator.resumption_token
+            oai_response_dict = xmltodict.parse(records_iterator.oai_response.raw)
+            raw_records = (
+                oai_response_dict.get("OAI-PMH", {}).get("ListRecords", {}).get("record", [])
+            )
+            batchsize = len(raw_records)
+            records = self._fetch_record_list(records_iterator, batchsize)
 
         complete_list_size = (
-            int(records_iterator.resumption_token.complete_list_size)
-            if records_iterator.resumption_token
-            and records_iterator.resumption_token.complete_list_size
+            int(resumption_token.complete_list_size)
+            if resumption_token and resumption_token.complete_list_size
             else batchsize
         )
-
-        records = self._fetch_record_list(records_iterator, batchsize)
         logging.info(f"{len(records)} records retrieved out of {complete_list_size}")
 
-        i = 0
-        for record in records:
-            processed_record: ResourceWithRelations[Dataset] | RecordError
-            i += 1
-            id_ = None
-            datetime_: datetime | None = None
-            resource_type = ZenodoDatasetConnector._resource_type(record)
-            if resource_type is None:
-                processed_record = RecordError(
-                    identifier=id_, error="Resource type could not be determined"
-                )
+        for i, record in enumerate(records, start=1):
+            if self.streaming:
+                datetime_, processed_record = self._process_oai_record(record)
             else:
-                try:
-                    xml_string = record.raw
-                    xml_dict = xmltodict.parse(xml_string)
-                    id_ = xml_dict["record"]["header"]["identifier"]
-                    if id_.startswith("oai:"):
-                        id_ = id_.replace("oai:", "")
-
-                    datetime_ = datetime.fromisoformat(xml_dict["record"]["header"]["datestamp"])
-                    if resource_type == "Dataset":
-                        resource = xml_dict["record"]["metadata"]["oai_datacite"]["payload"][
-                            "resource"
-                        ]
-                        processed_record = self._dataset_from_record(id_, resource)
-                    else:
-                        processed_record = RecordError(
-                            identifier=id_, error="Wrong type", ignore=True
-                        )
-                except Exception as e:
-                    processed_record = RecordError(identifier=id_, error=e)
-
+                datetime_, processed_record = self._process_record(record)
             self.is_concluded = i == complete_list_size
             yield datetime_, processed_record
+
+    def _process_oai_record(
+        self, record: OaiRecord
+    ) -> Tuple[datetime | None, ResourceWithRelations[Dataset] | RecordError]:
+        if record.resource_type is None:
+            return None, RecordError(identifier=None, error="Resource type could not be determined")
+        id_ = None
+        datetime_ = None
+        try:
+            id_ = record.identifier.removeprefix("oai:")  # type: ignore [union-attr]
+            datetime_ = datetime.fromisoformat(record.datestamp)  # type: ignore [arg-type]
+            if record.resource_type == "Dataset":
+                return datetime_, self._dataset_from_record(id_, record.resource)  # type: ignore
+            return datetime_, RecordError(identifier=id_, error="Wrong type", ignore=True)
+        except Exception as e:
+            return datetime_, RecordError(identifier=id_, error=e)
+
+    def _process_record(
+        self, record
+    ) -> Tuple[datetime | None, ResourceWithRelations[Dataset] | RecordError]:
+        processed_record: ResourceWithRelations[Dataset] | RecordError
+        id_ = None
+        datetime_: datetime | None = None
+        resource_type = ZenodoDatasetConnector._resource_type(record)
+        if resource_type is None:
+            processed_record = RecordError(
+                identifier=id_, error="Resource type could not be determined"
+            )
+        else:
+            try:
+                xml_string = record.raw
+                xml_dict = xmltodict.parse(xml_string)
+                id_ = xml_dict["record"]["header"]["identifier"]
+                if id_.startswith("oai:"):
+                    id_ = id_.replace("oai:", "")
+
+                datetime_ = datetime.fromisoformat(xml_dict["record"]["header"]["datestamp"])
+                if resource_type == "Dataset":
+                    resource = xml_dict["record"]["metadata"]["oai_datacite"]["payload"]["resource"]
+                    processed_record = self._dataset_from_record(id_, resource)
+                else:
+                    processed_record = RecordError(identifier=id_, error="Wrong type", ignore=True)
+            except Exception as e:
+                processed_record = RecordError(identifier=id_, error=e)
+        return datetime_, processed_record
@@ -0,0 +1,18 @@
+#!python3
+"""
+Reconciliation of the cached resource counts.
+
+The resource counts are kept up to date on every ORM flush (see resource_count.py). This module
+recomputes them from the resource tables, to fix any drift caused by writes that bypass the ORM.
+"""
+from database.counts.resource_count import reconcile_counts
+from database.session import DbSession
+
+
+def main():
+    with DbSession() as session:
+        reconcile_counts(session)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Cached number of (non-deleted) resources per resource type and platform.
+
+Counting the resources using a GROUP BY over every resource table is expensive for large tables.
+Instead, the counts are stored in a separate table that is kept up to date by every commit of
+an ORM session, within the same transaction as the change itself. This covers all writes using
+the ORM, such as the create, update and delete endpoints of the ResourceRouter and the
+synchronization of the connectors. Writes that bypass the ORM (e.g. the hard deletion of
+soft-deleted resources, which are not counted anyway) are not tracked, so the counts are
+periodically reconciled, see database/counts/reconcile.py.
+
+Updating a count locks its row until the end of the transaction, so concurrent transactions
+creating or deleting resources of the same type and platform (e.g. parallel connectors of the
+same platform) wait for each other. To keep this as short as possible, the changes of the counts
+are collected on each flush, and only written just before the commit, once per transaction.
+"""
+from collections import Counter
+from typing import Any, Type
+
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.sql.operators import is_
+from sqlmodel import Field, SQLModel
+
+from database.model.concept.concept import AIoDConcept
+from database.model.field_length import NORMAL, SHORT
+from database.model.helper_functions import non_abstract_subclasses
+from database.model.platform.platform_names import PlatformName
+
+
+class ResourceCount(SQLModel, table=True):  # type: ignore [call-arg]
+    __tablename__ = "resource_count"
+
+    resource_type: str = Field(max_length=NORMAL, primary_key=True)
+    platform: str = Field(max_length=SHORT, primary_key=True)
+    count: int = Field(default=0)
+
+
+def get_counts(session: Session, resource_class: Type[SQLModel] | None = None) -> dict:
+    """
+    The number of non-deleted resources per platform, for the given resource class. If no
+    resource class is given, the counts per platform for all resource types, keyed by table name.
+    """
+    query = select(ResourceCount).where(ResourceCount.count > 0)
+    if resource_class is not None:
+        query = query.where(ResourceCount.resource_type == resource_class.__tablename__)
+    counts: dict[str, dict[str, int]] = {}
+    for row in session.scalars(query):
+        counts.setdefault(row.resource_type, {})[row.platform] = row.count
+    if resource_class is not None:
+        return counts.get(resource_class.__tablename__, {})
+    return counts
+
+
+def reconcile_counts(session: Session):
+    """
+    Recompute all counts from the resource tables, fixing any drift.
+
+    The resources and the stored counts are read in a single transaction, so from the same
+    snapshot (in MySQL's default REPEATABLE READ isolation level), and only the difference is
+    added to each count. Counts changed by transactions committed in the meantime are therefore
+    not lost, as they would be when overwriting the counts.
+    """
+    counts: Counter = Counter()
+    for resource_class in non_abstract_subclasses(AIoDConcept):
+        query = (
+            select(resource_class.platform, func.count(resource_class.identifier))
+            .where(is_(resource_class.date_deleted, None))
+            .group_by(resource_class.platform)
+        )
+        for platform, count in session.execute(query):
+            counts[(resource_class.__tablename__, platform or PlatformName.aiod.value)] += count
+    for row in session.scalars(select(ResourceCount)):
+        counts[(row.resource_type, row.platform)] -= row.count
+    connection = session.connection()
+    for (resource_type, platform), delta in sorted(counts.items()):
+        if delta != 0:
+            _increment(connection, resource_type, platform, delta)
+    session.commit()
+
+
+def _counted_as(instance: AIoDConcept, committed: bool) -> tuple[str, str] | None:
+    """
+    The (resource_type, platform) under which this resource is counted, either before (if
+    committed) or after this flush, or None if it is not counted because it is deleted.
+    """
+    date_deleted, platform = (
+        _committed_value(instance, key) if committed else getattr(instance, key)
+        for key in ("date_deleted", "platform")
+    )
+    if date_deleted is not None:
+        return None
+    return instance.__tablename__, platform or PlatformName.aiod.value
+
+
+def _committed_value(instance: AIoDConcept, key: str) -> Any:
+    history = get_history(instance, key)
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(instance, key)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_counts(session: Session, flush_context):
+    deltas: Counter = session.info.setdefault("resource_count_deltas", Counter())
+    for instance in session.new:
+        if isinstance(instance, AIoDConcept) and (key := _counted_as(instance, committed=False)):
+            deltas[key] += 1
+    for instance in session.deleted:
+        if isinstance(instance, AIoDConcept) and (key := _counted_as(instance, committed=True)):
+            deltas[key] -= 1
+    for instance in session.dirty:
+        if isinstance(instance, AIoDConcept):
+            old, new = _counted_as(instance, committed=True), _counted_as(instance, committed=False)
+            if old != new:
+                if old is not None:
+                    deltas[old] -= 1
+                if new is not None:
+                    deltas[new] += 1
+
+
+@event.listens_for(Session, "before_commit")
+def _update_counts(session: Session):
+    session.flush()  # before_commit is called before the final flush
+    deltas = session.info.pop("resource_count_deltas", None) or {}
+    # In a fixed order, so that concurrent transactions lock the rows in the same order
+    for (resource_type, platform), delta in sorted(deltas.items()):
+        if delta != 0:
+            _increment(session.connection(), resource_type, platform, delta)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _rollback_counts(session: Session, previous_transaction):
+    session.info.pop("resource_count_deltas", None)
+
+
+def _increment(connection: Connection, resource_type: str, platform: str, delta: int):
+    """Atomically add delta to the count, inserting the row if it does not exist yet."""
+    table = ResourceCount.__table__  # type: ignore [attr-defined]
+    values = {"resource_type": resource_type, "platform": platform, "count": delta}
+    if connection.dialect.name == "sqlite":
+        statement = (
+            sqlite.insert(table)
+            .values(**values)
+            .on_conflict_do_update(
+                index_elements=[table.c.resource_type, table.c.platform],
+                set_={"count": table.c.count + delta},
+            )
+        )
+    else:
+        statement = (
+            mysql.insert(table)
+            .values(**values)
+            .on_duplicate_key_update(count=table.c.count + delta)
+        )
+    connection.execute(statement)
@@ -0,0 +1,112 @@
+#!python3
+"""
+Backfill and consistency check of the materialized documents.
+
+The documents are kept up to date on every commit of an ORM session (see resource_document.py).
+This module (re)writes the documents of all resources, for instance after enabling the
+documents, after a change of the serialization, or to fix any drift caused by writes that bypass
+the ORM. With --check, the documents are only compared with the resources, and the drift is
+reported.
+
+Usage (from the src directory):
+    python database/documents/backfill.py [--check] [--resource-type dataset ...]
+"""
+import argparse
+import logging
+import sys
+from typing import Type
+
+from sqlalchemy import delete, select
+from sqlalchemy.sql.operators import is_
+from sqlmodel import Session
+
+from database.documents.resource_document import (
+    ResourceDocument,
+    check_documents,
+    resource_types,
+    write_documents,
+)
+from database.model.concept.concept import AIoDConcept
+from database.session import DbSession
+from setup_logger import setup_logger
+
+# Imports all resource classes, so that they are known to resource_types()
+import routers.resource_routers  # noqa: F401
+
+
+def backfill(session: Session, resource_class: Type[AIoDConcept], batch_size: int = 500) -> int:
+    """(Re)write all documents of this resource type. Returns the number of documents written."""
+    n_documents, last_identifier = 0, None
+    while True:
+        query = select(resource_class.identifier).where(is_(resource_class.date_deleted, None))
+        if last_identifier is not None:
+            query = query.where(resource_class.identifier > last_identifier)
+        identifiers = session.scalars(
+            query.order_by(resource_class.identifier).limit(batch_size)
+        ).all()
+        if not identifiers:
+            break
+        n_documents += write_documents(session, resource_class, identifiers)
+        session.commit()
+        session.expunge_all()
+        last_identifier = identifiers[-1]
+    session.execute(
+        delete(ResourceDocument).where(
+            ResourceDocument.resource_type == resource_class.__tablename__,
+            ResourceDocument.identifier.not_in(
+                select(resource_class.identifier).where(is_(resource_class.date_deleted, None))
+            ),
+        )
+    )
+    session.commit()
+    return n_documents
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Write the materialized documents of all resources, or check them."
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report the drift between the documents and the resources, exiting with "
+        "status 1 if there is any.",
+    )
+    parser.add_argument(
+        "--resource-type",
+        nargs="+",
+        choices=sorted(resource_types()),
+        help="The resource types (table names) to process. By default, all resource types.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="The number of documents written per transaction, or compared at once.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    setup_logger()
+    drifted = False
+    for resource_type, resource_class in sorted(resource_types().items()):
+        if args.resource_type and resource_type not in args.resource_type:
+            continue
+        with DbSession() as session:
+            if args.check:
+                drift = check_documents(session, resource_class, batch_size=args.batch_size)
+                for kind, identifiers in drift.items():
+                    if identifiers:
+                        drifted = True
+                        logging.warning(f"{resource_type}: {kind} documents {identifiers}")
+            else:
+                n_documents = backfill(session, resource_class, batch_size=args.batch_size)
+                logging.info(f"{resource_type}: wrote {n_documents} documents")
+    if drifted:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Materialized documents: the serialized (aiod schema) representation of each resource.
+
+Serializing a resource walks all its relationships, while resources are read far more often than
+they are written. If enabled, the serialized representation of each resource is therefore stored
+in a separate table, written just before every commit of an ORM session that changed the
+resource, within the same transaction as the change itself. This covers all writes using the
+ORM, such as the create, update and delete endpoints of the ResourceRouter and the
+synchronization of the connectors. The GET endpoints of the ResourceRouter return the stored
+document if its date_modified matches the resource, and serialize the resource otherwise.
+
+Writes that bypass the ORM (e.g. the hard deletion of resources) are not tracked, so the
+documents can be checked and rewritten using database/documents/backfill.py, which should also be
+run once after enabling the documents.
+"""
+import functools
+import json
+from datetime import datetime
+from typing import Any, Iterable, Sequence, Type
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Column, Text, delete, event, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import PASSIVE_NO_INITIALIZE, get_history
+from sqlalchemy.sql.operators import is_
+from sqlmodel import Field, SQLModel
+
+from config import RESOURCE_DOCUMENTS_CONFIG
+from database.model.ai_resource.resource_table import AIResourceORM
+from database.model.concept.concept import AIoDConcept
+from database.model.field_length import NORMAL
+from database.model.helper_functions import non_abstract_subclasses
+from database.model.relationships import get_loader_options
+from database.model.resource_read_and_create import resource_read
+
+DOCUMENTS_ENABLED = RESOURCE_DOCUMENTS_CONFIG.get("enabled", False)
+
+_AI_RESOURCE_RELATIONS = ("is_part_of", "has_part", "relevant_resource", "relevant_to")
+
+
+class ResourceDocument(SQLModel, table=True):  # type: ignore [call-arg]
+    __tablename__ = "resource_document"
+
+    resource_type: str = Field(
+        max_length=NORMAL, primary_key=True, description="The table name of the resource"
+    )
+    identifier: int = Field(primary_key=True)
+    date_modified: datetime | None = Field(
+        description="The aiod_entry.date_modified of the resource when it was serialized"
+    )
+    document: str = Field(sa_column=Column(Text().with_variant(mysql.LONGTEXT(), "mysql")))
+
+
+@functools.cache
+def _read_class(resource_class: Type[AIoDConcept]) -> Type[SQLModel]:
+    return resource_read(resource_class)
+
+
+def serialize(resource: AIoDConcept) -> str:
+    """The JSON of the resource, exactly as returned by the GET endpoints in the aiod schema."""
+    read_class = _read_class(type(resource))
+    # Validated again like the response_model of the endpoints, e.g. to drop the identifiers of
+    # related objects that are not part of their Read class
+    content = read_class.from_orm(resource).dict(by_alias=True, exclude_none=True)
+    content = jsonable_encoder(read_class.parse_obj(content), exclude_none=True)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    )
+
+
+def load_resources(
+    session: Session, resource_class: Type[AIoDConcept], identifiers: Iterable[int]
+) -> Sequence[AIoDConcept]:
+    """
+    The non-deleted resources with these identifiers that have an aiod_entry (otherwise the
+    documents are never returned), with all relationships needed for serialization loaded
+    eagerly. The attributes are (re)loaded from the database, so that the documents contain the
+    values as stored (e.g. datetimes without microseconds on MySQL).
+    """
+    query = (
+        select(resource_class)
+        .join(resource_class.aiod_entry)
+        .where(
+            resource_class.identifier.in_(list(identifiers)),
+            is_(resource_class.date_deleted, None),
+        )
+        .options(*get_loader_options(resource_class))
+        .execution_options(populate_existing=True)
+    )
+    return session.scalars(query).all()
+
+
+def write_documents(
+    session: Session, resource_class: Type[AIoDConcept], identifiers: Iterable[int]
+) -> int:
+    """
+    (Re)write the documents of these resources, and remove the documents of the resources that
+    do not exist (anymore). Returns the number of documents written.
+    """
+    identifiers = set(identifiers)
+    resources = load_resources(session, resource_class, identifiers)
+    rows = [
+        {
+            "resource_type": resource_class.__tablename__,
+            "identifier": resource.identifier,
+            "date_modified": resource.aiod_entry.date_modified,
+            "document": serialize(resource),
+        }
+        for resource in resources
+    ]
+    removed = identifiers - {resource.identifier for resource in resources}
+    connection = session.connection()
+    if removed:
+        connection.execute(
+            delete(ResourceDocument).where(
+                ResourceDocument.resource_type == resource_class.__tablename__,
+                ResourceDocument.identifier.in_(removed),
+            )
+        )
+    if rows:
+        _upsert(connection, rows)
+    return len(rows)
+
+
+def check_documents(
+    session: Session, resource_class: Type[AIoDConcept], batch_size: int = 500
+) -> dict[str, list[int]]:
+    """
+    Compare the stored documents of this resource type with the resources. Returns the
+    identifiers of the resources without document ("missing"), with a document that differs from
+    its current serialization ("stale"), and of the documents without resource ("orphaned").
+    """
+    tablename = resource_class.__tablename__
+    documents = {
+        document.identifier: document.document
+        for document in session.scalars(
+            select(ResourceDocument).where(ResourceDocument.resource_type == tablename)
+        )
+    }
+    identifiers = session.scalars(
+        select(resource_class.identifier).where(is_(resource_class.date_deleted, None))
+    ).all()
+    drift: dict[str, list[int]] = {"missing": [], "stale": [], "orphaned": []}
+    for start in range(0, len(identifiers), batch_size):
+        end = start + batch_size
+        batch = identifiers[start:end]
+        for resource in load_resources(session, resource_class, batch):
+            document = documents.pop(resource.identifier, None)
+            if document is None:
+                drift["missing"].append(resource.identifier)
+            elif document != serialize(resource):
+                drift["stale"].append(resource.identifier)
+        session.expunge_all()
+    drift["orphaned"] = sorted(documents)
+    return drift
+
+
+def resource_types() -> dict[str, Type[AIoDConcept]]:
+    """The resource classes of which documents are stored, by table name."""
+    return {clazz.__tablename__: clazz for clazz in non_abstract_subclasses(AIoDConcept)}
+
+
+def _upsert(connection: Connection, rows: list[dict[str, Any]]):
+    table = ResourceDocument.__table__  # type: ignore [attr-defined]
+    if connection.dialect.name == "sqlite":
+        statement = sqlite.insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.resource_type, table.c.identifier],
+            set_={
+                "date_modified": statement.excluded.date_modified,
+                "document": statement.excluded.document,
+            },
+        )
+    else:
+        statement = mysql.insert(table)
+        statement = statement.on_duplicate_key_update(
+            date_modified=statement.inserted.date_modified,
+            document=statement.inserted.document,
+        )
+    connection.execute(statement, rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_changes(session: Session, flush_context):
+    if not DOCUMENTS_ENABLED:
+        return
+    changed = session.info.setdefault("resource_documents", {})
+    related = session.info.setdefault("resource_documents_ai_resources", set())
+    for instances in (session.new, session.dirty, session.deleted):
+        for instance in instances:
+            if isinstance(instance, AIoDConcept):
+                changed.setdefault(type(instance), set()).add(instance.identifier)
+            elif isinstance(instance, AIResourceORM):
+                # The relations between AI resources are serialized on both sides, so a change
+                # made through one resource changes the document of the other resource as well
+                related.add((instance.type, instance.identifier))
+                for relation in _AI_RESOURCE_RELATIONS:
+                    history = get_history(instance, relation, passive=PASSIVE_NO_INITIALIZE)
+                    related.update(
+                        (other.type, other.identifier)
+                        for other in (*history.added, *history.deleted)
+                    )
+
+
+@event.listens_for(Session, "before_commit")
+def _write_changed_documents(session: Session):
+    if not DOCUMENTS_ENABLED:
+        return
+    session.flush()  # before_commit is called before the final flush
+    changed = session.info.pop("resource_documents", None) or {}
+    related = session.info.pop("resource_documents_ai_resources", None) or set()
+    classes = resource_types()
+    for resource_type in {resource_type for resource_type, _ in related} & set(classes):
+        resource_class = classes[resource_type]
+        ai_resource_ids = [id_ for type_, id_ in related if type_ == resource_type]
+        query = select(resource_class.identifier).where(
+            resource_class.ai_resource_id.in_(ai_resource_ids)
+        )
+        changed.setdefault(resource_class, set()).update(session.scalars(query))
+    for resource_class, identifiers in changed.items():
+        write_documents(session, resource_class, identifiers)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _rollback_changes(session: Session, previous_transaction):
+    session.info.pop("resource_documents", None)
+    session.info.pop("resource_documents_ai_resources", None)
@@ -10,6 +10,9 @@ import copy
 from datetime import datetime
 from typing import Any, Optional
 
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import PASSIVE_NO_INITIALIZE, get_history
 from sqlmodel import Field, Relationship
 
 from database.model.agent.contact import Contact
@@ -24,6 +27,7 @@ from database.model.ai_resource.research_area import ResearchArea
 from database.model.ai_resource.resource_table import AIResourceORM
 from database.model.ai_resource.scientific_domain import ScientificDomain
 from database.model.ai_resource.text import TextORM, Text
+from database.model.concept.aiod_entry import AIoDEntryORM
 from database.model.concept.concept import AIoDConceptBase, AIoDConcept
 from database.model.field_length import NORMAL
 from database.model.helper_functions import many_to_many_link_factory, non_abstract_subclasses
@@ -271,3 +275,38 @@ class AbstractAIResource(AIResourceBase, AIoDConcept, metaclass=abc.ABCMeta):
         relationships["description"].sa_relationship_kwargs = dict(
             foreign_keys=f"[{cls.__name__}.description_identifier]"
         )
+
+
+_AI_RESOURCE_RELATIONS = ("is_part_of", "has_part", "relevant_resource", "relevant_to")
+
+
+@event.listens_for(Session, "before_flush")
+def _touch_linked_resources(session: Session, flush_context, instances):
+    """
+    The relations between AI resources are stored once, but serialized on both sides: the
+    is_part_of of one resource is the has_part of the other, and the relevant_resource of one
+    resource is the relevant_to of the other. Adding or removing such a relation through one
+    resource therefore changes the other resource as well, so its date_modified is updated too.
+    """
+    linked: dict[str, set[int]] = {}
+    for instance in (*session.new, *session.dirty):
+        if isinstance(instance, AIResourceORM):
+            for relation in _AI_RESOURCE_RELATIONS:
+                history = get_history(instance, relation, passive=PASSIVE_NO_INITIALIZE)
+                for other in (*history.added, *history.deleted):
+                    if other.identifier is not None and other not in session.deleted:
+                        linked.setdefault(other.type, set()).add(other.identifier)
+    if not linked:
+        return
+    now = datetime.utcnow()
+    for resource_class in non_abstract_subclasses(AbstractAIResource):
+        if identifiers := linked.get(resource_class.__tablename__):
+            query = (
+                select(AIoDEntryORM)
+                .join(
+                    resource_class, resource_class.aiod_entry_identifier == AIoDEntryORM.identifier
+                )
+                .where(resource_class.ai_resource_id.in_(identifiers))
+            )
+            for aiod_entry in session.scalars(query):
+                aiod_entry.date_modified = now
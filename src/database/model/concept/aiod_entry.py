@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING
 from sqlmodel import SQLModel, Field, Relationship
 
 from database.model.concept.status import Status
+from database.model.field_length import SHORT
 from database.model.helper_functions import many_to_many_link_factory
 from database.model.relationships import ManyToOne, ManyToMany
 from database.model.serializers import (
@@ -37,6 +38,9 @@ class AIoDEntryORM(AIoDEntryBase, table=True):  # type: ignore [call-arg]
     # date_modified is updated in the resource_router
     date_modified: datetime | None = Field(default_factory=datetime.utcnow)
     date_created: datetime | None = Field(default_factory=datetime.utcnow)
+    # Hash of the metadata as last received from the platform by the synchronization, used to
+    # skip unchanged resources. Not part of the API.
+    content_hash: str | None = Field(max_length=SHORT, default=None)
 
     class RelationshipConfig:
         editor: list[int] = ManyToMany()  # No deletion triggers: "orphan" Persons should be kept
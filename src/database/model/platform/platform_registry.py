@@ -0,0 +1,76 @@
+"""
+Process-wide cache of the names of the platforms.
+
+The names of the platforms are used to validate the platform of many requests (e.g. searching, or
+retrieving a resource by platform identifier), while platforms are rarely added or deleted. The
+names are therefore cached for a short time. A change of the platforms within this process
+invalidates the cache as soon as it is committed (e.g. by the PlatformRouter), so only changes
+made by other processes take up to ttl seconds to become effective.
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlmodel import select
+
+from database.model.platform.platform import Platform
+from database.session import DbSession
+
+
+class PlatformRegistry:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._names: frozenset[str] | None = None
+        self._expiry = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def names(self, session: Session | None = None) -> frozenset[str]:
+        """
+        The names of all platforms, loaded from the database if the cache expired. They are
+        loaded using the given session if any (e.g. the session of an endpoint that reads using
+        the async engine), and using a new session otherwise.
+        """
+        with self._lock:
+            if self._names is not None and time.monotonic() < self._expiry:
+                return self._names
+            generation = self._generation
+        if session is not None:
+            names = frozenset(session.scalars(select(Platform.name)).all())
+        else:
+            with DbSession() as new_session:
+                names = frozenset(new_session.scalars(select(Platform.name)).all())
+        with self._lock:
+            if generation == self._generation:  # Not invalidated while loading
+                self._names, self._expiry = names, time.monotonic() + self.ttl
+        return names
+
+    def invalidate(self):
+        with self._lock:
+            self._names = None
+            self._generation += 1
+
+
+platform_registry = PlatformRegistry(ttl=60)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_platform_changes(session: Session, flush_context):
+    if any(
+        isinstance(instance, Platform)
+        for instances in (session.new, session.dirty, session.deleted)
+        for instance in instances
+    ):
+        session.info["platforms_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_platform_registry(session: Session):
+    if session.info.pop("platforms_changed", False):
+        platform_registry.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _rollback_platform_changes(session: Session, previous_transaction):
+    session.info.pop("platforms_changed", None)
@@ -8,15 +8,21 @@ See src/README.md for additional information.
 
 import abc
 import dataclasses
+import functools
+from collections import defaultdict
 from typing import Any, Type, Callable
 
 from pydantic.utils import Representation
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.strategy_options import _AbstractLoad
 from sqlmodel import Field, SQLModel
 
 from database.deletion import triggers
 from database.model import serializers
 from database.model.annotations import datatype_of_field
-from database.model.serializers import GetPathSerializer
+from database.model.helper_functions import get_relationships
+from database.model.serializers import GetPathSerializer, CastDeserializer
 
 
 @dataclasses.dataclass
@@ -82,6 +88,11 @@ class _ResourceRelationship(abc.ABC, Representation):
         For most relationships, this just returns the given attribute."""
         return attribute
 
+    @property
+    @abc.abstractmethod
+    def loader(self) -> Callable:
+        """The SQLAlchemy loader strategy used to eagerly load this relationship."""
+
 
 @dataclasses.dataclass
 class _ResourceRelationshipSingle(_ResourceRelationship):
@@ -101,6 +112,11 @@ class _ResourceRelationshipSingle(_ResourceRelationship):
     def attribute(self, attribute: str) -> str:
         return self.identifier_name if self.identifier_name else attribute
 
+    @property
+    def loader(self) -> Callable:
+        """A single related object can be retrieved in the same query, using a JOIN."""
+        return joinedload
+
 
 @dataclasses.dataclass
 class _ResourceRelationshipList(_ResourceRelationship):
@@ -118,6 +134,12 @@ class _ResourceRelationshipList(_ResourceRelationship):
         as [0] for a list[int], and [""] for a list[str]."""
         self.example = example if example is not None else []  # type: ignore
 
+    @property
+    def loader(self) -> Callable:
+        """A list of related objects is retrieved in a single additional query for all parents,
+        to avoid multiplying the number of rows of the parent query."""
+        return selectinload
+
 
 @dataclasses.dataclass
 class OneToOne(_ResourceRelationshipSingle):
@@ -219,3 +241,51 @@ class ManyToMany(_ResourceRelationshipList):
             triggers.create_deletion_trigger_many_to_many(
                 trigger=parent_class, link=link, to_delete=to_delete, other_links=other_links
             )
+
+
+@functools.cache
+def get_loader_options(
+    resource_class: Type[SQLModel], fields: frozenset[str] | None = None
+) -> tuple[_AbstractLoad, ...]:
+    """
+    The SQLAlchemy loader options to eagerly load all relationships that are needed to
+    serialize this resource, derived from its RelationshipConfig. Without these options,
+    each relationship is lazily loaded during serialization, resulting in one or more queries
+    per resource. If fields are given, only the relationships needed to serialize those fields
+    are loaded.
+
+    Related objects that are completely present in the json (e.g. aiod_entry or distribution,
+    deserialized using a CastDeserializer) are loaded recursively.
+    """
+    relationships = get_relationships(resource_class)
+    if not relationships:
+        return ()
+    mapper_relationships = inspect(resource_class).relationships
+    selected = {
+        attribute: relationship
+        for attribute, relationship in relationships.items()
+        if fields is None or attribute in fields
+    }
+
+    nested_options = defaultdict(list)
+    for attribute, relationship in selected.items():
+        if relationship.deserialized_path is not None:
+            # E.g. has_part, which is stored as ai_resource_identifier.has_part
+            inner_class = mapper_relationships[relationship.deserialized_path].mapper.class_
+            nested_options[relationship.deserialized_path].append(
+                relationship.loader(getattr(inner_class, attribute))
+            )
+
+    options = []
+    for attribute, relationship in relationships.items():
+        if relationship.deserialized_path is not None or attribute not in mapper_relationships:
+            continue
+        if attribute not in selected and attribute not in nested_options:
+            continue
+        child_options = nested_options[attribute]
+        if isinstance(relationship.deserializer, CastDeserializer):
+            child_class = mapper_relationships[attribute].mapper.class_
+            child_options.extend(get_loader_options(child_class))
+        loader = relationship.loader(getattr(resource_class, attribute))
+        options.append(loader.options(*child_options) if child_options else loader)
+    return tuple(options)
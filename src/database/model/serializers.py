@@ -4,6 +4,8 @@ from typing import Any, TypeVar, Generic, Dict, List, Type
 
 from fastapi import HTTPException
 from pydantic.utils import GetterDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SqlAlchemySession, make_transient_to_detached
 from sqlmodel import SQLModel, Session, select
 from starlette.status import HTTP_404_NOT_FOUND
 
@@ -123,6 +125,97 @@ class FindByIdentifierDeserializerList(DeSerializer[SQLModel]):
         return sorted(existing, key=lambda o: o.identifier)
 
 
+class NamedRelationCache:
+    """
+    Session-scoped cache of the identifiers of NamedRelations, by class and name.
+
+    NamedRelations are never updated, so the identifier of a name does not change, but a
+    NamedRelation can be deleted: the orphans of some NamedRelations (e.g. keywords) are deleted
+    by triggers, after the hard deletion of the resources that used them. A cached identifier can
+    therefore refer to a row that no longer exists, making the flush of a resource using it fail.
+    On a rollback, all entries used in the rolled-back transaction are therefore forgotten, so
+    that they are looked up (or created) again. Use NamedRelationCache.of(session) to obtain the
+    cache of a session, so that it is shared between all deserializations using that session
+    (e.g. a bulk request, or a complete synchronization run of a connector).
+    """
+
+    def __init__(self):
+        self._identifiers: dict[tuple[type[NamedRelation], str], int] = {}
+        # The entries used in the current transaction, forgotten on a rollback
+        self._used: set[tuple[type[NamedRelation], str]] = set()
+        # The objects created in the current transaction. Keeping a reference makes sure they
+        # stay in the identity map of the session, so they will be expunged on a rollback.
+        self._created: dict[tuple[type[NamedRelation], str], NamedRelation] = {}
+        # The objects added to the session without querying the database in the current
+        # transaction, expunged on a rollback because their row may not exist
+        self._attached: list[NamedRelation] = []
+
+    @staticmethod
+    def of(session: Session) -> "NamedRelationCache":
+        return session.info.setdefault("named_relation_cache", NamedRelationCache())
+
+    def identifiers(
+        self, session: Session, clazz: type[NamedRelation], names: list[str]
+    ) -> list[int]:
+        """The identifiers of the names, creating the NamedRelations that do not exist yet."""
+        missing = list(dict.fromkeys(n for n in names if (clazz, n) not in self._identifiers))
+        if missing:
+            query = select(clazz.identifier, clazz.name).where(
+                clazz.name.in_(missing)  # type: ignore[attr-defined]
+            )
+            found = {name: identifier for identifier, name in session.execute(query)}
+            new_objects = [clazz(name=name) for name in missing if name not in found]
+            if new_objects:
+                session.add_all(new_objects)
+                session.flush()
+                found |= {o.name: o.identifier for o in new_objects}
+                self._created |= {(clazz, o.name): o for o in new_objects}
+            for name in missing:
+                self._identifiers[(clazz, name)] = found[name]
+        self._used.update((clazz, name) for name in names)
+        return [self._identifiers[(clazz, name)] for name in names]
+
+    def instance(self, session: Session, clazz: type[NamedRelation], identifier: int, name: str):
+        """The persistent NamedRelation, without querying the database."""
+        if (created := self._created.get((clazz, name))) is not None:
+            return created
+        existing = session.identity_map.get(session.identity_key(clazz, identifier))
+        if existing is not None:
+            return existing
+        instance = clazz(identifier=identifier, name=name)
+        make_transient_to_detached(instance)
+        session.add(instance)
+        self._attached.append(instance)
+        return instance
+
+    def commit(self):
+        self._used.clear()
+        self._created.clear()
+        self._attached.clear()
+
+    def rollback(self, session: Session):
+        for key in self._used:
+            self._identifiers.pop(key, None)
+        for instance in self._attached:
+            if instance in session:
+                session.expunge(instance)
+        self._used.clear()
+        self._created.clear()
+        self._attached.clear()
+
+
+@event.listens_for(SqlAlchemySession, "after_commit")
+def _commit_named_relation_cache(session: SqlAlchemySession):
+    if (cache := session.info.get("named_relation_cache")) is not None:
+        cache.commit()
+
+
+@event.listens_for(SqlAlchemySession, "after_soft_rollback")
+def _rollback_named_relation_cache(session: SqlAlchemySession, previous_transaction):
+    if (cache := session.info.get("named_relation_cache")) is not None:
+        cache.rollback(session)
+
+
 @dataclasses.dataclass
 class FindByNameDeserializer(DeSerializer[NamedRelation]):
     """Deserialization of NamedRelations: uniquely identified by their name."""
@@ -136,14 +229,9 @@ class FindByNameDeserializer(DeSerializer[NamedRelation]):
             raise ValueError(
                 "Expected a single value. Do you need to use " "FindByNameDeserializerList instead?"
             )
-        name = name.lower()
-        query = select(self.clazz.identifier).where(self.clazz.name == name)
-        identifier = session.scalars(query).first()
-        if identifier is None:
-            new_object = self.clazz(name=name)
-            session.add(new_object)
-            session.flush()
-            identifier = new_object.identifier
+        (identifier,) = NamedRelationCache.of(session).identifiers(
+            session, self.clazz, [name.lower()]
+        )
         return identifier
 
 
@@ -158,15 +246,13 @@ class FindByNameDeserializerList(DeSerializer[NamedRelation]):
             return []
         if not isinstance(name, list):
             raise ValueError("Expected a list. Do you need to use FindByNameDeserializer instead?")
-        names = [n.lower() for n in name]
-        query = select(self.clazz).where(self.clazz.name.in_(names))  # type: ignore[attr-defined]
-        existing = session.scalars(query).all()
-        names_not_found = set(names) - {e.name for e in existing}
-        new_objects = [self.clazz(name=name) for name in names_not_found]
-        if any(names_not_found):
-            session.add_all(new_objects)
-            session.flush()
-        return sorted(existing + new_objects, key=lambda o: o.identifier)
+        names = list(dict.fromkeys(n.lower() for n in name))
+        cache = NamedRelationCache.of(session)
+        identifiers = cache.identifiers(session, self.clazz, names)
+        return [
+            cache.instance(session, self.clazz, identifier, name)
+            for identifier, name in sorted(zip(identifiers, names))
+        ]
 
 
 @dataclasses.dataclass
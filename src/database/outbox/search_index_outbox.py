@@ -0,0 +1,74 @@
+"""
+Transactional outbox of changes to the resources that are indexed in Elasticsearch.
+
+On every flush of an ORM session, an event is inserted for each new, changed or deleted resource
+of an indexed type (once per resource per transaction), within the same transaction as the
+change itself. This covers all writes using the ORM, such as the create, update and delete
+endpoints of the ResourceRouter and the synchronization of the connectors, including changes to
+relationships (such as keywords) that do not change aiod_entry.date_modified. Events of a rolled
+back transaction are rolled back as well.
+
+An event only identifies the resource. The consumer (setup/es_indexer/indexer.py --outbox)
+reads the committed state of the resource, and indexes it or removes it from the index, so that
+the events can be processed in batches, repeatedly, and in any order.
+"""
+import functools
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from sqlmodel import Field, SQLModel
+
+from config import SEARCH_INDEX_CONFIG
+from database.model.concept.concept import AIoDConcept
+from database.model.field_length import NORMAL
+
+OUTBOX_ENABLED = SEARCH_INDEX_CONFIG.get("outbox", False)
+
+
+class SearchIndexEvent(SQLModel, table=True):  # type: ignore [call-arg]
+    __tablename__ = "search_index_outbox"
+
+    identifier: int | None = Field(primary_key=True, default=None)
+    resource_type: str = Field(max_length=NORMAL, description="The table name of the resource")
+    resource_identifier: int
+
+
+@functools.cache
+def indexed_resource_types() -> frozenset[str]:
+    """The table names of the resources that are indexed in Elasticsearch."""
+    from routers.search_routers import router_list  # Imported here to avoid circular imports
+
+    return frozenset(router.resource_class.__tablename__ for router in router_list)
+
+
+@event.listens_for(Session, "after_flush")
+def _write_events(session: Session, flush_context):
+    if not OUTBOX_ENABLED:
+        return
+    indexed = indexed_resource_types()
+    written = session.info.setdefault("search_index_outbox", set())
+    changed = {
+        (instance.__tablename__, instance.identifier)
+        for instances in (session.new, session.dirty, session.deleted)
+        for instance in instances
+        if isinstance(instance, AIoDConcept) and instance.__tablename__ in indexed
+    } - written
+    if changed:
+        written.update(changed)
+        session.connection().execute(
+            insert(SearchIndexEvent.__table__),  # type: ignore [attr-defined]
+            [
+                {"resource_type": resource_type, "resource_identifier": identifier}
+                for resource_type, identifier in sorted(changed)
+            ],
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _commit_written_events(session: Session):
+    session.info.pop("search_index_outbox", None)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _rollback_written_events(session: Session, previous_transaction):
+    session.info.pop("search_index_outbox", None)
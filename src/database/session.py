@@ -1,11 +1,17 @@
 """
 Enabling access to database sessions.
+
+Besides the (blocking) engine and sessions, used by most of the code such as the connectors, an
+async engine and sessions are available for the endpoints that only read from the database.
 """
 
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator
 
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from config import DB_CONFIG
 
@@ -26,15 +32,34 @@ class EngineSingleton:
         self.__monostate["engine"] = engine  # type: ignore
 
 
-def db_url(including_db=True):
+class AsyncEngineSingleton:
+    """Making sure the async engine is created only once."""
+
+    __monostate = None
+
+    def __init__(self):
+        if not AsyncEngineSingleton.__monostate:
+            AsyncEngineSingleton.__monostate = self.__dict__
+            self.engine = create_async_engine(
+                db_url(driver="aiomysql"), echo=False, pool_recycle=3600
+            )
+        else:
+            self.__dict__ = AsyncEngineSingleton.__monostate
+
+    def patch(self, engine: AsyncEngine):
+        self.__monostate["engine"] = engine  # type: ignore
+
+
+def db_url(including_db=True, driver: str | None = None):
     username = DB_CONFIG.get("name", "root")
     password = DB_CONFIG.get("password", "ok")
     host = DB_CONFIG.get("host", "demodb")
     port = DB_CONFIG.get("port", 3306)
     database = DB_CONFIG.get("database", "aiod")
+    dialect = "mysql" if driver is None else f"mysql+{driver}"
     if including_db:
-        return f"mysql://{username}:{password}@{host}:{port}/{database}"
-    return f"mysql://{username}:{password}@{host}:{port}"
+        return f"{dialect}://{username}:{password}@{host}:{port}/{database}"
+    return f"{dialect}://{username}:{password}@{host}:{port}"
 
 
 @contextmanager
@@ -50,3 +75,19 @@ def DbSession(autoflush: bool = True) -> Session:
         yield session
     finally:
         session.close()
+
+
+@asynccontextmanager
+async def AsyncDbSession(autoflush: bool = True) -> AsyncIterator[AsyncSession]:
+    """
+    Returning an async SQLModel session bound to the (configured) async database engine.
+
+    Code written for a (blocking) Session can be reused using `await session.run_sync(function)`,
+    which calls the function with a Session of which the database access does not block the
+    event loop.
+    """
+    session = AsyncSession(AsyncEngineSingleton().engine, autoflush=autoflush)
+    try:
+        yield session
+    finally:
+        await session.close()
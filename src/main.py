@@ -15,6 +15,7 @@ from sqlmodel import select
 
 from authentication import get_user_or_raise, User
 from config import KEYCLOAK_CONFIG
+from database.counts.resource_count import ResourceCount, get_counts, reconcile_counts
 from database.deletion.triggers import add_delete_triggers
 from database.model.concept.concept import AIoDConcept
 from database.model.platform.platform import Platform
@@ -71,11 +72,13 @@ def add_routes(app: FastAPI, url_prefix=""):
 
     @app.get(url_prefix + "/counts/v1")
     def counts() -> dict:
+        with DbSession() as session:
+            counts_per_table = get_counts(session)
         return {
             router.resource_name_plural: count
             for router in resource_routers.router_list
             if issubclass(router.resource_class, AIoDConcept)
-            and (count := router.get_resource_count_func()(detailed=True))
+            and (count := counts_per_table.get(router.resource_class.__tablename__))
         }
 
     for router in (
@@ -123,6 +126,9 @@ def create_app() -> FastAPI:
             # whether platforms are already present. If platforms were not present, the db is
             # empty, and so the triggers should still be added.
             add_delete_triggers(AIoDConcept)
+        if session.scalars(select(ResourceCount)).first() is None:
+            # The counts are kept up to date on each change, but should be initialized once
+            reconcile_counts(session)
 
     add_routes(app, url_prefix=args.url_prefix)
     return app
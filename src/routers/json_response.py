@@ -0,0 +1,82 @@
+"""
+Fast serialization of the responses of the resource and search endpoints.
+
+By default, FastAPI converts a returned model to a dict, validates this dict again against the
+response_model of the endpoint, converts the validated model using jsonable_encoder, and finally
+encodes it using the json module of the standard library. For a page of 1000 resources, this is
+a considerable part of the response time.
+
+The FastJSONResponse converts the models directly, recursively keeping only the fields of the
+declared types (which is effectively what the validation against the response_model does, e.g.
+dropping the identifiers of related ORM objects that are not part of their Read class), and
+encodes the result to bytes using orjson. It is optional, and only used if fast_json is enabled
+in the [responses] section of the configuration.
+"""
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+from config import RESPONSES_CONFIG
+
+FAST_JSON_ENABLED = RESPONSES_CONFIG.get("fast_json", False)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    A JSONResponse that serializes (lists of) pydantic models using orjson.
+
+    If declared_types is True, nested models are serialized using the fields of the type
+    declared on their parent, as if validated against a response_model. Otherwise, all fields of
+    the actual models are serialized, like jsonable_encoder does.
+    """
+
+    def __init__(
+        self,
+        content: Any,
+        headers: dict[str, str] | None = None,
+        exclude_none: bool = False,
+        declared_types: bool = True,
+    ):
+        self.exclude_none = exclude_none
+        self.declared_types = declared_types
+        super().__init__(content, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            to_jsonable(content, self.exclude_none, self.declared_types),
+            default=jsonable_encoder,
+        )
+
+
+def to_jsonable(
+    value: Any, exclude_none: bool = False, declared_types: bool = True, type_: Any = None
+) -> Any:
+    """
+    Convert the models in the value to dicts, leaving the other values that can be encoded by
+    orjson (such as datetimes and enums) as they are.
+    """
+    if isinstance(value, BaseModel):
+        model_class = type(value)
+        if declared_types and isinstance(type_, type) and isinstance(value, type_):
+            model_class = type_
+        content = {}
+        for name, field in model_class.__fields__.items():
+            field_value = getattr(value, name)
+            if field_value is None and exclude_none:
+                continue
+            content[field.alias] = to_jsonable(
+                field_value, exclude_none, declared_types, field.type_
+            )
+        return content
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_jsonable(item, exclude_none, declared_types, type_) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: to_jsonable(item, exclude_none, declared_types, type_)
+            for key, item in value.items()
+            if item is not None or not exclude_none
+        }
+    return value
@@ -1,36 +1,51 @@
 import abc
+import base64
+import binascii
 import datetime
+import hashlib
+import json
 import traceback
 from functools import partial
-from typing import Annotated, Any, Literal, Sequence, Type, TypeVar, Union
+from email.utils import parsedate_to_datetime
+from typing import Annotated, Any, Iterable, Iterator, Literal, Sequence, Type, TypeVar, Union
 from wsgiref.handlers import format_date_time
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Header
 from fastapi.encoders import jsonable_encoder
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from sqlalchemy import and_, func
 from sqlalchemy.sql.operators import is_
 from sqlmodel import SQLModel, Session, select, Field
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
 from authentication import User, get_user_or_none, get_user_or_raise
 from config import KEYCLOAK_CONFIG
+from database.counts.resource_count import get_counts
+from database.documents import resource_document
+from database.documents.resource_document import ResourceDocument
 from converters.schema_converters.schema_converter import SchemaConverter
 from database.model.ai_resource.resource import AbstractAIResource
+from database.model.concept.aiod_entry import AIoDEntryORM
 from database.model.concept.concept import AIoDConcept
 from database.model.platform.platform import Platform
-from database.model.platform.platform_names import PlatformName
+from database.model.platform.platform_registry import platform_registry
+from database.model.relationships import get_loader_options
 from database.model.resource_read_and_create import (
     resource_create,
     resource_read,
 )
 from database.model.serializers import deserialize_resource_relationships
-from database.session import DbSession
+from database.session import AsyncDbSession, DbSession
 from error_handling import as_http_exception
+from routers import json_response
+from routers.json_response import FastJSONResponse
+
+# Registers the listener that records the changes to indexed resources in the outbox
+import database.outbox.search_index_outbox  # noqa: F401
 
 
 class Pagination(BaseModel):
-    """Offset-based pagination."""
+    """Offset-based or cursor-based (keyset) pagination."""
 
     offset: int = Field(
         Query(
@@ -46,7 +61,77 @@ class Pagination(BaseModel):
             le=1000,
         )
     )
+    cursor: str | None = Field(
+        Query(
+            description="An opaque cursor, as returned in the `next-cursor` header of a "
+            "previous response. If given, the resources after the last resource of that "
+            "previous response are returned. Contrary to the offset, the cost of retrieving a "
+            "page using a cursor does not grow with the position of the page, so this is the "
+            "advised way to retrieve all resources. Cannot be combined with an offset.",
+            default=None,
+        )
+    )
+
 
+class ConditionalHeaders(BaseModel):
+    """The headers of a conditional GET request."""
+
+    if_none_match: str | None = Field(
+        Header(
+            description="The ETag(s) of the copy held by the client. If the resource(s) did not "
+            "change, a 304 Not Modified without content is returned.",
+            default=None,
+        )
+    )
+    if_modified_since: str | None = Field(
+        Header(
+            description="The Last-Modified of the copy held by the client. If the resource(s) "
+            "did not change since, a 304 Not Modified without content is returned. Ignored if "
+            "If-None-Match is given.",
+            default=None,
+        )
+    )
+
+    @property
+    def is_conditional(self) -> bool:
+        return self.if_none_match is not None or self.if_modified_since is not None
+
+    def not_modified(self, etag: str, last_modified: datetime.datetime | None) -> bool:
+        """Whether the copy of the client matches the given validators (RFC 9110, 13.1)."""
+        if self.if_none_match is not None:
+            client_etags = {tag.strip().removeprefix("W/") for tag in self.if_none_match.split(",")}
+            return "*" in client_etags or etag.removeprefix("W/") in client_etags
+        if self.if_modified_since is not None and last_modified is not None:
+            try:
+                if_modified_since = parsedate_to_datetime(self.if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if if_modified_since.tzinfo is None:
+                return False
+            return last_modified.replace(microsecond=0) <= if_modified_since.astimezone(
+                datetime.timezone.utc
+            ).replace(tzinfo=None)
+        return False
+
+
+class BulkCreateResult(BaseModel):
+    """The result of creating a single resource using the bulk endpoint."""
+
+    identifier: int | None = Field(
+        description="The identifier of the created resource, if it was created.", default=None
+    )
+    status_code: int = Field(
+        description="The status code that the (single) POST endpoint would have returned for "
+        "this resource."
+    )
+    detail: Any = Field(
+        description="The reason why this resource could not be created.", default=None
+    )
+
+
+EXPORT_BATCH_SIZE = 500
+BULK_MAX_SIZE = 1000
+BULK_BATCH_SIZE = 100
 
 RESOURCE = TypeVar("RESOURCE", bound=AbstractAIResource)
 RESOURCE_CREATE = TypeVar("RESOURCE_CREATE", bound=SQLModel)
@@ -60,10 +145,12 @@ class ResourceRouter(abc.ABC):
 
     It creates the basic endpoints for each resource:
     - GET /[resource]s/
+    - GET /[resource]s/export
     - GET /[resource]s/{identifier}
     - GET /platforms/{platform_name}/[resource]s/
     - GET /platforms/{platform_name}/[resource]s/{identifier}
     - POST /[resource]s
+    - POST /[resource]s/bulk
     - PUT /[resource]s/{identifier}
     - DELETE /[resource]s/{identifier}
     """
@@ -157,6 +244,27 @@ class ResourceRouter(abc.ABC):
             description=f"Register a {self.resource_name} with AIoD.",
             **default_kwargs,
         )
+        router.add_api_route(
+            path=f"{url_prefix}/{self.resource_name_plural}/{version}/bulk",
+            methods={"POST"},
+            endpoint=self.register_resources_func(),
+            response_model=list[BulkCreateResult],
+            name=f"Bulk register {self.resource_name_plural}",
+            description=f"Register multiple {self.resource_name_plural} with AIoD in a single "
+            f"request (at most {BULK_MAX_SIZE}). The result of each "
+            f"{self.resource_name} is returned in the same order. A failure for one "
+            f"{self.resource_name} does not prevent the others from being created.",
+            **default_kwargs,
+        )
+        router.add_api_route(
+            path=f"{url_prefix}/{self.resource_name_plural}/{version}/export",
+            endpoint=self.export_resources_func(),
+            response_class=StreamingResponse,
+            name=f"Export {self.resource_name_plural}",
+            description=f"Stream all meta-data of the {self.resource_name_plural} as "
+            "newline-delimited json (one resource per line).",
+            **default_kwargs,
+        )
         router.add_api_route(
             path=url_prefix + f"/{self.resource_name_plural}/{version}/{{identifier}}",
             endpoint=self.get_resource_func(),
@@ -210,22 +318,98 @@ class ResourceRouter(abc.ABC):
         pagination: Pagination,
         user: User | None = None,
         platform: str | None = None,
+        conditions: ConditionalHeaders | None = None,
+        response: Response | None = None,
+        fields: str | None = None,
     ):
-        """Fetch all resources of this platform in given schema, using pagination"""
-        _raise_error_on_invalid_schema(self._possible_schemas, schema)
+        """
+        Fetch all resources of this platform in given schema, using pagination. If the
+        conditional headers show that the page of the client is still up-to-date, a 304 Not
+        Modified is returned without loading the resources. If fields are given, only those
+        fields of the resources are loaded and returned.
+        """
         with DbSession(autoflush=False) as session:
-            try:
-                convert_schema = (
-                    partial(self.schema_converters[schema].convert, session)
-                    if schema != "aiod"
-                    else self.resource_class_read.from_orm
-                )
-                resources: Any = self._retrieve_resources_and_post_process(
-                    session, pagination, user, platform
+            return self._get_resources(
+                session, schema, pagination, user, platform, conditions, response, fields
+            )
+
+    async def get_resources_async(
+        self,
+        schema: str,
+        pagination: Pagination,
+        user: User | None = None,
+        platform: str | None = None,
+        conditions: ConditionalHeaders | None = None,
+        response: Response | None = None,
+        fields: str | None = None,
+    ):
+        """Like get_resources, but without blocking the event loop while waiting for the
+        database."""
+        async with AsyncDbSession(autoflush=False) as session:
+            return await session.run_sync(
+                self._get_resources,
+                schema,
+                pagination,
+                user,
+                platform,
+                conditions,
+                response,
+                fields,
+            )
+
+    def _get_resources(
+        self,
+        session: Session,
+        schema: str,
+        pagination: Pagination,
+        user: User | None,
+        platform: str | None,
+        conditions: ConditionalHeaders | None,
+        response: Response | None,
+        fields: str | None,
+    ):
+        _raise_error_on_invalid_schema(self._possible_schemas, schema)
+        try:
+            selected = self._parse_fields(fields, schema)
+            if conditions is not None and conditions.is_conditional:
+                versions = self._retrieve_versions(session, pagination, platform)
+                if versions is not None and (
+                    response := self._not_modified(
+                        conditions, versions, schema, user, fields=selected
+                    )
+                ):
+                    if len(versions) == pagination.limit:
+                        response.headers["Next-Cursor"] = _encode_cursor(versions[-1][0])
+                    return response
+            if schema == "aiod" and selected is None and self._serves_documents:
+                page = self._retrieve_documents(session, pagination, platform)
+                if page is not None:
+                    documents, versions = page
+                    headers = self._validator_headers(versions, schema, user)
+                    if len(versions) == pagination.limit:
+                        headers["Next-Cursor"] = _encode_cursor(versions[-1][0])
+                    return self._document_response(f"[{','.join(documents)}]", headers)
+            convert_schema = self._schema_converter(session, schema)
+            resources: Any = self._retrieve_resources_and_post_process(
+                session, pagination, user, platform, fields=selected
+            )
+            headers = self._validator_headers(
+                self._versions(resources), schema, user, fields=selected
+            )
+            if resources and len(resources) == pagination.limit:
+                headers["Next-Cursor"] = _encode_cursor(resources[-1].identifier)
+            if selected is not None:
+                return self._sparse_response(
+                    [self._sparse_fieldset(resource, selected) for resource in resources],
+                    headers,
                 )
-                return self._wrap_with_headers([convert_schema(resource) for resource in resources])
-            except Exception as e:
-                raise as_http_exception(e)
+            return self._wrap_with_headers(
+                [convert_schema(resource) for resource in resources],
+                headers=headers,
+                response=response,
+            )
+        except Exception as e:
+            raise as_http_exception(e)
 
     def get_resource(
         self, identifier: str, schema: str, user: User | None = None, platform: str | None = None
@@ -240,9 +424,96 @@ class ResourceRouter(abc.ABC):
                 resource: Any = self._retrieve_resource_and_post_process(
                     session, identifier, user, platform=platform
                 )
-                if schema != "aiod":
-                    return self.schema_converters[schema].convert(session, resource)
-                return self._wrap_with_headers(self.resource_class_read.from_orm(resource))
+                return self._schema_converter(session, schema)(resource)
+        except Exception as e:
+            raise as_http_exception(e)
+
+    def get_resource_conditionally(
+        self,
+        identifier: str,
+        schema: str,
+        conditions: ConditionalHeaders,
+        user: User | None = None,
+        platform: str | None = None,
+        response: Response | None = None,
+        fields: str | None = None,
+    ):
+        """
+        Like get_resource, but including the ETag and Last-Modified headers in the response. If
+        the conditional headers show that the copy of the client is still up-to-date, a 304 Not
+        Modified is returned after a single lookup, without loading the relationships. If fields
+        are given, only those fields of the resource are loaded and returned.
+        """
+        with DbSession(autoflush=False) as session:
+            return self._get_resource_conditionally(
+                session, identifier, schema, conditions, user, platform, response, fields
+            )
+
+    async def get_resource_conditionally_async(
+        self,
+        identifier: str,
+        schema: str,
+        conditions: ConditionalHeaders,
+        user: User | None = None,
+        platform: str | None = None,
+        response: Response | None = None,
+        fields: str | None = None,
+    ):
+        """Like get_resource_conditionally, but without blocking the event loop while waiting
+        for the database."""
+        async with AsyncDbSession(autoflush=False) as session:
+            return await session.run_sync(
+                self._get_resource_conditionally,
+                identifier,
+                schema,
+                conditions,
+                user,
+                platform,
+                response,
+                fields,
+            )
+
+    def _get_resource_conditionally(
+        self,
+        session: Session,
+        identifier: str,
+        schema: str,
+        conditions: ConditionalHeaders,
+        user: User | None,
+        platform: str | None,
+        response: Response | None,
+        fields: str | None,
+    ):
+        _raise_error_on_invalid_schema(self._possible_schemas, schema)
+        try:
+            selected = self._parse_fields(fields, schema)
+            if conditions.is_conditional:
+                versions = self._retrieve_version(session, identifier, platform)
+                if versions and (
+                    response := self._not_modified(
+                        conditions, versions, schema, user, fields=selected
+                    )
+                ):
+                    return response
+            if schema == "aiod" and selected is None and self._serves_documents:
+                stored = self._retrieve_document(session, identifier, platform)
+                if stored is not None:
+                    document, versions = stored
+                    headers = self._validator_headers(versions, schema, user)
+                    return self._document_response(document, headers)
+            resource: Any = self._retrieve_resource_and_post_process(
+                session, identifier, user, platform=platform, fields=selected
+            )
+            headers = self._validator_headers(
+                self._versions([resource]), schema, user, fields=selected
+            )
+            if selected is not None:
+                return self._sparse_response(self._sparse_fieldset(resource, selected), headers)
+            return self._wrap_with_headers(
+                self._schema_converter(session, schema)(resource),
+                headers=headers,
+                response=response,
+            )
         except Exception as e:
             raise as_http_exception(e)
 
@@ -253,18 +524,114 @@ class ResourceRouter(abc.ABC):
         docstring and the variables are dynamic, and used in Swagger.
         """
 
-        def get_resources(
+        async def get_resources(
+            response: Response,
             pagination: Pagination = Depends(),
             schema: self._possible_schemas_type = "aiod",  # type:ignore
             user: User | None = Depends(get_user_or_none),
+            conditions: ConditionalHeaders = Depends(),
+            fields: self._fields_type = None,  # type: ignore
         ):
-            resources = self.get_resources(
-                pagination=pagination, schema=schema, user=user, platform=None
+            resources = await self.get_resources_async(
+                pagination=pagination,
+                schema=schema,
+                user=user,
+                platform=None,
+                conditions=conditions,
+                response=response,
+                fields=fields,
             )
             return resources
 
         return get_resources
 
+    def export_resources_func(self):
+        """
+        Return a function that can be used to export all resources as newline-delimited json.
+        This function returns a function (instead of being that function directly) because the
+        docstring and the variables are dynamic, and used in Swagger.
+        """
+
+        def export_resources(
+            platform: Annotated[
+                str | None,
+                Query(
+                    description="Only export resources of this platform",
+                    example="huggingface",
+                ),
+            ] = None,
+            modified_since: Annotated[
+                datetime.datetime | None,
+                Query(
+                    description="Only export resources that were modified after this datetime "
+                    "(in UTC), based on aiod_entry.date_modified.",
+                    example="2023-01-01T15:15:00.000",
+                ),
+            ] = None,
+            user: User | None = Depends(get_user_or_none),
+        ):
+            if platform is not None and not hasattr(self.resource_class, "platform"):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"The {self.resource_name_plural} cannot be filtered on platform.",
+                )
+            if modified_since is not None and not hasattr(self.resource_class, "aiod_entry"):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"The {self.resource_name_plural} cannot be filtered on "
+                    "modification date.",
+                )
+            return StreamingResponse(
+                self._export_resources(platform, modified_since, user),
+                media_type="application/x-ndjson",
+                headers=self._deprecation_headers(),
+            )
+
+        return export_resources
+
+    def _export_resources(
+        self,
+        platform: str | None,
+        modified_since: datetime.datetime | None,
+        user: User | None,
+    ) -> Iterator[str]:
+        """
+        Yield all resources as json, one line per resource. The resources are fetched from the
+        database in batches of consecutive identifiers, and the session is cleared after every
+        batch, so that the memory usage does not depend on the number of resources. No cursor is
+        kept open between the batches, so the relationships of each batch can be loaded on the
+        same connection.
+        """
+        query = (
+            select(self.resource_class)
+            .where(is_(self.resource_class.date_deleted, None))
+            .order_by(self.resource_class.identifier)
+            .limit(EXPORT_BATCH_SIZE)
+            .options(*get_loader_options(self.resource_class))
+        )
+        if platform is not None:
+            query = query.where(self.resource_class.platform == platform)
+        if modified_since is not None:
+            query = query.join(self.resource_class.aiod_entry).where(
+                AIoDEntryORM.date_modified > modified_since
+            )
+        with DbSession(autoflush=False) as session:
+            last_identifier = None
+            while True:
+                batch_query = query
+                if last_identifier is not None:
+                    batch_query = query.where(self.resource_class.identifier > last_identifier)
+                resources = session.scalars(batch_query).all()
+                if not resources:
+                    return
+                last_identifier = resources[-1].identifier
+                for resource in self._mask_or_filter(resources, session, user):
+                    read_instance = self.resource_class_read.from_orm(resource)
+                    yield read_instance.json(exclude_none=True) + "\n"
+                session.expunge_all()
+                if len(resources) < EXPORT_BATCH_SIZE:
+                    return
+
     def get_resource_count_func(self):
         """
         Gets the total number of resources from the database.
@@ -279,6 +646,9 @@ class ResourceRouter(abc.ABC):
         ):
             try:
                 with DbSession() as session:
+                    if issubclass(self.resource_class, AIoDConcept):
+                        counts = get_counts(session, self.resource_class)
+                        return counts if detailed else sum(counts.values())
                     if not detailed:
                         return (
                             session.query(self.resource_class)
@@ -311,7 +681,7 @@ class ResourceRouter(abc.ABC):
         docstring and the variables are dynamic, and used in Swagger.
         """
 
-        def get_resources(
+        async def get_resources(
             platform: Annotated[
                 str,
                 Path(
@@ -320,11 +690,20 @@ class ResourceRouter(abc.ABC):
                 ),
             ],
             pagination: Annotated[Pagination, Depends(Pagination)],
+            response: Response,
             schema: self._possible_schemas_type = "aiod",  # type:ignore
             user: User | None = Depends(get_user_or_none),
+            conditions: ConditionalHeaders = Depends(),
+            fields: self._fields_type = None,  # type: ignore
         ):
-            resources = self.get_resources(
-                pagination=pagination, schema=schema, user=user, platform=platform
+            resources = await self.get_resources_async(
+                pagination=pagination,
+                schema=schema,
+                user=user,
+                platform=platform,
+                conditions=conditions,
+                response=response,
+                fields=fields,
             )
             return resources
 
@@ -337,15 +716,23 @@ class ResourceRouter(abc.ABC):
         docstring and the variables are dynamic, and used in Swagger.
         """
 
-        def get_resource(
+        async def get_resource(
             identifier: str,
+            response: Response,
             schema: self._possible_schemas_type = "aiod",  # type: ignore
             user: User | None = Depends(get_user_or_none),
+            conditions: ConditionalHeaders = Depends(),
+            fields: self._fields_type = None,  # type: ignore
         ):
-            resource = self.get_resource(
-                identifier=identifier, schema=schema, user=user, platform=None
+            return await self.get_resource_conditionally_async(
+                identifier=identifier,
+                schema=schema,
+                conditions=conditions,
+                user=user,
+                platform=None,
+                response=response,
+                fields=fields,
             )
-            return self._wrap_with_headers(resource)
 
         return get_resource
 
@@ -356,7 +743,7 @@ class ResourceRouter(abc.ABC):
         docstring and the variables are dynamic, and used in Swagger.
         """
 
-        def get_resource(
+        async def get_resource(
             identifier: Annotated[
                 str,
                 Path(
@@ -370,11 +757,20 @@ class ResourceRouter(abc.ABC):
                     example="huggingface",
                 ),
             ],
+            response: Response,
             schema: self._possible_schemas_type = "aiod",  # type:ignore
             user: User | None = Depends(get_user_or_none),
+            conditions: ConditionalHeaders = Depends(),
+            fields: self._fields_type = None,  # type: ignore
         ):
-            return self.get_resource(
-                identifier=identifier, schema=schema, user=user, platform=platform
+            return await self.get_resource_conditionally_async(
+                identifier=identifier,
+                schema=schema,
+                conditions=conditions,
+                user=user,
+                platform=platform,
+                response=response,
+                fields=fields,
             )
 
         return get_resource
@@ -412,16 +808,144 @@ class ResourceRouter(abc.ABC):
 
         return register_resource
 
-    def create_resource(self, session: Session, resource_create_instance: SQLModel):
-        """Store a resource in the database"""
+    def register_resources_func(self):
+        """
+        Return a function that can be used to register multiple resources at once.
+        This function returns a function (instead of being that function directly) because the
+        docstring is dynamic and used in Swagger.
+        """
+        clz_create = self.resource_class_create
+
+        def register_resources(
+            resources_create: list[clz_create],  # type: ignore
+            user: User = Depends(get_user_or_raise),
+        ):
+            if not user.has_any_role(
+                KEYCLOAK_CONFIG.get("role"),
+                f"create_{self.resource_name_plural}",
+                f"crud_{self.resource_name_plural}",
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"You do not have permission to create {self.resource_name_plural}.",
+                )
+            if len(resources_create) > BULK_MAX_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"At most {BULK_MAX_SIZE} {self.resource_name_plural} can be "
+                    f"registered in a single request.",
+                )
+            try:
+                with DbSession() as session:
+                    results = []
+                    for start in range(0, len(resources_create), BULK_BATCH_SIZE):
+                        end = start + BULK_BATCH_SIZE
+                        results.extend(self.create_resources(session, resources_create[start:end]))
+                    return self._wrap_with_headers(results)
+            except Exception as e:
+                raise as_http_exception(e)
+
+        return register_resources
+
+    def create_resources(
+        self, session: Session, resource_create_instances: Sequence[SQLModel]
+    ) -> list[BulkCreateResult]:
+        """
+        Store multiple resources in the database, in a single transaction. The relationships of
+        all resources are deserialized using the same session, so that related objects (such as
+        keywords) are looked up or created only once. Building a resource can fail after some of
+        its related objects have already been added to the session, so if any resource fails, the
+        transaction is rolled back and only the valid resources are built again. If the
+        transaction fails, the resources are created one by one instead, to obtain the error of
+        each resource.
+        """
+        results: list[BulkCreateResult | None] = [None] * len(resource_create_instances)
+        try:
+            indices = range(len(resource_create_instances))
+            resources = self._add_resources(session, resource_create_instances, indices, results)
+            if len(resources) < len(resource_create_instances):
+                session.rollback()
+                indices = list(resources)
+                resources = self._add_resources(
+                    session, resource_create_instances, indices, results
+                )
+                if len(resources) < len(indices):
+                    raise RuntimeError("A resource failed only when it was built again.")
+            session.flush()
+            for i, resource in resources.items():
+                results[i] = BulkCreateResult(
+                    identifier=resource.identifier, status_code=status.HTTP_200_OK
+                )
+            session.commit()
+        except Exception:
+            session.rollback()
+            return [self._create_resource_or_error(session, r) for r in resource_create_instances]
+        return results  # type: ignore [return-value]
+
+    def _add_resources(
+        self,
+        session: Session,
+        resource_create_instances: Sequence[SQLModel],
+        indices: Iterable[int],
+        results: list[BulkCreateResult | None],
+    ) -> dict[int, Any]:
+        """
+        Build the resources at the given indices and add them to the session. The result of each
+        resource that could not be built is stored in results.
+        """
+        resources = {}
+        for i in indices:
+            try:
+                resource = self.build_resource(session, resource_create_instances[i])
+            except HTTPException as e:
+                results[i] = BulkCreateResult(status_code=e.status_code, detail=e.detail)
+                continue
+            session.add(resource)
+            resources[i] = resource
+        return resources
+
+    def _create_resource_or_error(
+        self, session: Session, resource_create_instance: SQLModel
+    ) -> BulkCreateResult:
+        try:
+            resource = self.create_resource(session, resource_create_instance)
+        except Exception as e:
+            try:
+                self._raise_clean_http_exception(e, session, resource_create_instance)
+            except Exception as clean_exception:
+                http_exception = as_http_exception(clean_exception)
+                return BulkCreateResult(
+                    status_code=http_exception.status_code, detail=http_exception.detail
+                )
+        return BulkCreateResult(identifier=resource.identifier, status_code=status.HTTP_200_OK)
+
+    def build_resource(self, session: Session, resource_create_instance: SQLModel):
+        """Create a resource, including its relationships, without adding it to the session"""
         resource = self.resource_class.from_orm(resource_create_instance)
         deserialize_resource_relationships(
             session, self.resource_class, resource, resource_create_instance
         )
+        return resource
+
+    def create_resource(self, session: Session, resource_create_instance: SQLModel):
+        """Store a resource in the database"""
+        resource = self.build_resource(session, resource_create_instance)
         session.add(resource)
         session.commit()
         return resource
 
+    def update_resource(self, session: Session, resource: Any, resource_create_instance: SQLModel):
+        """Update an existing resource in place, without committing"""
+        for attribute_name in resource.schema()["properties"]:
+            if hasattr(resource_create_instance, attribute_name):
+                new_value = getattr(resource_create_instance, attribute_name)
+                setattr(resource, attribute_name, new_value)
+        deserialize_resource_relationships(
+            session, self.resource_class, resource, resource_create_instance
+        )
+        if hasattr(resource, "aiod_entry"):
+            resource.aiod_entry.date_modified = datetime.datetime.utcnow()
+
     def put_resource_func(self):
         """
         Return a function that can be used to update a resource.
@@ -448,15 +972,7 @@ class ResourceRouter(abc.ABC):
             with DbSession() as session:
                 try:
                     resource: Any = self._retrieve_resource(session, identifier)
-                    for attribute_name in resource.schema()["properties"]:
-                        if hasattr(resource_create_instance, attribute_name):
-                            new_value = getattr(resource_create_instance, attribute_name)
-                            setattr(resource, attribute_name, new_value)
-                    deserialize_resource_relationships(
-                        session, self.resource_class, resource, resource_create_instance
-                    )
-                    if hasattr(resource, "aiod_entry"):
-                        resource.aiod_entry.date_modified = datetime.datetime.utcnow()
+                    self.update_resource(session, resource, resource_create_instance)
                     try:
                         session.merge(resource)
                         session.commit()
@@ -512,25 +1028,18 @@ class ResourceRouter(abc.ABC):
         session: Session,
         identifier: int | str,
         platform: str | None = None,
+        fields: frozenset[str] | None = None,
     ) -> type[RESOURCE_MODEL]:
         """
         Retrieve a resource from the database based on the provided identifier
-        and platform (if applicable).
+        and platform (if applicable). All relationships needed for serialization (of the given
+        fields, if any) are loaded eagerly.
         """
-        if platform is None:
-            query = select(self.resource_class).where(self.resource_class.identifier == identifier)
-        else:
-            if platform not in {n.name for n in PlatformName}:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"platform '{platform}' not recognized.",
-                )
-            query = select(self.resource_class).where(
-                and_(
-                    self.resource_class.platform_resource_identifier == identifier,
-                    self.resource_class.platform == platform,
-                )
-            )
+        query = (
+            select(self.resource_class)
+            .where(self._where_identifier(session, identifier, platform))
+            .options(*get_loader_options(self.resource_class, fields))
+        )
         resource = session.scalars(query).first()
         if not resource or resource.date_deleted is not None:
             name = (
@@ -546,28 +1055,167 @@ class ResourceRouter(abc.ABC):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{name} {msg}")
         return resource
 
+    def _where_identifier(
+        self, session: Session, identifier: int | str, platform: str | None = None
+    ):
+        """The where clause selecting a resource by AIoD identifier or platform identifier."""
+        if platform is None:
+            return self.resource_class.identifier == identifier
+        if platform not in platform_registry.names(session):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"platform '{platform}' not recognized.",
+            )
+        return and_(
+            self.resource_class.platform_resource_identifier == identifier,
+            self.resource_class.platform == platform,
+        )
+
+    def _retrieve_version(
+        self,
+        session: Session,
+        identifier: int | str,
+        platform: str | None = None,
+    ) -> list[tuple[int, datetime.datetime]] | None:
+        """
+        Retrieve the identifier and date_modified of a resource, using a single lookup without
+        loading any relationships. Returns None if the resource has no aiod_entry, and an empty
+        list if it does not exist (anymore).
+        """
+        if not hasattr(self.resource_class, "aiod_entry"):
+            return None
+        query = (
+            select(self.resource_class.identifier, AIoDEntryORM.date_modified)
+            .join(self.resource_class.aiod_entry)
+            .where(
+                self._where_identifier(session, identifier, platform),
+                is_(self.resource_class.date_deleted, None),
+            )
+        )
+        return [tuple(row) for row in session.execute(query).all()]
+
+    def _retrieve_versions(
+        self,
+        session: Session,
+        pagination: Pagination,
+        platform: str | None = None,
+    ) -> list[tuple[int, datetime.datetime]] | None:
+        """
+        Retrieve the identifier and date_modified of a page of resources, using a single query
+        without loading any relationships. Returns None if the resources have no aiod_entry.
+        """
+        if not hasattr(self.resource_class, "aiod_entry"):
+            return None
+        query = self._select_page(
+            pagination, platform, self.resource_class.identifier, AIoDEntryORM.date_modified
+        ).join(self.resource_class.aiod_entry)
+        return [tuple(row) for row in session.execute(query).all()]
+
+    def _retrieve_document(
+        self,
+        session: Session,
+        identifier: int | str,
+        platform: str | None = None,
+    ) -> tuple[str, list[tuple[int, datetime.datetime]]] | None:
+        """
+        Retrieve the stored document of a resource, and its (identifier, date_modified), using a
+        single lookup. Returns None if there is no up-to-date document, or no (non-deleted)
+        resource.
+        """
+        query = self._join_documents(
+            select(
+                self.resource_class.identifier,
+                AIoDEntryORM.date_modified,
+                ResourceDocument.document,
+            ).where(
+                self._where_identifier(session, identifier, platform),
+                is_(self.resource_class.date_deleted, None),
+            )
+        )
+        row = session.execute(query).first()
+        if row is None or row.document is None:
+            return None
+        return row.document, [(row.identifier, row.date_modified)]
+
+    def _retrieve_documents(
+        self,
+        session: Session,
+        pagination: Pagination,
+        platform: str | None = None,
+    ) -> tuple[list[str], list[tuple[int, datetime.datetime]]] | None:
+        """
+        Retrieve the stored documents of a page of resources, and their (identifier,
+        date_modified), using a single query. Returns None if any resource of the page has no
+        up-to-date document.
+        """
+        query = self._join_documents(
+            self._select_page(
+                pagination,
+                platform,
+                self.resource_class.identifier,
+                AIoDEntryORM.date_modified,
+                ResourceDocument.document,
+            )
+        )
+        rows = session.execute(query).all()
+        if any(row.document is None for row in rows):
+            return None
+        return [row.document for row in rows], [(row.identifier, row.date_modified) for row in rows]
+
+    def _join_documents(self, query):
+        """Join the aiod_entry and the document, if it was stored for the current date_modified"""
+        return query.outerjoin(self.resource_class.aiod_entry).outerjoin(
+            ResourceDocument,
+            and_(
+                ResourceDocument.resource_type == self.resource_class.__tablename__,
+                ResourceDocument.identifier == self.resource_class.identifier,
+                ResourceDocument.date_modified == AIoDEntryORM.date_modified,
+            ),
+        )
+
     def _retrieve_resources(
         self,
         session: Session,
         pagination: Pagination,
         platform: str | None = None,
+        fields: frozenset[str] | None = None,
     ) -> Sequence[type[RESOURCE_MODEL]]:
         """
         Retrieve a sequence of resources from the database based on the provided identifier
-        and platform (if applicable).
+        and platform (if applicable). All relationships needed for serialization (of the given
+        fields, if any) are loaded eagerly, using a fixed number of queries independent of the
+        number of resources.
+
+        The resources are ordered by identifier. If the pagination contains a cursor, only
+        resources with a higher identifier than the one encoded in the cursor are returned.
         """
+        query = self._select_page(pagination, platform, self.resource_class).options(
+            *get_loader_options(self.resource_class, fields)
+        )
+        resources: Sequence = session.scalars(query).all()
+        return resources
+
+    def _select_page(self, pagination: Pagination, platform: str | None, *entities):
+        """Select the given entities for a page of (non-deleted) resources."""
         where_clause = and_(
             is_(self.resource_class.date_deleted, None),
             (self.resource_class.platform == platform) if platform is not None else True,
         )
-        query = (
-            select(self.resource_class)
+        if pagination.cursor is not None:
+            if pagination.offset:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="The offset cannot be used in combination with a cursor.",
+                )
+            after_identifier = _decode_cursor(pagination.cursor)
+            where_clause = and_(where_clause, self.resource_class.identifier > after_identifier)
+        return (
+            select(*entities)
             .where(where_clause)
+            .order_by(self.resource_class.identifier)
             .offset(pagination.offset)
             .limit(pagination.limit)
         )
-        resources: Sequence = session.scalars(query).all()
-        return resources
 
     def _retrieve_resource_and_post_process(
         self,
@@ -575,13 +1223,16 @@ class ResourceRouter(abc.ABC):
         identifier: int | str,
         user: User | None = None,
         platform: str | None = None,
+        fields: frozenset[str] | None = None,
     ) -> type[RESOURCE_MODEL]:
         """
         Retrieve a resource from the database based on the provided identifier
         and platform (if applicable). The user parameter can be used by subclasses to
         implement further verification on user access to the resource.
         """
-        resource: type[RESOURCE_MODEL] = self._retrieve_resource(session, identifier, platform)
+        resource: type[RESOURCE_MODEL] = self._retrieve_resource(
+            session, identifier, platform, fields
+        )
         [processed_resource] = self._mask_or_filter([resource], session, user)
         return processed_resource
 
@@ -591,6 +1242,7 @@ class ResourceRouter(abc.ABC):
         pagination: Pagination,
         user: User | None = None,
         platform: str | None = None,
+        fields: frozenset[str] | None = None,
     ) -> Sequence[type[RESOURCE_MODEL]]:
         """
         Retrieve a sequence of resources from the database based on the provided identifier
@@ -598,7 +1250,7 @@ class ResourceRouter(abc.ABC):
         implement further verification on user access to the resource.
         """
         resources: Sequence[type[RESOURCE_MODEL]] = self._retrieve_resources(
-            session, pagination, platform
+            session, pagination, platform, fields
         )
         return self._mask_or_filter(resources, session, user)
 
@@ -626,15 +1278,177 @@ class ResourceRouter(abc.ABC):
             ),
         ]
 
-    def _wrap_with_headers(self, resource):
+    @property
+    def _fields_type(self):
+        return Annotated[
+            str | None,
+            Query(
+                description="A comma-separated list of the fields to return, e.g. "
+                "`name,platform,aiod_entry`. Only the relationships needed for these fields are "
+                "loaded, so this is advised if only a few fields are needed. The identifier is "
+                "always returned. Only supported in the aiod schema.",
+            ),
+        ]
+
+    def _parse_fields(self, fields: str | None, schema: str) -> frozenset[str] | None:
+        """The requested fields of the resource_class_read, or None if all fields are requested."""
+        if fields is None:
+            return None
+        if schema != "aiod":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The fields can only be selected in the aiod schema.",
+            )
+        selected = frozenset(field.strip() for field in fields.split(",") if field.strip())
+        possible_fields = self.resource_class_read.__fields__
+        if unknown := selected - set(possible_fields):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields {sorted(unknown)}. The possible fields are "
+                f"{list(possible_fields)}.",
+            )
+        return selected | {"identifier"}
+
+    def _sparse_fieldset(self, resource: Any, fields: frozenset[str]) -> dict:
+        """
+        Serialize only the given fields of the resource, in the same way as the
+        resource_class_read. Other relationships are not accessed, so that they do not need to be
+        loaded.
+        """
+        getter = self.resource_class_read.__config__.getter_dict(resource)
+        content = {}
+        for name, field in self.resource_class_read.__fields__.items():
+            if name in fields:
+                value, errors = field.validate(getter.get(name), {}, loc=name)
+                if errors:
+                    raise ValidationError([errors], self.resource_class_read)
+                content[name] = value
+        return jsonable_encoder(content, exclude_none=True)
+
+    def _versions(self, resources: Sequence) -> list[tuple[int, datetime.datetime]] | None:
+        """The (identifier, date_modified) pairs of the resources, if they have an aiod_entry."""
+        if not hasattr(self.resource_class, "aiod_entry"):
+            return None
+        return [
+            (
+                resource.identifier,
+                resource.aiod_entry.date_modified if resource.aiod_entry is not None else None,
+            )
+            for resource in resources
+        ]
+
+    @property
+    def _serves_documents(self) -> bool:
+        """
+        Whether the stored documents (see database/documents) can be returned instead of
+        serializing the resources. This is not the case if _mask_or_filter is implemented,
+        because the documents are not masked.
+        """
+        return (
+            resource_document.DOCUMENTS_ENABLED
+            and hasattr(self.resource_class, "aiod_entry")
+            and type(self)._mask_or_filter is ResourceRouter._mask_or_filter
+        )
+
+    def _schema_converter(self, session: Session, schema: str):
+        if schema != "aiod":
+            return partial(self.schema_converters[schema].convert, session)
+        return self.resource_class_read.from_orm
+
+    def _validator_headers(
+        self,
+        versions: list[tuple[int, datetime.datetime]] | None,
+        schema: str,
+        user: User | None,
+        fields: frozenset[str] | None = None,
+    ) -> dict[str, str]:
+        """
+        The ETag and Last-Modified headers for the given (identifier, date_modified) pairs.
+
+        The representation depends on the requested schema and fields and, through
+        _mask_or_filter, on the roles of the user, so those are part of the ETag as well.
+        """
+        if versions is None or any(date_modified is None for _, date_modified in versions):
+            return {}
+        validators = [
+            self.resource_name,
+            self.version,
+            schema,
+            sorted(user.roles) if user is not None else None,
+            [(identifier, date_modified.isoformat()) for identifier, date_modified in versions],
+        ]
+        if fields is not None:
+            validators.append(sorted(fields))
+        content = json.dumps(validators)
+        headers = {"ETag": f'W/"{hashlib.sha256(content.encode()).hexdigest()}"'}
+        if versions:
+            last_modified = max(date_modified for _, date_modified in versions)
+            timestamp = last_modified.replace(tzinfo=datetime.timezone.utc).timestamp()
+            headers["Last-Modified"] = format_date_time(timestamp)
+        return headers
+
+    def _not_modified(
+        self,
+        conditions: ConditionalHeaders,
+        versions: list[tuple[int, datetime.datetime]],
+        schema: str,
+        user: User | None,
+        fields: frozenset[str] | None = None,
+    ) -> Response | None:
+        """A 304 Not Modified response if the copy of the client is up-to-date, else None."""
+        headers = self._validator_headers(versions, schema, user, fields)
+        if not headers:
+            return None
+        last_modified = max((date_modified for _, date_modified in versions), default=None)
+        if not conditions.not_modified(headers["ETag"], last_modified):
+            return None
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={**self._deprecation_headers(), **headers},
+        )
+
+    def _deprecation_headers(self) -> dict[str, str]:
         if self.deprecated_from is None:
-            return resource
+            return {}
         timestamp = datetime.datetime.combine(
             self.deprecated_from, datetime.time.min, tzinfo=datetime.timezone.utc
         ).timestamp()
-        headers = {"Deprecated": format_date_time(timestamp)}
+        return {"Deprecated": format_date_time(timestamp)}
+
+    def _wrap_with_headers(
+        self, resource, headers: dict[str, str] | None = None, response: Response | None = None
+    ):
+        """
+        Add the headers (and the Deprecated header, if applicable) to the response. If fast json
+        is enabled, the resource is serialized directly (see json_response.py). Otherwise, if the
+        response object of the endpoint is given, the headers are set on it, so that the resource
+        is still serialized using the response_model of the endpoint.
+        """
+        headers = {**self._deprecation_headers(), **(headers or {})}
+        if json_response.FAST_JSON_ENABLED:
+            return FastJSONResponse(resource, headers=headers, exclude_none=True)
+        if not headers:
+            return resource
+        if response is not None:
+            response.headers.update(headers)
+            return resource
         return JSONResponse(content=jsonable_encoder(resource, exclude_none=True), headers=headers)
 
+    def _sparse_response(self, content: dict | list[dict], headers: dict[str, str]) -> Response:
+        """
+        A response containing a sparse fieldset of the resource(s), which bypasses the
+        response_model of the endpoint (because of the missing fields).
+        """
+        return JSONResponse(content=content, headers={**self._deprecation_headers(), **headers})
+
+    def _document_response(self, content: str, headers: dict[str, str]) -> Response:
+        """A response containing the already serialized resource(s)."""
+        return Response(
+            content=content,
+            media_type="application/json",
+            headers={**self._deprecation_headers(), **headers},
+        )
+
     def _raise_clean_http_exception(
         self, e: Exception, session: Session, resource_create: AIoDConcept
     ):
@@ -704,6 +1518,25 @@ class ResourceRouter(abc.ABC):
         raise HTTPException(status_code=status_code, detail=error_msg) from e
 
 
+def _encode_cursor(identifier: int) -> str:
+    """Create an opaque cursor pointing to the resource with this identifier."""
+    return base64.urlsafe_b64encode(json.dumps({"identifier": identifier}).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> int:
+    """Return the identifier of the resource this cursor points to."""
+    try:
+        identifier = json.loads(base64.urlsafe_b64decode(cursor.encode()))["identifier"]
+        if not isinstance(identifier, int):
+            raise ValueError("The identifier should be an integer.")
+        return identifier
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor {cursor}. Please use a cursor returned by a previous request.",
+        ) from e
+
+
 def _raise_error_on_invalid_schema(possible_schemas, schema):
     if schema not in possible_schemas:
         raise HTTPException(
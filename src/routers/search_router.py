@@ -1,26 +1,94 @@
 import abc
+import base64
+import binascii
+import datetime
+import json
+import threading
+import time
+from collections import OrderedDict
 from typing import TypeVar, Generic, Any, Type, Literal, Annotated, TypeAlias
 
+from elasticsearch import Elasticsearch, NotFoundError
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from pydantic.generics import GenericModel
-from sqlmodel import SQLModel, select, Field
+from sqlmodel import SQLModel, Session, select, Field
 from starlette import status
+from starlette.concurrency import run_in_threadpool
 
-from database.model.concept.aiod_entry import AIoDEntryRead
+from database.model.ai_asset.ai_asset import AIAsset
+from database.model.concept.aiod_entry import AIoDEntryORM, AIoDEntryRead
 from database.model.concept.concept import AIoDConcept
-from database.model.platform.platform import Platform
+from database.model.platform.platform_registry import platform_registry
+from database.model.relationships import get_loader_options
 from database.model.resource_read_and_create import resource_read
-from database.session import DbSession
+from database.session import AsyncDbSession
 from error_handling import as_http_exception
+from routers import json_response
+from routers.json_response import FastJSONResponse
 from .search_routers.elasticsearch import ElasticsearchSingleton
 
 SORT = {"identifier": "asc"}
 LIMIT_MAX = 1000
+MAX_RESULT_WINDOW = 10_000  # The index.max_result_window of Elasticsearch
+CURSOR_START = "*"
+POINT_IN_TIME_KEEP_ALIVE = "5m"
+FACET_SIZE = 25  # The maximum number of values per facet
+FACET_ONLY_FIELDS = {"keyword", "license"}  # Indexed for the facets, not returned in the results
 
 RESOURCE = TypeVar("RESOURCE", bound=AIoDConcept)
 RESOURCE_READ = TypeVar("RESOURCE_READ", bound=BaseModel)
 
+READ_MODEL_KEY: TypeAlias = tuple[str, int, datetime.datetime]
+
+
+class ReadModelCache:
+    """
+    A bounded LRU cache of the read models of resources, as returned by a search with get_all,
+    keyed on (table name, identifier, date_modified). Every change of a resource using the ORM
+    updates its date_modified, including the relations to other AI resources that are changed
+    through the related resource (see database/model/ai_resource/resource.py), so the entries of
+    outdated read models are not used anymore. Writes that bypass the ORM do not update the
+    date_modified, so the entries also expire after max_age seconds.
+    """
+
+    def __init__(self, max_size: int, max_age: float):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._entries: OrderedDict[READ_MODEL_KEY, tuple[SQLModel, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: READ_MODEL_KEY) -> SQLModel | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            read_model, expiry = entry
+            if time.monotonic() >= expiry:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return read_model
+
+    def put(self, key: READ_MODEL_KEY, read_model: SQLModel):
+        with self._lock:
+            self._entries[key] = (read_model, time.monotonic() + self.max_age)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+read_model_cache = ReadModelCache(max_size=1000, max_age=60)
+
+
+class FacetValue(BaseModel):
+    value: str
+    count: int = Field(description="The number of results with this value.")
+
 
 class SearchResult(GenericModel, Generic[RESOURCE_READ]):
     total_hits: int = Field(description="The total number of results.")
@@ -29,6 +97,16 @@ class SearchResult(GenericModel, Generic[RESOURCE_READ]):
         description="The maximum number of returned results, as specified in the " "input."
     )
     offset: int = Field(description="The offset, as specified in the input.")
+    next_cursor: str | None = Field(
+        default=None,
+        description="Only when paginating using a cursor: the cursor to obtain the next page of "
+        "results, or null if this was the last page.",
+    )
+    facets: dict[str, list[FacetValue]] | None = Field(
+        default=None,
+        description=f"Only if facets are requested: for each facet, the {FACET_SIZE} most common "
+        "values among all results, with their number of results.",
+    )
 
 
 class SearchRouter(Generic[RESOURCE], abc.ABC):
@@ -39,7 +117,8 @@ class SearchRouter(Generic[RESOURCE], abc.ABC):
     @property
     @abc.abstractmethod
     def es_index(self) -> str:
-        """The name of the elasticsearch index"""
+        """The name of the elasticsearch alias, pointing to the current version of the index
+        (e.g. dataset_v2), see setup/es_indexer/reindex.py"""
 
     @property
     @abc.abstractmethod
@@ -64,10 +143,20 @@ class SearchRouter(Generic[RESOURCE], abc.ABC):
     def indexed_fields(self) -> set[str]:
         """The set of indexed fields"""
 
+    @property
+    def facets(self) -> dict[str, str]:
+        """The facets that can be requested, and the corresponding keyword field in
+        elasticsearch."""
+        facets = {"platform": "platform.keyword", "keyword": "keyword"}
+        if issubclass(self.resource_class, AIAsset):  # type: ignore [arg-type]
+            facets["license"] = "license"
+        return facets
+
     def create(self, url_prefix: str) -> APIRouter:
         router = APIRouter()
         read_class = resource_read(self.resource_class)  # type: ignore
         indexed_fields: TypeAlias = Literal[tuple(self.indexed_fields)]  # type: ignore
+        facet_names: TypeAlias = Literal[tuple(self.facets)]  # type: ignore
 
         @router.get(
             f"{url_prefix}/search/{self.resource_name_plural}/v1",
@@ -75,7 +164,7 @@ class SearchRouter(Generic[RESOURCE], abc.ABC):
             description=f"""Search for {self.resource_name_plural}.""",
             # response_model=SearchResult[read_class],  # This gives errors, so not used.
         )
-        def search(
+        async def search(
             search_query: Annotated[
                 str,
                 Query(
@@ -101,6 +190,17 @@ class SearchRouter(Generic[RESOURCE], abc.ABC):
             ] = None,
             limit: Annotated[int, Query(ge=1, le=LIMIT_MAX)] = 10,
             offset: Annotated[int, Query(ge=0)] = 0,
+            cursor: Annotated[
+                str | None,
+                Query(
+                    description="Paginate using a cursor instead of an offset, to page through "
+                    f"more than {MAX_RESULT_WINDOW} results. Use '{CURSOR_START}' for the first "
+                    "page, and the next_cursor of the previous response for the following pages, "
+                    "with the same search parameters. A cursor expires if it is not used within "
+                    f"{POINT_IN_TIME_KEEP_ALIVE}.",
+                    examples=[CURSOR_START],
+                ),
+            ] = None,
             get_all: Annotated[
                 bool,
                 Query(
@@ -108,20 +208,25 @@ class SearchRouter(Generic[RESOURCE], abc.ABC):
                     "If false, only the indexed information is returned.",
                 ),
             ] = False,
+            facets: Annotated[
+                list[facet_names] | None,
+                Query(
+                    description="Count the results per value of these fields, such as the "
+                    "number of results per platform. Do not use the '--' option in Swagger, it is "
+                    "a Swagger artifact.",
+                ),
+            ] = None,
         ):
-            try:
-                with DbSession() as session:
-                    query = select(Platform)
-                    database_platforms = session.scalars(query).all()
-                    platform_names = {p.name for p in database_platforms}
-            except Exception as e:
-                raise as_http_exception(e)
-
-            if platforms and not set(platforms).issubset(platform_names):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"The available platforms are: {platform_names}",
-                )
+            if platforms:
+                try:
+                    platform_names = set(await run_in_threadpool(platform_registry.names))
+                except Exception as e:
+                    raise as_http_exception(e)
+                if not set(platforms).issubset(platform_names):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"The available platforms are: {platform_names}",
+                    )
             fields = search_fields if search_fields else self.indexed_fields
             query_matches = [{"match": {f: search_query}} for f in fields]
             query = {"bool": {"should": query_matches, "minimum_should_match": 1}}
@@ -131,13 +236,43 @@ class SearchRouter(Generic[RESOURCE], abc.ABC):
                     "bool": {"should": platform_matches, "minimum_should_match": 1}
                 }
 
-            result = ElasticsearchSingleton().client.search(
-                index=self.es_index, query=query, from_=offset, size=limit, sort=SORT
-            )
+            aggregations = None
+            if facets:
+                aggregations = {
+                    facet: {"terms": {"field": self.facets[facet], "size": FACET_SIZE}}
+                    for facet in facets
+                }
+            es_client = ElasticsearchSingleton().client
+            next_cursor = None
+            if cursor is None:
+                if offset + limit > MAX_RESULT_WINDOW:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"The offset plus limit cannot exceed {MAX_RESULT_WINDOW}. Use "
+                        "the cursor to page through more results.",
+                    )
+                result = await run_in_threadpool(
+                    es_client.search,
+                    index=self.es_index,
+                    query=query,
+                    from_=offset,
+                    size=limit,
+                    sort=SORT,
+                    aggregations=aggregations,
+                )
+            elif offset:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="The offset cannot be used together with a cursor.",
+                )
+            else:
+                result, next_cursor = await run_in_threadpool(
+                    self._search_with_cursor, es_client, query, limit, cursor, aggregations
+                )
             total_hits = result["hits"]["total"]["value"]
             if get_all:
                 identifiers = [hit["_source"]["identifier"] for hit in result["hits"]["hits"]]
-                resources: list[SQLModel] = self._db_query(
+                resources: list[SQLModel] = await self._db_query(
                     read_class, self.resource_class, identifiers
                 )
             else:
@@ -145,46 +280,138 @@ class SearchRouter(Generic[RESOURCE], abc.ABC):
                     self._cast_resource(read_class, hit["_source"])
                     for hit in result["hits"]["hits"]
                 ]
-            return SearchResult[read_class](  # type: ignore
+            search_result = SearchResult[read_class](  # type: ignore
                 total_hits=total_hits,
                 resources=resources,
                 limit=limit,
                 offset=offset,
+                next_cursor=next_cursor,
+                facets=_facets(result) if facets else None,
             )
+            if json_response.FAST_JSON_ENABLED:
+                # Without response_model, so serialized completely like jsonable_encoder does
+                return FastJSONResponse(search_result, declared_types=False)
+            return search_result
 
         return router
 
-    def _db_query(
+    def _search_with_cursor(
+        self,
+        es_client: Elasticsearch,
+        query: dict,
+        limit: int,
+        cursor: str,
+        aggregations: dict | None = None,
+    ) -> tuple[dict, str | None]:
+        """
+        Search the page after the cursor, using a point in time so that the pages are consistent,
+        and search_after on the SORT values of the last hit of the previous page. Returns the
+        result and the cursor of the next page.
+        """
+        if cursor == CURSOR_START:
+            response = es_client.open_point_in_time(
+                index=self.es_index, keep_alive=POINT_IN_TIME_KEEP_ALIVE
+            )
+            pit_id, search_after = response["id"], None
+        else:
+            pit_id, search_after = _decode_cursor(cursor)
+        try:
+            result = es_client.search(
+                pit={"id": pit_id, "keep_alive": POINT_IN_TIME_KEEP_ALIVE},
+                query=query,
+                size=limit,
+                sort=SORT,
+                search_after=search_after,
+                aggregations=aggregations,
+            )
+        except NotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"The cursor expired. Please start again with cursor='{CURSOR_START}'.",
+            )
+        hits = result["hits"]["hits"]
+        if len(hits) < limit:
+            try:
+                es_client.close_point_in_time(id=result["pit_id"])
+            except NotFoundError:
+                pass  # Already expired
+            return result, None
+        return result, _encode_cursor(result["pit_id"], hits[-1]["sort"])
+
+    async def _db_query(
         self,
         read_class: Type[SQLModel],
         resource_class: RESOURCE,
         identifiers: list[int],
     ) -> list[SQLModel]:
+        """
+        The read models of the resources, in the order of the identifiers (the order of the
+        search hits). Read models of resources that did not change since they were last
+        serialized are taken from the read_model_cache, the others are loaded using a single
+        eagerly loading query.
+        """
         try:
-            with DbSession() as session:
-                filter_ = resource_class.identifier.in_(identifiers)  # type: ignore[attr-defined]
-                query = select(resource_class).where(filter_)
-                resources = session.scalars(query).all()
-                identifiers_found = {resource.identifier for resource in resources}
-                identifiers_missing = set(identifiers) - identifiers_found
-                if identifiers_missing:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail="Some resources, with identifiers "
-                        f"{', '.join(map(str, identifiers_missing))}, could not be found in "
-                        "the database.",
-                    )
-                return [read_class.from_orm(resource) for resource in resources]
+            async with AsyncDbSession() as session:
+                read_models = await session.run_sync(
+                    self._read_models, read_class, resource_class, identifiers
+                )
+            identifiers_missing = set(identifiers) - set(read_models)
+            if identifiers_missing:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Some resources, with identifiers "
+                    f"{', '.join(map(str, identifiers_missing))}, could not be found in "
+                    "the database.",
+                )
+            return [read_models[identifier] for identifier in identifiers]
         except Exception as e:
             raise as_http_exception(e)
 
+    @staticmethod
+    def _read_models(
+        session: Session,
+        read_class: Type[SQLModel],
+        resource_class: RESOURCE,
+        identifiers: list[int],
+    ) -> dict[int, SQLModel]:
+        """The read models of the resources that exist, by identifier."""
+        clazz: Any = resource_class
+        query_versions = (
+            select(clazz.identifier, AIoDEntryORM.date_modified)
+            .join(clazz.aiod_entry)
+            .where(clazz.identifier.in_(identifiers))
+        )
+        versions = dict(session.execute(query_versions).all())
+        read_models = {}
+        for identifier, date_modified in versions.items():
+            key = (clazz.__tablename__, identifier, date_modified)
+            if (read_model := read_model_cache.get(key)) is not None:
+                read_models[identifier] = read_model
+        identifiers_to_load = [i for i in versions if i not in read_models]
+        if identifiers_to_load:
+            query = (
+                select(clazz)
+                .where(clazz.identifier.in_(identifiers_to_load))
+                .options(*get_loader_options(clazz))
+            )
+            for resource in session.scalars(query):
+                read_model = read_class.from_orm(resource)
+                key = (
+                    clazz.__tablename__,
+                    resource.identifier,
+                    resource.aiod_entry.date_modified,
+                )
+                read_model_cache.put(key, read_model)
+                read_models[resource.identifier] = read_model
+        return read_models
+
     def _cast_resource(
         self, read_class: Type[SQLModel], resource_dict: dict[str, Any]
     ) -> Type[RESOURCE]:
         kwargs = {
             self.key_translations.get(key, key): val
             for key, val in resource_dict.items()
-            if key != "type" and not key.startswith("@")
+            if key != "type" and key not in FACET_ONLY_FIELDS and not key.startswith("@")
         }
         resource = read_class(**kwargs)
         resource.aiod_entry = AIoDEntryRead(
@@ -195,3 +422,27 @@ class SearchRouter(Generic[RESOURCE], abc.ABC):
             "html": resource_dict["description_html"],
         }
         return resource
+
+
+def _facets(result: dict) -> dict[str, list[FacetValue]]:
+    return {
+        facet: [
+            FacetValue(value=bucket["key"], count=bucket["doc_count"])
+            for bucket in aggregation["buckets"]
+        ]
+        for facet, aggregation in result["aggregations"].items()
+    }
+
+
+def _encode_cursor(pit_id: str, search_after: list) -> str:
+    content = json.dumps({"pit_id": pit_id, "search_after": search_after})
+    return base64.urlsafe_b64encode(content.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, list]:
+    """The point in time and search_after values of the cursor"""
+    try:
+        content = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return content["pit_id"], content["search_after"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Keeps the Elasticsearch indices up to date with the database
+
+This is a replacement of the Logstash JDBC pipelines generated by
+setup/logstash_setup/generate_logstash_config_files.py. For every search entity, the same
+changes are selected as by the sync_*.sql and rm_*.sql files: resources of which
+aiod_entry.date_modified is newer than the high-water mark are (re)indexed, and resources of which
+date_deleted is newer than the high-water mark are removed from the index.
+
+Instead of polling every entity every 5 seconds, the changes are pushed in batches using the
+Elasticsearch _bulk API, and the indexer only sleeps if nothing changed. The high-water marks
+(a timestamp and an identifier, to handle resources with the same timestamp) are stored in a
+state file, so that a restarted indexer continues where it left off.
+
+With --outbox, the changes recorded in the search_index_outbox table are pushed instead (see
+database/outbox/search_index_outbox.py, enabled using search_index.outbox in config.toml). This
+also covers changes that do not modify aiod_entry.date_modified, such as changed keywords.
+Resources that were changed before the outbox was enabled can be indexed by running the indexer
+once without --outbox.
+
+Launched by the es-indexer container in the docker-compose file.
+"""
+
+import argparse
+import json
+import logging
+import pathlib
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Iterator
+
+from elasticsearch import Elasticsearch
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.operators import is_, is_not
+from sqlmodel import Session
+
+from database.model.ai_asset.license import License
+from database.model.ai_resource.keyword import Keyword
+from database.model.ai_resource.text import TextORM
+from database.model.concept.aiod_entry import AIoDEntryORM
+from database.outbox.search_index_outbox import SearchIndexEvent
+from database.session import DbSession
+from routers.search_router import SearchRouter
+from routers.search_routers import router_list
+from routers.search_routers.elasticsearch import ElasticsearchSingleton
+from setup.es_setup.definitions import GLOBAL_FIELDS
+from setup_logger import setup_logger
+
+RELATIVE_PATH_STATE_JSON = pathlib.Path("state.json")
+
+
+def sync_query(router: SearchRouter) -> Select:
+    """The resources to (re)index, equivalent to sync_{es_index}.sql"""
+    clazz: Any = router.resource_class
+    extra_fields = sorted(router.indexed_fields ^ GLOBAL_FIELDS)
+    query = (
+        select(
+            clazz.identifier,
+            clazz.name,
+            clazz.platform,
+            TextORM.plain.label("description_plain"),
+            TextORM.html.label("description_html"),
+            AIoDEntryORM.date_modified.label("date_modified"),
+            *(getattr(clazz, field) for field in extra_fields),
+        )
+        .join(AIoDEntryORM, clazz.aiod_entry_identifier == AIoDEntryORM.identifier)
+        .outerjoin(TextORM, clazz.description_identifier == TextORM.identifier)
+        .where(is_(clazz.date_deleted, None))
+    )
+    if "license" in router.facets:
+        query = query.add_columns(License.name.label("license")).outerjoin(
+            License, clazz.license_identifier == License.identifier
+        )
+    return query
+
+
+def add_keywords(session: Session, router: SearchRouter, rows: list[dict]):
+    """Add the names of the keywords to the rows of the sync_query, using a single query."""
+    clazz: Any = router.resource_class
+    identifiers = [row["identifier"] for row in rows]
+    query = (
+        select(clazz.identifier, Keyword.name)
+        .join(clazz.keyword)
+        .where(clazz.identifier.in_(identifiers))
+        .order_by(Keyword.name)
+    )
+    keywords: dict[int, list[str]] = defaultdict(list)
+    for identifier, name in session.execute(query):
+        keywords[identifier].append(name)
+    for row in rows:
+        row["keyword"] = keywords[row["identifier"]]
+
+
+def rm_query(router: SearchRouter) -> Select:
+    """The resources to remove from the index, equivalent to rm_{es_index}.sql"""
+    clazz: Any = router.resource_class
+    return select(clazz.identifier, clazz.date_deleted.label("date_deleted")).where(
+        is_not(clazz.date_deleted, None)
+    )
+
+
+class Indexer:
+    def __init__(
+        self,
+        es_client: Elasticsearch,
+        routers: list[SearchRouter],
+        state: dict,
+        batch_size: int = 500,
+        indices: dict[str, str] | None = None,
+    ):
+        self.es_client = es_client
+        self.routers = routers
+        self.state = state
+        self.batch_size = batch_size
+        # The index to write to, per es_index. By default the es_index itself (an alias).
+        self.indices = indices or {}
+
+    def run_once(self, session: Session) -> int:
+        """Push all changes since the high-water marks. Returns the number of changes."""
+        n_changes = 0
+        for router in self.routers:
+            index = self.indices.get(router.es_index)
+            for batch in self._batches(session, router, sync_query(router), "date_modified"):
+                add_keywords(session, router, batch)
+                bulk(self.es_client, router.es_index, "index", batch, index=index)
+                n_changes += len(batch)
+            for batch in self._batches(session, router, rm_query(router), "date_deleted"):
+                bulk(self.es_client, router.es_index, "delete", batch, index=index)
+                n_changes += len(batch)
+        return n_changes
+
+    def _batches(
+        self, session: Session, router: SearchRouter, query: Select, tracking_column: str
+    ) -> Iterator[list[dict]]:
+        """
+        The changed rows after the high-water mark, in batches ordered by (tracking column,
+        identifier). The high-water mark is only advanced after a batch has been processed.
+        """
+        clazz: Any = router.resource_class
+        column = query.selected_columns[tracking_column]
+        marks = self.state.setdefault(router.es_index, {})
+        while True:
+            batch_query = query.order_by(column, clazz.identifier).limit(self.batch_size)
+            if tracking_column in marks:
+                timestamp, identifier = marks[tracking_column]
+                timestamp = datetime.fromisoformat(timestamp)
+                batch_query = batch_query.where(
+                    or_(
+                        column > timestamp,
+                        and_(column == timestamp, clazz.identifier > identifier),
+                    )
+                )
+            batch = [dict(row._mapping) for row in session.execute(batch_query)]
+            if not batch:
+                return
+            yield batch
+            last = batch[-1]
+            marks[tracking_column] = [last[tracking_column].isoformat(), last["identifier"]]
+            if len(batch) < self.batch_size:
+                return
+
+
+class OutboxConsumer:
+    """Pushes the changes recorded in the search index outbox, see
+    database/outbox/search_index_outbox.py"""
+
+    def __init__(
+        self, es_client: Elasticsearch, routers: list[SearchRouter], batch_size: int = 500
+    ):
+        self.es_client = es_client
+        self.routers = {router.resource_class.__tablename__: router for router in routers}
+        self.batch_size = batch_size
+
+    def run_once(self, session: Session) -> int:
+        """Drain the outbox. Returns the number of processed events."""
+        n_events = 0
+        while True:
+            query = select(SearchIndexEvent).order_by(SearchIndexEvent.identifier)
+            events = session.scalars(query.limit(self.batch_size)).all()
+            if not events:
+                return n_events
+            identifiers: dict[str, set[int]] = defaultdict(set)
+            for event in events:
+                identifiers[event.resource_type].add(event.resource_identifier)
+            for resource_type, resource_identifiers in identifiers.items():
+                if resource_type in self.routers:
+                    self._push(session, self.routers[resource_type], resource_identifiers)
+            # Only the processed events are removed: events committed in the meantime are kept
+            event_identifiers = [event.identifier for event in events]
+            session.execute(
+                delete(SearchIndexEvent).where(SearchIndexEvent.identifier.in_(event_identifiers))
+            )
+            session.commit()
+            n_events += len(events)
+            if len(events) < self.batch_size:
+                return n_events
+
+    def _push(self, session: Session, router: SearchRouter, identifiers: set[int]):
+        """Index the current state of the resources, or remove them if they no longer exist."""
+        clazz: Any = router.resource_class
+        query = sync_query(router).where(clazz.identifier.in_(identifiers))
+        rows = [dict(row._mapping) for row in session.execute(query)]
+        if rows:
+            add_keywords(session, router, rows)
+            bulk(self.es_client, router.es_index, "index", rows)
+        removed = identifiers - {row["identifier"] for row in rows}
+        if removed:
+            rows_removed = [{"identifier": identifier} for identifier in sorted(removed)]
+            bulk(self.es_client, router.es_index, "delete", rows_removed)
+
+
+def bulk(
+    es_client: Elasticsearch,
+    es_index: str,
+    action: str,
+    rows: list[dict],
+    index: str | None = None,
+):
+    """
+    Index or delete the rows using a single _bulk request. The documents are written to the
+    es_index (an alias), unless another index is given.
+    """
+    operations: list[dict] = []
+    for row in rows:
+        metadata = {"_index": index or es_index, "_id": f"{es_index}_{row['identifier']}"}
+        operations.append({action: metadata})
+        if action == "index":
+            document = dict(row, type=es_index)
+            document["date_modified"] = row["date_modified"].isoformat()
+            operations.append(document)
+    response = es_client.bulk(operations=operations)
+    if response["errors"]:
+        errors = [
+            result
+            for item in response["items"]
+            for result in item.values()
+            if "error" in result and not (action == "delete" and result["status"] == 404)
+        ]
+        if errors:
+            raise RuntimeError(
+                f"Bulk {action} of {len(errors)} documents in {index or es_index} failed. First "
+                f"error: {errors[0]['error']}"
+            )
+    logging.info(f"Bulk {action} of {len(rows)} documents in {index or es_index}")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Keep the Elasticsearch indices up to date with the database."
+    )
+    parser.add_argument(
+        "-w",
+        "--working-dir",
+        required=True,
+        help="The working directory. The high-water marks will be stored here.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="The maximum number of documents per _bulk request.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=5,
+        help="The number of seconds to wait for new changes, if there were no changes.",
+    )
+    parser.add_argument(
+        "--once",
+        action=argparse.BooleanOptionalAction,
+        help="Push the changes once and exit, instead of running continuously.",
+    )
+    parser.add_argument(
+        "--outbox",
+        action=argparse.BooleanOptionalAction,
+        help="Push the changes recorded in the search index outbox, instead of the changes "
+        "since the high-water marks.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    setup_logger()
+    working_dir = pathlib.Path(args.working_dir)
+    working_dir.mkdir(parents=True, exist_ok=True)
+    state_path = working_dir / RELATIVE_PATH_STATE_JSON
+    state = json.loads(state_path.read_text()) if state_path.exists() else {}
+    es_client = ElasticsearchSingleton().client
+    indexer: Indexer | OutboxConsumer
+    if args.outbox:
+        indexer = OutboxConsumer(es_client, router_list, batch_size=args.batch_size)
+    else:
+        indexer = Indexer(es_client, router_list, state=state, batch_size=args.batch_size)
+    while True:
+        n_changes = 0
+        try:
+            with DbSession() as session:
+                n_changes = indexer.run_once(session)
+        except Exception:
+            logging.exception("Indexing failed, retrying.")
+        finally:
+            state_path.write_text(json.dumps(state, indent=4))
+        if args.once:
+            return
+        if n_changes == 0:
+            time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Rebuilds Elasticsearch indices from the database, without downtime
+
+Every search entity has an alias (e.g. dataset) that is used for searching and indexing, pointing
+to a versioned index (e.g. dataset_v2). To change the mapping, or to repair an index, the next
+version of the index is built from the database while the current version keeps serving search
+requests. Once the new version is complete, the alias is swapped to it atomically, and the
+previous version is removed. An index that was created before the indices were versioned (an
+index named dataset instead of an alias) is replaced in the same way.
+
+During the load, the new index is not refreshed and has no replicas. Resources that are changed
+or deleted during the load are indexed after the swap, using the high-water marks of the Indexer.
+
+Usage (from the src directory):
+    python setup/es_indexer/reindex.py [--index dataset ...]
+"""
+
+import argparse
+import logging
+from datetime import datetime
+
+from elasticsearch import Elasticsearch
+from sqlmodel import Session
+
+from database.session import DbSession
+from routers.search_router import SearchRouter
+from routers.search_routers import router_list
+from routers.search_routers.elasticsearch import ElasticsearchSingleton
+from setup.es_indexer.indexer import Indexer
+from setup.es_setup.definitions import GLOBAL_FIELDS, generate_mapping
+from setup_logger import setup_logger
+
+
+def current_indices(es_client: Elasticsearch, alias: str) -> list[str]:
+    """The indices behind the alias"""
+    if es_client.indices.exists_alias(name=alias):
+        return list(es_client.indices.get_alias(name=alias))
+    if es_client.indices.exists(index=alias):
+        return [alias]  # Created before the indices were versioned
+    return []
+
+
+def next_version(es_client: Elasticsearch, alias: str) -> int:
+    prefix = f"{alias}_v"
+    versions = [
+        int(index.removeprefix(prefix))
+        for index in es_client.indices.get(index=f"{prefix}*")
+        if index.removeprefix(prefix).isdigit()
+    ]
+    return max(versions, default=0) + 1
+
+
+def reindex(
+    es_client: Elasticsearch, session: Session, router: SearchRouter, batch_size: int = 500
+) -> str:
+    """Build the next version of the index of this router, and swap the alias to it."""
+    alias = router.es_index
+    old_indices = current_indices(es_client, alias)
+    new_index = f"{alias}_v{next_version(es_client, alias)}"
+    replicas = None  # The default number of replicas
+    if old_indices:
+        settings = es_client.indices.get_settings(
+            index=old_indices[0], name="index.number_of_replicas"
+        )
+        replicas = settings[old_indices[0]]["settings"]["index"]["number_of_replicas"]
+
+    mapping = generate_mapping(router.indexed_fields ^ GLOBAL_FIELDS)
+    es_client.indices.create(
+        index=new_index,
+        mappings=mapping["mappings"],
+        settings={"number_of_replicas": 0, "refresh_interval": "-1"},
+    )
+    # Resources deleted before the load are not indexed anyway, so only later deletions matter
+    state = {alias: {"date_deleted": [datetime.utcnow().isoformat(), 0]}}
+    indexer = Indexer(es_client, [router], state, batch_size, indices={alias: new_index})
+    n_documents = indexer.run_once(session)
+    logging.info(f"Loaded {n_documents} documents into {new_index}")
+    es_client.indices.put_settings(
+        index=new_index,
+        settings={"number_of_replicas": replicas, "refresh_interval": None},
+    )
+    es_client.indices.refresh(index=new_index)
+
+    actions = [{"remove_index": {"index": index}} for index in old_indices]
+    actions.append({"add": {"index": new_index, "alias": alias}})
+    es_client.indices.update_aliases(actions=actions)
+    logging.info(f"Alias {alias} now points to {new_index}, removed {old_indices}")
+
+    session.rollback()  # End the transaction, to see the changes made during the load
+    n_changes = indexer.run_once(session)
+    logging.info(f"Indexed {n_changes} changes made during the load into {new_index}")
+    return new_index
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Rebuild Elasticsearch indices from the database, without downtime."
+    )
+    parser.add_argument(
+        "--index",
+        nargs="+",
+        choices=[router.es_index for router in router_list],
+        help="The indices to rebuild. By default, all indices are rebuilt.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="The maximum number of documents per _bulk request.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    setup_logger()
+    es_client = ElasticsearchSingleton().client
+    routers = [router for router in router_list if not args.index or router.es_index in args.index]
+    for router in routers:
+        with DbSession() as session:
+            reindex(es_client, session, router, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,7 @@
+import copy
+
+GLOBAL_FIELDS = {"name", "description_plain", "description_html"}
+
 BASE_MAPPING = {
     "mappings": {
         "properties": {
@@ -7,6 +11,18 @@ BASE_MAPPING = {
             "platform": {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
             "description_plain": {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
             "description_html": {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
+            "keyword": {"type": "keyword"},
+            "license": {"type": "keyword"},
         }
     }
 }
+
+
+def generate_mapping(fields) -> dict:
+    mapping = copy.deepcopy(BASE_MAPPING)
+    for field_name in fields:
+        mapping["mappings"]["properties"][field_name] = {
+            "type": "text",
+            "fields": {"keyword": {"type": "keyword"}},
+        }
+    return mapping
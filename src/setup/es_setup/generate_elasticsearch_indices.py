@@ -3,41 +3,52 @@
 
 """Generates the elasticsearch indices
 
+For every search entity, the first version of the index (e.g. dataset_v1) is created, with an
+alias named after the entity (e.g. dataset) that is used for searching and indexing. An existing
+index (an alias, or an index created before the indices were versioned) is rebuilt from the
+database using setup/es_indexer/reindex.py if its mapping is outdated, e.g. if it lacks the
+keyword fields used for the facets.
+
 Launched by the es_logstash_setup container in the docker-compose file.
 """
 
-import copy
 import logging
 
-from definitions import BASE_MAPPING
+from elasticsearch import Elasticsearch
+
+from database.session import DbSession
 from routers.search_routers import router_list
 from routers.search_routers.elasticsearch import ElasticsearchSingleton
-from setup.logstash_setup.generate_logstash_config_files import GLOBAL_FIELDS
+from setup.es_indexer.reindex import reindex
+from setup.es_setup.definitions import GLOBAL_FIELDS, generate_mapping
 from setup_logger import setup_logger
 
 
-def generate_mapping(fields):
-    mapping = copy.deepcopy(BASE_MAPPING)
-    for field_name in fields:
-        mapping["mappings"]["properties"][field_name] = {
-            "type": "text",
-            "fields": {"keyword": {"type": "keyword"}},
-        }
-    return mapping
+def is_outdated(es_client: Elasticsearch, es_index: str, mapping: dict) -> bool:
+    """Whether any index behind this alias lacks a field of the mapping, or maps it differently"""
+    expected = mapping["mappings"]["properties"]
+    for index_mapping in es_client.indices.get_mapping(index=es_index).values():
+        properties = index_mapping["mappings"].get("properties", {})
+        if any(properties.get(field) != definition for field, definition in expected.items()):
+            return True
+    return False
 
 
 def main():
     setup_logger()
     es_client = ElasticsearchSingleton().client
-    entities = {
-        router.es_index: list(router.indexed_fields ^ GLOBAL_FIELDS) for router in router_list
-    }
     logging.info("Generating indices...")
-    for es_index, fields in entities.items():
-        mapping = generate_mapping(fields)
-
-        # ignore 400 cause by IndexAlreadyExistsException when creating an index
-        es_client.indices.create(index=es_index, body=mapping, ignore=400)
+    for router in router_list:
+        es_index = router.es_index
+        mapping = generate_mapping(router.indexed_fields ^ GLOBAL_FIELDS)
+        if not es_client.indices.exists(index=es_index):
+            es_client.indices.create(
+                index=f"{es_index}_v1", mappings=mapping["mappings"], aliases={es_index: {}}
+            )
+        elif is_outdated(es_client, es_index, mapping):
+            logging.info(f"The mapping of {es_index} is outdated, rebuilding it...")
+            with DbSession() as session:
+                reindex(es_client, session, router)
     logging.info("Generating indices completed.")
 
 
@@ -15,6 +15,7 @@ from pathlib import Path
 from jinja2 import Template
 
 from routers.search_routers import router_list
+from setup.es_setup.definitions import GLOBAL_FIELDS
 from setup.logstash_setup.templates.config import TEMPLATE_CONFIG
 from setup.logstash_setup.templates.file_header import FILE_IS_GENERATED_COMMENT
 from setup.logstash_setup.templates.init_table import TEMPLATE_INIT_TABLE
@@ -34,8 +35,6 @@ DB_PASS = os.environ["MYSQL_ROOT_PASSWORD"]
 ES_USER = os.environ["ES_USER"]
 ES_PASS = os.environ["ES_PASSWORD"]
 
-GLOBAL_FIELDS = {"name", "description_plain", "description_html"}
-
 
 def generate_file(file_path, template, file_data):
     with open(file_path, "w") as f:
@@ -71,8 +70,10 @@ def main():
     render_parameters["comment_tag"] = "--"
     logging.info("Generating configuration files completed.")
     logging.info("Generating sql files...")
-    for es_index, extra_fields in entities.items():
+    for router in router_list:
+        es_index, extra_fields = router.es_index, entities[router.es_index]
         render_parameters["entity_name"] = es_index
+        render_parameters["has_license"] = "license" in router.facets
         render_parameters["extra_fields"] = (
             ",\n    " + ",\n    ".join(extra_fields) if extra_fields else ""
         )
@@ -18,6 +18,12 @@ filter {
   mutate {
     remove_field => ["@version", "@timestamp"]
   }
+  if [keyword] {
+    json {
+      source => "keyword"
+      target => "keyword"
+    }
+  }
 }
 output {
 {% for entity in entities %}
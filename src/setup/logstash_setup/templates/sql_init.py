@@ -4,9 +4,19 @@ TEMPLATE_SQL_INIT = """SELECT
     {{entity_name}}.platform,
     text.plain as 'description_plain',
     text.html as 'description_html',
-    aiod_entry.date_modified{{extra_fields}}
+    aiod_entry.date_modified{{extra_fields}},
+    (
+        SELECT JSON_ARRAYAGG(keyword.name)
+        FROM aiod.{{entity_name}}_keyword_link AS link
+        INNER JOIN aiod.keyword ON link.linked_identifier=aiod.keyword.identifier
+        WHERE link.from_identifier=aiod.{{entity_name}}.identifier
+    ) as 'keyword'{% if has_license %},
+    license.name as 'license'{% endif %}
 FROM aiod.{{entity_name}}
 INNER JOIN aiod.aiod_entry ON aiod.{{entity_name}}.aiod_entry_identifier=aiod.aiod_entry.identifier
 LEFT JOIN aiod.text ON aiod.{{entity_name}}.description_identifier=aiod.text.identifier
+{% if has_license -%}
+LEFT JOIN aiod.license ON {{entity_name}}.license_identifier=license.identifier
+{% endif -%}
 WHERE aiod.{{entity_name}}.date_deleted IS NULL
 """
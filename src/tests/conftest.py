@@ -1 +1,11 @@
+import pytest
+
+from authentication import token_cache
+
 pytest_plugins = ["tests.testutils.default_instances", "tests.testutils.default_sqlalchemy"]
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """The tests use the same token for different (mocked) users, so don't reuse cached users."""
+    token_cache.clear()
@@ -1,4 +1,7 @@
 import json
+import threading
+import time
+
 import responses
 
 from connectors.openml.openml_dataset_connector import OpenMlDatasetConnector
@@ -24,6 +27,41 @@ def test_first_run():
     assert {len(d.citation) for d in datasets} == {0}
 
 
+def test_first_run_concurrently():
+    """The records of a page are fetched concurrently, but yielded in order of identifier."""
+    state = {}
+    connector = OpenMlDatasetConnector(limit_per_iteration=2, workers=2)
+    both_in_flight = threading.Barrier(2, timeout=5)
+
+    def get_data_concurrently(identifier: str, delay: float):
+        with open(path_test_resources() / "connectors" / "openml" / f"data_{identifier}.json") as f:
+            body = f.read()
+
+        def callback(request):
+            both_in_flight.wait()  # Raises a BrokenBarrierError if fetched sequentially
+            time.sleep(delay)
+            return 200, {}, body
+
+        return callback
+
+    with responses.RequestsMock() as mocked_requests:
+        for offset in (0, 2):
+            mock_list_data(mocked_requests, offset)
+        for identifier, delay in (("2", 0.2), ("3", 0)):
+            mocked_requests.add_callback(
+                responses.GET,
+                f"{OPENML_URL}/data/{identifier}",
+                callback=get_data_concurrently(identifier, delay),
+            )
+        mock_get_data(mocked_requests, "4")
+
+        datasets = list(connector.run(state, from_identifier=0, limit=None))
+
+    assert [d.platform_resource_identifier for d in datasets] == ["2", "3", "4"]
+    assert state["offset"] == 3, state
+    assert state["last_id"] == 4, state
+
+
 def test_request_empty_list():
     """Tests if the state doesn't change after a request when OpenML returns an empty list."""
     state = {"offset": 2, "last_id": 3}
@@ -0,0 +1,72 @@
+import pytest
+import requests
+import responses
+
+from connectors.abstract import http_client as http_client_module
+from connectors.abstract.http_client import HttpClient, RateLimit
+
+URL = "https://example.org/api/records/1"
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Record the sleeps instead of sleeping, advancing the monotonic clock accordingly."""
+    sleeps: list[float] = []
+    now = [1000.0]
+
+    def sleep(seconds: float):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(http_client_module.time, "sleep", sleep)
+    monkeypatch.setattr(http_client_module.time, "monotonic", lambda: now[0])
+    return sleeps
+
+
+def test_retry_with_backoff(sleeps: list[float]):
+    client = HttpClient(max_retries=3, backoff_factor=0.5)
+    with responses.RequestsMock() as mocked_requests:
+        mocked_requests.get(URL, status=503)
+        mocked_requests.get(URL, status=502)
+        mocked_requests.get(URL, json={"id": 1}, status=200)
+        response = client.get(URL)
+    assert response.json() == {"id": 1}
+    assert sleeps == [0.5, 1.0]
+    statistics = client.statistics["example.org"]
+    assert (statistics.requests, statistics.retries, statistics.failures) == (3, 2, 2)
+
+
+def test_retry_after(sleeps: list[float]):
+    client = HttpClient(max_retries=1)
+    with responses.RequestsMock() as mocked_requests:
+        mocked_requests.get(URL, status=429, headers={"Retry-After": "7"})
+        mocked_requests.get(URL, status=429, headers={"Retry-After": "7"})
+        response = client.get(URL)
+    assert response.status_code == 429, "After the last retry, the response should be returned"
+    assert sleeps == [7.0]
+
+
+def test_no_retry_on_client_error(sleeps: list[float]):
+    client = HttpClient()
+    with responses.RequestsMock() as mocked_requests:
+        mocked_requests.get(URL, status=404)
+        assert client.get(URL).status_code == 404
+    assert sleeps == []
+
+
+def test_retry_on_connection_error(sleeps: list[float]):
+    client = HttpClient(max_retries=1, backoff_factor=1)
+    with responses.RequestsMock() as mocked_requests:
+        mocked_requests.get(URL, body=requests.ConnectionError("Connection refused"))
+        mocked_requests.get(URL, body=requests.ConnectionError("Connection refused"))
+        with pytest.raises(requests.ConnectionError):
+            client.get(URL)
+    assert sleeps == [1.0]
+    assert client.statistics["example.org"].failures == 2
+
+
+def test_rate_limit(sleeps: list[float]):
+    rate_limit = RateLimit(calls=2, period=60)
+    for _ in range(5):
+        rate_limit.acquire()
+    assert sleeps == [60.0, 60.0]
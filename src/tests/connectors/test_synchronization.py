@@ -0,0 +1,91 @@
+import copy
+
+import pytest
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+
+from connectors import synchronization
+from connectors.example.example import ExampleDatasetConnector
+from connectors.record_error import RecordError
+from database.model.dataset.dataset import Dataset
+from database.model.resource_read_and_create import resource_create
+from database.session import DbSession
+from routers import resource_router
+from routers.resource_routers import DatasetRouter
+from tests.routers.generic.test_router_eager_loading import count_queries
+
+
+def _dataset(body_asset: dict, platform_resource_identifier: str):
+    body = copy.deepcopy(body_asset)
+    body["platform"] = "example"
+    body["platform_resource_identifier"] = platform_resource_identifier
+    return resource_create(Dataset).parse_obj(body)
+
+
+def test_save_batch(engine: Engine, body_asset: dict):
+    connector, router = ExampleDatasetConnector(), DatasetRouter()
+    with DbSession() as session:
+        synchronization.save_to_database(
+            session, connector, router, _dataset(body_asset, "existing")
+        )
+        record_error = RecordError(identifier="error", error="Could not retrieve")
+        items = [_dataset(body_asset, id_) for id_ in ("1", "existing", "2", "1")] + [record_error]
+
+        with count_queries(engine) as statements:
+            errors = synchronization.save_batch_to_database(session, connector, router, items)
+        assert errors == [record_error]
+        queries_on_datasets = [s for s in statements if s.startswith("SELECT") and "dataset" in s]
+        assert len(queries_on_datasets) == 1
+
+        datasets = session.scalars(select(Dataset).order_by(Dataset.identifier)).all()
+        assert [d.platform_resource_identifier for d in datasets] == ["existing", "1", "2"]
+        assert sorted(k.name for k in datasets[-1].keyword) == ["tag1", "tag2"]
+
+
+def test_save_batch_failure(engine: Engine, body_asset: dict, monkeypatch: pytest.MonkeyPatch):
+    deserialize = resource_router.deserialize_resource_relationships
+
+    def failing_deserialize(session, resource_class, resource, resource_create_instance):
+        if resource.platform_resource_identifier == "invalid":
+            raise ValueError("Invalid resource")
+        deserialize(session, resource_class, resource, resource_create_instance)
+
+    monkeypatch.setattr(resource_router, "deserialize_resource_relationships", failing_deserialize)
+    connector, router = ExampleDatasetConnector(), DatasetRouter()
+    items = [_dataset(body_asset, id_) for id_ in ("1", "invalid", "2")]
+    with DbSession() as session:
+        (error,) = synchronization.save_batch_to_database(session, connector, router, items)
+        assert str(error.error) == "Invalid resource"
+        identifiers = session.scalars(select(Dataset.platform_resource_identifier)).all()
+        assert sorted(identifiers) == ["1", "2"]
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_save_updates_changed_resources(engine: Engine, body_asset: dict, batch: bool):
+    connector, router = ExampleDatasetConnector(), DatasetRouter()
+
+    def save(*items):
+        if batch:
+            return synchronization.save_batch_to_database(session, connector, router, list(items))
+        return [synchronization.save_to_database(session, connector, router, i) for i in items]
+
+    with DbSession() as session:
+        save(_dataset(body_asset, "1"), _dataset(body_asset, "2"))
+        dataset_1, dataset_2 = session.scalars(select(Dataset).order_by(Dataset.identifier))
+        modified_1 = dataset_1.aiod_entry.date_modified
+        modified_2 = dataset_2.aiod_entry.date_modified
+
+        changed = _dataset(body_asset, "2")
+        changed.name = "Another name"
+        changed.keyword = ["tag3"]
+        with count_queries(engine) as statements:
+            assert not any(save(_dataset(body_asset, "1"), changed))
+        updates = [s for s in statements if s.startswith("UPDATE") and "dataset" in s]
+        assert len(updates) == 1
+
+        session.expire_all()
+        assert dataset_1.aiod_entry.date_modified == modified_1
+        assert dataset_2.aiod_entry.date_modified > modified_2
+        assert dataset_2.name == "Another name"
+        assert [k.name for k in dataset_2.keyword] == ["tag3"]
+        assert dataset_2.aiod_entry.content_hash == synchronization.content_hash(changed)
@@ -1,20 +1,45 @@
 import datetime
+import itertools
 
 import pytest
 import responses
 import requests
 
 from freezegun import freeze_time
-from ratelimit import limits
-from ratelimit.exception import RateLimitException
 from requests.exceptions import HTTPError
+from sickle.response import OAIResponse
 
+from connectors.abstract import http_client as http_client_module
 from connectors.record_error import RecordError
 from connectors.zenodo import zenodo_dataset_connector
 from connectors.zenodo.zenodo_dataset_connector import ZenodoDatasetConnector
 from database.model.agent.contact import Contact
 from tests.connectors.zenodo import mock_zenodo
 
+pytestmark = pytest.mark.parametrize("streaming", [True, False])
+
+
+class TooManyCalls(Exception):
+    pass
+
+
+def _limit_calls(function, calls: int):
+    """Raise TooManyCalls after the given number of calls, instead of waiting like a rate limit"""
+    counter = itertools.count(1)
+
+    def limited(*args, **kwargs):
+        if next(counter) > calls:
+            raise TooManyCalls("too many calls")
+        return function(*args, **kwargs)
+
+    return limited
+
+
+@pytest.fixture
+def no_sleep(monkeypatch: pytest.MonkeyPatch):
+    """Retry failed requests of the http_client without waiting"""
+    monkeypatch.setattr(http_client_module.time, "sleep", lambda seconds: None)
+
 
 fake_now = datetime.datetime.fromisoformat(
     mock_zenodo.TOKEN_EXPIRATION_DATETIME.replace("Z", "")
@@ -22,7 +47,7 @@ fake_now = datetime.datetime.fromisoformat(
 
 
 @freeze_time(fake_now)
-def test_fetch_happy_path():
+def test_fetch_happy_path(streaming: bool):
     """
     Test the successful path scenario for fetching records from Zenodo.
     This test ensures that all 51 records are fetched correctly and processed as expected
@@ -33,7 +58,7 @@ def test_fetch_happy_path():
     2. Initialize the connector and fetch records within a specified time range.
     3. Validate the fetched datasets and errors against expected values.
     """
-    connector = ZenodoDatasetConnector()
+    connector = ZenodoDatasetConnector(streaming=streaming)
     with responses.RequestsMock() as mocked_requests:
         mock_zenodo.first_list_response(mocked_requests)
         mock_zenodo.first_list_records_responses(mocked_requests)
@@ -85,7 +110,7 @@ def test_fetch_happy_path():
     )
 
 
-def test_fetch_expired_token_happy_path():
+def test_fetch_expired_token_happy_path(streaming: bool):
     """
     Test the scenario when the resumption token expires during fetching.
     This test ensures that the connector stops the calls before that happens avoiding a 422 error.
@@ -97,7 +122,7 @@ def test_fetch_expired_token_happy_path():
     2. Initialize the connector and fetch records within a specified time range.
     3. Validate the fetched datasets and errors against expected values.
     """
-    connector = ZenodoDatasetConnector()
+    connector = ZenodoDatasetConnector(streaming=streaming)
     with responses.RequestsMock() as mocked_requests:
         mock_zenodo.first_list_response(mocked_requests)
         mock_zenodo.second_list_response_after_interruption(mocked_requests)
@@ -117,7 +142,7 @@ def test_fetch_expired_token_happy_path():
 
 
 @freeze_time(fake_now)
-def test_fetch_harvesting_rate_limit(monkeypatch):
+def test_fetch_harvesting_rate_limit(monkeypatch, streaming: bool):
     """
     Test the scenario when the harvesting rate limit is reached.
     This test ensures that the connector handles rate limits correctly.
@@ -128,14 +153,10 @@ def test_fetch_harvesting_rate_limit(monkeypatch):
     1. Mock the _check_harvesting_rate method to limit the calls.
     2. Mock responses for list requests.
     3. Initialize the connector and attempt to fetch records.
-    4. Validate that a RateLimitException is raised with the correct message.
+    4. Validate that a TooManyCalls exception is raised with the correct message.
     """
 
-    @staticmethod
-    @limits(calls=1, period=60)
-    def mock_check():
-        pass
-
+    mock_check = staticmethod(_limit_calls(lambda: None, calls=1))
     monkeypatch.setattr(ZenodoDatasetConnector, "_check_harvesting_rate", mock_check)
 
     with responses.RequestsMock() as mocked_requests:
@@ -143,15 +164,15 @@ def test_fetch_harvesting_rate_limit(monkeypatch):
 
         from_incl = datetime.datetime(2023, 5, 23, 8, 0, 0)
         to_excl = datetime.datetime(2023, 5, 23, 9, 0, 0)
-        connector = zenodo_dataset_connector.ZenodoDatasetConnector()
-        with pytest.raises(RateLimitException) as exc_info:
+        connector = zenodo_dataset_connector.ZenodoDatasetConnector(streaming=streaming)
+        with pytest.raises(TooManyCalls) as exc_info:
             resources = list(connector.run(state={}, from_incl=from_incl, to_excl=to_excl))
             assert resources is None, resources
         assert exc_info.value.args[0] == "too many calls"
 
 
 @freeze_time(fake_now)
-def test_fetch_records_rate_limit(monkeypatch):
+def test_fetch_records_rate_limit(monkeypatch, streaming: bool):
     """
     Cheap check to test the scenario when the rate limit for fetching records is reached.
     This test ensures that the connector handles record fetch rate limits correctly.
@@ -165,12 +186,10 @@ def test_fetch_records_rate_limit(monkeypatch):
     4. Validate that records are fetched correctly despite rate limits.
     """
 
-    @staticmethod
-    @limits(calls=1, period=60)
-    def mock_check(id_number):
-        response = requests.get(f"https://zenodo.org/api/records/{id_number}/files")
-        return response
+    def get_record(id_number):
+        return requests.get(f"https://zenodo.org/api/records/{id_number}/files")
 
+    mock_check = staticmethod(_limit_calls(get_record, calls=1))
     monkeypatch.setattr(ZenodoDatasetConnector, "_get_record", mock_check)
 
     with responses.RequestsMock() as mocked_requests:
@@ -180,19 +199,19 @@ def test_fetch_records_rate_limit(monkeypatch):
 
         from_incl = datetime.datetime(2023, 5, 23, 8, 0, 0)
         to_excl = datetime.datetime(2023, 5, 23, 9, 0, 0)
-        connector = zenodo_dataset_connector.ZenodoDatasetConnector()
+        connector = zenodo_dataset_connector.ZenodoDatasetConnector(streaming=streaming)
         resources = list(connector.run(state={}, from_incl=from_incl, to_excl=to_excl))
 
         datasets = [r for r in resources if not isinstance(r, RecordError)]
         errors = [r for r in resources if isinstance(r, RecordError)]
-        assert {type(error.error) for error in errors} == {str, RateLimitException}
+        assert {type(error.error) for error in errors} == {str, TooManyCalls}
 
         assert len(datasets) == 1
         assert len(errors) == 50
 
 
 @freeze_time(fake_now)
-def test_resuming_processing_after_timeout():
+def test_resuming_processing_after_timeout(no_sleep, streaming: bool):
     """
     Test the scenario when the fetching the records is interrupted by time out error
     from zenodo. It's expected that the API halts fetching the records and starts processing them
@@ -203,7 +222,7 @@ def test_resuming_processing_after_timeout():
     2. Initialize the connector and fetch records within a specified time range.
     3. Validate the fetched datasets and errors against expected values.
     """
-    connector = ZenodoDatasetConnector()
+    connector = ZenodoDatasetConnector(streaming=streaming)
     with responses.RequestsMock() as mocked_requests:
         mock_zenodo.first_list_response(mocked_requests)
         mock_zenodo.second_list_response_time_out(mocked_requests)
@@ -222,7 +241,26 @@ def test_resuming_processing_after_timeout():
 
 
 @freeze_time(fake_now)
-def test_response_with_no_records():
+def test_fetch_retries_oai_requests(no_sleep, streaming: bool):
+    """The OAI-PMH requests go through the http_client, which retries a 5xx response."""
+    connector = ZenodoDatasetConnector(streaming=streaming)
+    with responses.RequestsMock() as mocked_requests:
+        mock_zenodo.first_list_response(mocked_requests)
+        mock_zenodo.second_list_response_time_out(mocked_requests)
+        mock_zenodo.second_list_response(mocked_requests)
+        mock_zenodo.first_list_records_responses(mocked_requests)
+        mock_zenodo.second_list_records_responses(mocked_requests)
+
+        from_incl = datetime.datetime(2023, 5, 23, 8, 0, 0)
+        to_excl = datetime.datetime(2023, 5, 23, 9, 0, 0)
+        resources = list(connector.run(state={}, from_incl=from_incl, to_excl=to_excl))
+        oai_calls = [c for c in mocked_requests.calls if "oai2d" in c.request.url]
+    assert [c.response.status_code for c in oai_calls] == [200, 504, 200]
+    assert len([r for r in resources if not isinstance(r, RecordError)]) == 7
+
+
+@freeze_time(fake_now)
+def test_response_with_no_records(streaming: bool):
     """
     Test the scenario when the fetching the records returns an 422 error in the first call,
     which means that no record was found for the chosen period.
@@ -232,7 +270,7 @@ def test_response_with_no_records():
     2. Initialize the connector and fetch records within a specified time range.
     3. Validate the fetched datasets and errors and state against expected values.
     """
-    connector = ZenodoDatasetConnector()
+    connector = ZenodoDatasetConnector(streaming=streaming)
     state = {}
     with responses.RequestsMock() as mocked_requests:
         mock_zenodo.response_with_no_records(mocked_requests)
@@ -249,3 +287,25 @@ def test_response_with_no_records():
         assert state["from_incl"] == from_incl.timestamp()
         assert state["to_excl"] == to_excl.timestamp()
         assert state["last"] is None
+
+
+@freeze_time(fake_now)
+def test_fetch_parses_responses_once(monkeypatch, streaming: bool):
+    """In streaming mode, the responses are only parsed by the oai_parser, not by Sickle."""
+    parsed_by_sickle = []
+    xml = OAIResponse.xml
+    monkeypatch.setattr(
+        OAIResponse, "xml", property(lambda self: parsed_by_sickle.append(self) or xml.fget(self))
+    )
+    connector = ZenodoDatasetConnector(streaming=streaming)
+    with responses.RequestsMock() as mocked_requests:
+        mock_zenodo.first_list_response(mocked_requests)
+        mock_zenodo.first_list_records_responses(mocked_requests)
+        mock_zenodo.second_list_response(mocked_requests)
+        mock_zenodo.second_list_records_responses(mocked_requests)
+
+        from_incl = datetime.datetime(2023, 5, 23, 8, 0, 0)
+        to_excl = datetime.datetime(2023, 5, 23, 9, 0, 0)
+        resources = list(connector.run(state={}, from_incl=from_incl, to_excl=to_excl))
+    assert len(resources) == 51
+    assert bool(parsed_by_sickle) != streaming
@@ -0,0 +1,63 @@
+import io
+
+import pytest
+import xmltodict
+
+from connectors.zenodo.oai_parser import RESOURCE_FIELDS, iterparse_records, parse_page
+from tests.testutils.paths import path_test_resources
+
+
+@pytest.mark.parametrize("filename", ["list_records_1.xml", "list_records_2.xml"])
+def test_iterparse_records_same_as_xmltodict(filename: str):
+    """The extracted fields should be exactly what the xmltodict path would produce."""
+    with open(path_test_resources() / "connectors" / "zenodo" / filename, "rb") as f:
+        content = f.read()
+    expected_records = xmltodict.parse(content)["OAI-PMH"]["ListRecords"]["record"]
+
+    records = list(iterparse_records(io.BytesIO(content)))
+
+    assert len(records) == len(expected_records)
+    for record, expected in zip(records, expected_records):
+        assert record.identifier == expected["header"]["identifier"]
+        assert record.datestamp == expected["header"]["datestamp"]
+        resource = expected["metadata"]["oai_datacite"]["payload"]["resource"]
+        assert record.resource_type == resource["resourceType"]["@resourceTypeGeneral"]
+        assert record.resource == {k: v for k, v in resource.items() if k in RESOURCE_FIELDS}
+
+
+def test_iterparse_deleted_record():
+    content = b"""<?xml version='1.0' encoding='UTF-8'?>
+    <OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/"><ListRecords>
+      <record><header status="deleted">
+        <identifier>oai:zenodo.org:1</identifier><datestamp>2023-05-23T08:43:15Z</datestamp>
+      </header></record>
+    </ListRecords></OAI-PMH>"""
+    (record,) = iterparse_records(io.BytesIO(content))
+    assert record.identifier == "oai:zenodo.org:1"
+    assert record.resource_type is None
+    assert record.resource is None
+
+
+def test_parse_page_resumption_token():
+    with open(path_test_resources() / "connectors" / "zenodo" / "list_records_1.xml", "rb") as f:
+        page = parse_page(f)
+    assert len(page.records) == 26
+    assert page.resumption_token.token == ".resumption-token-to-page-2"
+    assert page.resumption_token.complete_list_size == "51"
+    assert page.resumption_token.expiration_date == "2024-02-08T17:40:07Z"
+    assert page.error_code is None
+
+    with open(path_test_resources() / "connectors" / "zenodo" / "list_records_2.xml", "rb") as f:
+        page = parse_page(f)
+    assert page.resumption_token is None or not page.resumption_token.token
+
+
+def test_parse_page_error():
+    content = b"""<?xml version='1.0' encoding='UTF-8'?>
+    <OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">
+      <error code="badResumptionToken">The token expired.</error>
+    </OAI-PMH>"""
+    page = parse_page(io.BytesIO(content))
+    assert page.records == []
+    assert page.error_code == "badResumptionToken"
+    assert page.error_message == "The token expired."
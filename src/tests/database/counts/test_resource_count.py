@@ -0,0 +1,81 @@
+from unittest.mock import Mock
+
+from sqlalchemy import update
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.counts.resource_count import ResourceCount, get_counts, reconcile_counts
+from database.session import DbSession
+from tests.routers.generic.test_router_eager_loading import count_queries
+from tests.testutils.test_resource import TestResource
+
+
+def test_counts_maintained_by_router(
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    mocked_privileged_token: Mock,
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    response = client_test_resource.post(
+        "/test_resources/v0",
+        json={"title": "title", "platform": "openml", "platform_resource_identifier": "2"},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.json()
+    response = client_test_resource.post("/test_resources/v0", json={"title": "t"}, headers=headers)
+    assert response.status_code == 200, response.json()
+    with DbSession() as session:
+        assert get_counts(session, TestResource) == {"example": 1, "openml": 1, "aiod": 1}
+
+    response = client_test_resource.put(
+        "/test_resources/v0/1",
+        json={"title": "title", "platform": "openml", "platform_resource_identifier": "1"},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.json()
+    response = client_test_resource.delete("/test_resources/v0/3", headers=headers)
+    assert response.status_code == 200, response.json()
+    with DbSession() as session:
+        assert get_counts(session, TestResource) == {"openml": 2}
+
+    with count_queries(engine_test_resource_filled) as statements:
+        response = client_test_resource.get("/counts/test_resources/v1", params={"detailed": True})
+    assert response.json() == {"openml": 2}
+    assert len(statements) == 1
+
+
+def test_counts_not_changed_on_rollback(engine_test_resource_filled: Engine):
+    with DbSession() as session:
+        session.add(
+            TestResource(title="title", platform="openml", platform_resource_identifier="2")
+        )
+        session.flush()
+        assert get_counts(session, TestResource) == {"example": 1}, "Only updated on commit"
+        session.rollback()
+        assert get_counts(session, TestResource) == {"example": 1}
+
+
+def test_counts_updated_once_per_transaction(engine_test_resource_filled: Engine):
+    with DbSession() as session:
+        for i in range(2, 5):
+            session.add(
+                TestResource(title="title", platform="openml", platform_resource_identifier=str(i))
+            )
+            session.flush()
+        with count_queries(engine_test_resource_filled) as statements:
+            session.commit()
+        assert len([s for s in statements if "resource_count" in s]) == 1
+        assert get_counts(session, TestResource) == {"example": 1, "openml": 3}
+
+
+def test_reconcile_counts(engine_test_resource_filled: Engine):
+    with DbSession() as session:
+        session.execute(update(ResourceCount).values(count=42))
+        session.add(ResourceCount(resource_type="unknown", platform="example", count=1))
+        session.commit()
+        assert get_counts(session)["testresource"] == {"example": 42}
+
+        reconcile_counts(session)
+        assert get_counts(session) == {"testresource": {"example": 1}}
@@ -0,0 +1,140 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.documents import resource_document
+from database.documents.backfill import backfill
+from database.documents.resource_document import ResourceDocument, check_documents
+from database.model.dataset.dataset import Dataset
+from database.model.platform.platform_registry import platform_registry
+from database.session import DbSession
+from tests.routers.generic.test_router_eager_loading import count_queries
+
+
+@pytest.fixture(autouse=True)
+def documents_enabled(monkeypatch):
+    monkeypatch.setattr(resource_document, "DOCUMENTS_ENABLED", True)
+
+
+@pytest.fixture
+def datasets(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.introspect = mocked_privileged_token
+    for i in range(3):
+        body = copy.deepcopy(body_asset) | {"platform_resource_identifier": str(i)}
+        response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+
+
+def _documents() -> dict[int, str]:
+    with DbSession() as session:
+        query = select(ResourceDocument).where(ResourceDocument.resource_type == "dataset")
+        return {document.identifier: document.document for document in session.scalars(query)}
+
+
+def test_documents_written_by_router(client: TestClient, engine: Engine, datasets, body_asset):
+    assert set(_documents()) == {1, 2, 3}
+
+    body = copy.deepcopy(body_asset) | {"platform_resource_identifier": "0", "keyword": ["new"]}
+    response = client.put("/datasets/v1/1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    response = client.delete("/datasets/v1/2", headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+
+    documents = _documents()
+    assert set(documents) == {1, 3}
+    assert '"keyword":["new"]' in documents[1]
+
+
+def test_documents_of_related_resources(client: TestClient, engine: Engine, datasets):
+    body = {"name": "news", "is_part_of": [1]}
+    response = client.post("/news/v1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    assert '"has_part":[4]' in _documents()[1], "The inverse relation of the dataset changed"
+
+    body = {"name": "news", "is_part_of": [], "relevant_resource": [2]}
+    response = client.put("/news/v1/1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    documents = _documents()
+    assert '"has_part":[]' in documents[1]
+    assert '"relevant_to":[4]' in documents[2]
+    assert client.get("/datasets/v1/2").json()["relevant_to"] == [4]
+
+    body = {"name": "news", "is_part_of": [], "relevant_resource": []}  # Allows the clean-up
+    response = client.put("/news/v1/1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+
+
+def test_documents_rolled_back(engine: Engine):
+    with DbSession() as session:
+        session.add(Dataset(name="dataset", platform="example", platform_resource_identifier="1"))
+        session.flush()
+        session.rollback()
+        session.commit()
+    assert _documents() == {}
+
+
+def test_get_returns_document(client: TestClient, engine: Engine, datasets, monkeypatch):
+    platform_registry.names()  # Loaded once
+    with count_queries(engine) as statements:
+        response = client.get("/datasets/v1/2")
+        response_list = client.get("/datasets/v1", params={"limit": 2})
+        response_platform = client.get("/platforms/example/datasets/v1/1")
+    assert len(statements) == 3, "A single query per request"
+    assert response_list.headers["Next-Cursor"]
+
+    monkeypatch.setattr(resource_document, "DOCUMENTS_ENABLED", False)
+    for stored, path, params in (
+        (response, "/datasets/v1/2", {}),
+        (response_list, "/datasets/v1", {"limit": 2}),
+        (response_platform, "/platforms/example/datasets/v1/1", {}),
+    ):
+        serialized = client.get(path, params=params)
+        assert stored.status_code == serialized.status_code == 200
+        assert stored.json() == serialized.json()
+        assert stored.headers["ETag"] == serialized.headers["ETag"]
+        assert stored.headers.get("Next-Cursor") == serialized.headers.get("Next-Cursor")
+
+
+def test_get_outdated_document(client: TestClient, engine: Engine, datasets):
+    with DbSession() as session:
+        session.execute(
+            update(ResourceDocument)
+            .where(ResourceDocument.identifier == 1)
+            .values(document='{"outdated": true}', date_modified=None)
+        )
+        session.commit()
+    assert client.get("/datasets/v1/1").json()["name"] == "The name"
+    assert client.get("/datasets/v1").json()[0]["name"] == "The name"
+    assert client.get("/datasets/v1/4").status_code == 404
+
+
+def test_check_and_backfill(client: TestClient, engine: Engine, datasets):
+    with DbSession() as session:
+        session.execute(
+            update(ResourceDocument)
+            .where(ResourceDocument.identifier == 1)
+            .values(document='{"outdated": true}')
+        )
+        session.add(ResourceDocument(resource_type="dataset", identifier=10, document="{}"))
+        session.execute(update(Dataset).where(Dataset.identifier == 3).values(name="changed"))
+        session.commit()
+
+    with DbSession() as session:
+        assert check_documents(session, Dataset) == {
+            "missing": [],
+            "stale": [1, 3],
+            "orphaned": [10],
+        }
+        session.execute(ResourceDocument.__table__.delete().where(ResourceDocument.identifier == 2))
+        session.commit()
+        assert check_documents(session, Dataset)["missing"] == [2]
+
+        assert backfill(session, Dataset, batch_size=2) == 3
+        assert check_documents(session, Dataset) == {"missing": [], "stale": [], "orphaned": []}
+    assert set(_documents()) == {1, 2, 3}
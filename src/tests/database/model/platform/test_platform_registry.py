@@ -0,0 +1,55 @@
+from unittest.mock import Mock
+
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.model.platform.platform import Platform
+from database.model.platform.platform_names import PlatformName
+from database.model.platform.platform_registry import PlatformRegistry, platform_registry
+from database.session import DbSession
+from tests.routers.generic.test_router_eager_loading import count_queries
+
+
+def test_names_cached(engine: Engine):
+    registry = PlatformRegistry(ttl=60)
+    with count_queries(engine) as statements:
+        assert registry.names() == {p.name for p in PlatformName}
+        assert registry.names() == {p.name for p in PlatformName}
+    assert len(statements) == 1
+
+
+def test_names_expired(engine: Engine):
+    registry = PlatformRegistry(ttl=0)
+    with count_queries(engine) as statements:
+        registry.names()
+        registry.names()
+    assert len(statements) == 2
+
+
+def test_invalidated_on_commit(engine: Engine):
+    assert "new_platform" not in platform_registry.names()
+    with DbSession() as session:
+        session.add(Platform(name="new_platform"))
+        session.flush()
+        assert "new_platform" not in platform_registry.names(), "Not committed yet"
+        session.commit()
+    assert "new_platform" in platform_registry.names()
+
+
+def test_invalidated_by_platform_router(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    url = "/platforms/new_platform/datasets/v1/1"
+    assert client.get(url).status_code == 400, "An unknown platform"
+
+    headers = {"Authorization": "Fake token"}
+    response = client.post("/platforms/v1", json={"name": "new_platform"}, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert client.get(url).status_code == 404, "A known platform, but the dataset does not exist"
+
+    identifier = response.json()["identifier"]
+    response = client.delete(f"/platforms/v1/{identifier}", headers=headers)
+    assert response.status_code == 200, response.json()
+    assert client.get(url).status_code == 400
@@ -0,0 +1,67 @@
+import copy
+
+import pytest
+from sqlalchemy import delete, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+
+from database.model.agent.language import Language
+from database.model.ai_resource.keyword import Keyword
+from database.model.concept.status import Status
+from database.model.resource_read_and_create import resource_create
+from database.model.serializers import FindByNameDeserializer, FindByNameDeserializerList
+from database.session import DbSession
+from routers.resource_routers import DatasetRouter
+from tests.routers.generic.test_router_eager_loading import count_queries
+
+
+def test_named_relations_cached_across_commits(engine: Engine, body_asset: dict):
+    router = DatasetRouter()
+    with DbSession() as session:
+        for i in range(2):
+            body = copy.deepcopy(body_asset)
+            body["platform_resource_identifier"] = str(i)
+            dataset_create = resource_create(router.resource_class).parse_obj(body)
+            with count_queries(engine) as statements:
+                dataset = router.create_resource(session, dataset_create)
+            assert sorted(k.name for k in dataset.keyword) == ["tag1", "tag2"]
+        queries_on_keywords = [s for s in statements if s.startswith("SELECT") and "keyword" in s]
+        assert not queries_on_keywords
+
+
+def test_named_relation_cache_rollback(engine: Engine):
+    deserializer = FindByNameDeserializerList(Language)
+    with DbSession() as session:
+        (rolled_back,) = deserializer.deserialize(session, ["eng"])
+        session.rollback()
+        (language,) = deserializer.deserialize(session, ["ENG"])
+        session.commit()
+        assert language is not rolled_back
+        assert session.scalars(select(Language.name)).all() == ["eng"]
+
+        identifier = FindByNameDeserializer(Status).deserialize(session, "draft")
+        session.commit()
+        with count_queries(engine) as statements:
+            assert FindByNameDeserializer(Status).deserialize(session, "Draft") == identifier
+            (cached_language,) = deserializer.deserialize(session, ["eng"])
+        assert not statements
+        assert cached_language is language
+
+
+def test_named_relation_cache_deleted_name(engine: Engine, body_asset: dict):
+    router = DatasetRouter()
+    dataset_create = resource_create(router.resource_class)
+    with DbSession() as session:
+        router.create_resource(session, dataset_create.parse_obj(body_asset))
+        with engine.begin() as connection:
+            # As done by the orphan deletion triggers, after the hard deletion of the dataset
+            connection.execute(text("DELETE FROM dataset_keyword_link"))
+            connection.execute(delete(Keyword).where(Keyword.name == "tag1"))
+
+        body = copy.deepcopy(body_asset) | {"platform_resource_identifier": "2"}
+        with pytest.raises(IntegrityError):
+            router.create_resource(session, dataset_create.parse_obj(body))
+        session.rollback()
+        dataset = router.create_resource(session, dataset_create.parse_obj(body))
+        assert sorted(k.name for k in dataset.keyword) == ["tag1", "tag2"]
@@ -0,0 +1,64 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.model.agent.person import Person
+from database.model.dataset.dataset import Dataset
+from database.outbox import search_index_outbox
+from database.outbox.search_index_outbox import SearchIndexEvent
+from database.session import DbSession
+
+
+@pytest.fixture(autouse=True)
+def outbox_enabled(monkeypatch):
+    monkeypatch.setattr(search_index_outbox, "OUTBOX_ENABLED", True)
+
+
+def _events() -> list[tuple[str, int]]:
+    with DbSession() as session:
+        query = select(SearchIndexEvent).order_by(SearchIndexEvent.identifier)
+        return [(e.resource_type, e.resource_identifier) for e in session.scalars(query)]
+
+
+def test_events_written_by_router(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    response = client.post("/datasets/v1", json=body_asset, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert _events() == [("dataset", 1)]
+
+    body = copy.deepcopy(body_asset) | {"keyword": ["tag3"]}
+    response = client.put("/datasets/v1/1", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    response = client.delete("/datasets/v1/1", headers=headers)
+    assert response.status_code == 200, response.json()
+    assert _events() == [("dataset", 1)] * 3
+
+    response = client.post("/persons/v1", json={"name": "Jane"}, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert len(_events()) == 3, "Persons are not indexed"
+
+
+def test_events_rolled_back(engine: Engine):
+    with DbSession() as session:
+        session.add(Dataset(name="dataset", platform="example", platform_resource_identifier="1"))
+        session.add(Person(name="person"))
+        session.flush()
+        assert session.scalars(select(SearchIndexEvent)).all(), "Written on flush"
+        session.rollback()
+    assert _events() == []
+
+
+def test_events_disabled(engine: Engine, monkeypatch):
+    monkeypatch.setattr(search_index_outbox, "OUTBOX_ENABLED", False)
+    with DbSession() as session:
+        session.add(Dataset(name="dataset", platform="example", platform_resource_identifier="1"))
+        session.commit()
+    assert _events() == []
@@ -0,0 +1,61 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.model.dataset.dataset import Dataset
+from database.model.platform.platform_registry import platform_registry
+from database.session import AsyncDbSession, AsyncEngineSingleton
+
+
+@pytest.mark.asyncio
+async def test_async_session(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    response = client.post("/datasets/v1", json=body_asset, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+
+    async with AsyncDbSession() as session:
+        datasets = (await session.exec(select(Dataset))).all()
+    assert [dataset.name for dataset in datasets] == [body_asset["name"]]
+
+
+def test_get_endpoints_use_async_engine(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    for i in range(2):
+        body = copy.deepcopy(body_asset) | {"platform_resource_identifier": str(i)}
+        response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+
+    statements: dict[str, list[str]] = {"sync": [], "async": []}
+    listeners = {
+        engine: lambda conn, cursor, statement, *args: statements["sync"].append(statement),
+        AsyncEngineSingleton().engine.sync_engine: (
+            lambda conn, cursor, statement, *args: statements["async"].append(statement)
+        ),
+    }
+    for engine_, listener in listeners.items():
+        event.listen(engine_, "before_cursor_execute", listener)
+    try:
+        for url in (
+            "/datasets/v1",
+            "/datasets/v1/1",
+            "/platforms/example/datasets/v1",
+            "/platforms/example/datasets/v1/1",
+        ):
+            platform_registry.invalidate()  # The platform names are loaded as well
+            response = client.get(url)
+            assert response.status_code == 200, response.json()
+    finally:
+        for engine_, listener in listeners.items():
+            event.remove(engine_, "before_cursor_execute", listener)
+    assert statements["async"]
+    assert not statements["sync"], "The read endpoints should not block on the sync engine"
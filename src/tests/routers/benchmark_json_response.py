@@ -0,0 +1,66 @@
+"""
+Benchmark of serializing a page of 1000 datasets: the default FastAPI path (validation against
+the response_model, jsonable_encoder and json) against the FastJSONResponse (orjson).
+
+Usage (from the src directory):
+    python -m tests.routers.benchmark_json_response [--repeat N] [--limit N]
+"""
+
+import argparse
+import asyncio
+import json
+import timeit
+from datetime import datetime
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from starlette.responses import JSONResponse
+
+from routers.json_response import FastJSONResponse
+from routers.resource_routers import DatasetRouter
+from tests.testutils.paths import path_test_resources
+
+
+def read_models(limit: int) -> list:
+    body = {}
+    for filename in ("aiod_concept.json", "ai_resource.json", "ai_asset.json"):
+        with open(path_test_resources() / "schemes" / "aiod" / filename) as f:
+            body.update(json.load(f))
+    now = datetime.utcnow().isoformat()
+    body["aiod_entry"] |= {"date_modified": now, "date_created": now}
+    read_class = DatasetRouter().resource_class_read
+    return [read_class.parse_obj(body | {"identifier": i}) for i in range(limit)]
+
+
+def render_default(field, models: list) -> bytes:
+    """What FastAPI does for an endpoint with response_model_exclude_none=True"""
+    content = asyncio.run(
+        serialize_response(field=field, response_content=models, exclude_none=True)
+    )
+    return JSONResponse(content).body
+
+
+def render_fast(models: list) -> bytes:
+    return FastJSONResponse(models, exclude_none=True).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=1000)
+    args = parser.parse_args()
+
+    models = read_models(args.limit)
+    field = create_response_field(name="Response", type_=list[type(models[0])])
+    assert json.loads(render_default(field, models)) == json.loads(render_fast(models))
+    print(f"{args.limit} datasets ({len(render_fast(models)) / 1024:.0f} KiB)")
+    for name, function in (
+        ("default", lambda: render_default(field, models)),
+        ("fast", lambda: render_fast(models)),
+    ):
+        seconds = timeit.timeit(function, number=args.repeat) / args.repeat
+        print(f"  {name:<8} {seconds * 1000:8.2f} ms/page  {args.limit / seconds:10.0f} datasets/s")
+
+
+if __name__ == "__main__":
+    main()
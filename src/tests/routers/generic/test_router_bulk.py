@@ -0,0 +1,132 @@
+import copy
+from unittest.mock import Mock
+
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.model.ai_resource.text import TextORM
+from database.session import DbSession
+from routers import resource_router
+
+
+def test_bulk_happy_path(
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    mocked_privileged_token: Mock,
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    body = [
+        {"title": f"title {i}", "platform": "example", "platform_resource_identifier": str(i)}
+        for i in range(2, 5)
+    ]
+    response = client_test_resource.post(
+        "/test_resources/v0/bulk", json=body, headers={"Authorization": "Fake token"}
+    )
+    assert response.status_code == 200, response.json()
+    assert response.json() == [
+        {"identifier": 2, "status_code": 200},
+        {"identifier": 3, "status_code": 200},
+        {"identifier": 4, "status_code": 200},
+    ]
+    response = client_test_resource.get("/test_resources/v0/3")
+    assert response.json()["title"] == "title 3"
+
+
+def test_bulk_partial_failure(
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    mocked_privileged_token: Mock,
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    body = [
+        {"title": "new", "platform": "example", "platform_resource_identifier": "2"},
+        {"title": "existing", "platform": "example", "platform_resource_identifier": "1"},
+        {"title": "new", "platform": "example", "platform_resource_identifier": "3"},
+    ]
+    response = client_test_resource.post(
+        "/test_resources/v0/bulk", json=body, headers={"Authorization": "Fake token"}
+    )
+    assert response.status_code == 200, response.json()
+    first, second, third = response.json()
+    assert first["status_code"] == third["status_code"] == 200
+    assert second == {
+        "status_code": 409,
+        "detail": "There already exists a test_resource with the same platform and "
+        "platform_resource_identifier, with identifier=1.",
+    }
+    response = client_test_resource.get("/test_resources/v0")
+    assert {r["platform_resource_identifier"] for r in response.json()} == {"1", "2", "3"}
+
+
+def test_bulk_shared_relationships(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    body = []
+    for i in range(3):
+        asset = copy.deepcopy(body_asset)
+        asset["platform_resource_identifier"] = str(i)
+        body.append(asset)
+    body[1]["aiod_entry"]["editor"] = [1000]
+    response = client.post("/datasets/v1/bulk", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    first, second, third = response.json()
+    assert first["status_code"] == third["status_code"] == 200
+    assert second == {"status_code": 404, "detail": "Could not find Person with identifiers 1000."}
+
+    for identifier in (first["identifier"], third["identifier"]):
+        response = client.get(f"/datasets/v1/{identifier}")
+        assert set(response.json()["keyword"]) == {"tag1", "tag2"}
+    response = client.get("/keywords/v1")
+    assert sorted(response.json()) == ["tag1", "tag2"]
+
+
+def test_bulk_invalid_item_in_the_middle(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    body = []
+    for i in range(3):
+        asset = copy.deepcopy(body_asset)
+        asset["platform_resource_identifier"] = str(i)
+        body.append(asset)
+    body[1]["keyword"] = ["only in the invalid item"]
+    body[1]["description"] = {"plain": "only in the invalid item"}
+    body[1]["relevant_resource"] = [1000]
+    response = client.post("/datasets/v1/bulk", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    assert [r["status_code"] for r in response.json()] == [200, 404, 200]
+
+    response = client.get("/keywords/v1")
+    assert sorted(response.json()) == ["tag1", "tag2"], "Nothing of the invalid item is stored"
+    with DbSession() as session:
+        descriptions = session.scalars(select(TextORM.plain)).all()
+    assert "only in the invalid item" not in descriptions
+    assert len(descriptions) == 2
+
+
+def test_bulk_too_large(
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    mocked_privileged_token: Mock,
+    monkeypatch,
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    monkeypatch.setattr(resource_router, "BULK_MAX_SIZE", 1)
+    body = [{"title": "title"}, {"title": "title"}]
+    response = client_test_resource.post(
+        "/test_resources/v0/bulk", json=body, headers={"Authorization": "Fake token"}
+    )
+    assert response.status_code == 413, response.json()
+
+
+def test_bulk_unauthorized(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine, mocked_token: Mock
+):
+    keycloak_openid.introspect = mocked_token
+    response = client_test_resource.post(
+        "/test_resources/v0/bulk", json=[{"title": "title"}], headers={"Authorization": "Fake"}
+    )
+    assert response.status_code == 403, response.json()
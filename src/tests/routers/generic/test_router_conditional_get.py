@@ -0,0 +1,136 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from tests.routers.generic.test_router_deprecation import DeprecatedRouter
+from tests.routers.generic.test_router_eager_loading import count_queries
+
+
+@pytest.mark.parametrize("url", ["/test_resources/v0/1", "/test_resources/v0"])
+def test_etag(client_test_resource: TestClient, engine_test_resource_filled: Engine, url: str):
+    response = client_test_resource.get(url)
+    assert response.status_code == 200, response.json()
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert "last-modified" in response.headers
+
+    with count_queries(engine_test_resource_filled) as statements:
+        response = client_test_resource.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert len(statements) == 1
+
+    response = client_test_resource.get(url, headers={"If-None-Match": 'W/"outdated"'})
+    assert response.status_code == 200
+    assert response.headers["etag"] == etag
+
+
+def test_etag_changes_on_update(
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    mocked_privileged_token: Mock,
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    etag = client_test_resource.get("/test_resources/v0/1").headers["etag"]
+    etag_list = client_test_resource.get("/test_resources/v0").headers["etag"]
+    response = client_test_resource.put(
+        "/test_resources/v0/1",
+        json={"title": "Another title"},
+        headers={"Authorization": "Fake token"},
+    )
+    assert response.status_code == 200, response.json()
+
+    response = client_test_resource.get("/test_resources/v0/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Another title"
+    assert response.headers["etag"] != etag
+    response = client_test_resource.get("/test_resources/v0", headers={"If-None-Match": etag_list})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag_list
+
+
+def test_if_modified_since(client_test_resource: TestClient, engine_test_resource_filled: Engine):
+    last_modified = client_test_resource.get("/test_resources/v0/1").headers["last-modified"]
+
+    response = client_test_resource.get(
+        "/test_resources/v0/1", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+    response = client_test_resource.get(
+        "/test_resources/v0/1", headers={"If-Modified-Since": "Thu, 21 Apr 2022 00:00:00 GMT"}
+    )
+    assert response.status_code == 200
+    response = client_test_resource.get(
+        "/test_resources/v0/1", headers={"If-Modified-Since": "not a date"}
+    )
+    assert response.status_code == 200
+
+
+def test_if_none_match_deleted(
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    mocked_privileged_token: Mock,
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    etag = client_test_resource.get("/test_resources/v0/1").headers["etag"]
+    response = client_test_resource.delete(
+        "/test_resources/v0/1", headers={"Authorization": "Fake token"}
+    )
+    assert response.status_code == 200, response.json()
+
+    response = client_test_resource.get("/test_resources/v0/1", headers={"If-None-Match": etag})
+    assert response.status_code == 404
+
+
+def test_conditional_get_deprecated(engine_test_resource_filled: Engine):
+    app = FastAPI()
+    app.include_router(DeprecatedRouter().create(""))
+    client = TestClient(app)
+
+    response = client.get("/test_resources/v1/1")
+    assert response.status_code == 200, response.json()
+    assert response.json()["title"] == "A title"
+    assert "deprecated" in response.headers
+
+    response = client.get(
+        "/test_resources/v1/1", headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert response.status_code == 304
+    assert "deprecated" in response.headers
+
+
+def test_etag_changes_on_inverse_relation(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    response = client.post("/datasets/v1", json=body_asset, headers=headers)
+    assert response.status_code == 200, response.json()
+    parent = client.get("/datasets/v1/1")
+    ai_resource_identifier = parent.json()["ai_resource_identifier"]
+
+    body = copy.deepcopy(body_asset) | {
+        "platform_resource_identifier": "2",
+        "is_part_of": [ai_resource_identifier],
+    }
+    response = client.post("/datasets/v1", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    child = client.get("/datasets/v1/2").json()
+
+    response = client.get("/datasets/v1/1", headers={"If-None-Match": parent.headers["etag"]})
+    assert response.status_code == 200, "Adding the relation changed the has_part of the parent"
+    assert response.json()["has_part"] == [child["ai_resource_identifier"]]
+    etag = response.headers["etag"]
+
+    body["is_part_of"] = []
+    response = client.put("/datasets/v1/2", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    response = client.get("/datasets/v1/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200, "Removing the relation changed the has_part of the parent"
+    assert response.json()["has_part"] == []
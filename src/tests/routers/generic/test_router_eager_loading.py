@@ -0,0 +1,77 @@
+import copy
+from contextlib import contextmanager
+from typing import Iterator
+from unittest.mock import Mock
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.session import AsyncEngineSingleton
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[list[str]]:
+    """
+    Keep track of all the queries executed on the engine, or on the async engine of the same
+    database (used by the read endpoints), within this context.
+    """
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = (engine, AsyncEngineSingleton().engine.sync_engine)
+    for engine_ in engines:
+        event.listen(engine_, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for engine_ in engines:
+            event.remove(engine_, "before_cursor_execute", before_cursor_execute)
+
+
+def _post_datasets(client: TestClient, body_asset: dict, start: int, n: int):
+    for i in range(start, start + n):
+        body = copy.deepcopy(body_asset)
+        body["platform_resource_identifier"] = str(i)
+        response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+
+
+def test_get_all_bounded_query_count(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    """The number of queries to retrieve a page should not depend on the page size."""
+    keycloak_openid.introspect = mocked_privileged_token
+    _post_datasets(client, body_asset, start=0, n=2)
+    with count_queries(engine) as statements_small_page:
+        response = client.get("/datasets/v1", params={"limit": 2})
+    assert response.status_code == 200, response.json()
+    assert len(response.json()) == 2
+
+    _post_datasets(client, body_asset, start=2, n=8)
+    with count_queries(engine) as statements_large_page:
+        response = client.get("/datasets/v1", params={"limit": 10})
+    assert response.status_code == 200, response.json()
+    response_json = response.json()
+    assert len(response_json) == 10
+    assert set(response_json[9]["keyword"]) == {"tag1", "tag2"}
+    assert response_json[9]["aiod_entry"]["status"] == "draft"
+    assert len(response_json[9]["distribution"]) == 1
+
+    assert len(statements_large_page) == len(statements_small_page)
+    assert len(statements_large_page) < 30
+
+
+def test_get_bounded_query_count(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    _post_datasets(client, body_asset, start=0, n=1)
+    with count_queries(engine) as statements:
+        response = client.get("/datasets/v1/1")
+    assert response.status_code == 200, response.json()
+    assert response.json()["name"] == "The name"
+    assert len(statements) < 30
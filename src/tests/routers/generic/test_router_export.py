@@ -0,0 +1,80 @@
+import datetime
+import json
+
+import pytest
+
+from starlette.testclient import TestClient
+
+from database.model.concept.status import Status
+from database.session import DbSession
+from routers import resource_router
+from tests.testutils.test_resource import factory, TestResource
+
+
+def _add_resources(draft: Status):
+    with DbSession() as session:
+        session.add_all(
+            [
+                factory(title="first", status=draft, platform_resource_identifier="1"),
+                factory(title="second", status=draft, platform="openml"),
+                factory(
+                    title="deleted",
+                    status=draft,
+                    platform_resource_identifier="3",
+                    date_deleted=datetime.datetime.now(),
+                ),
+                factory(title="fourth", status=draft, platform_resource_identifier="4"),
+            ]
+        )
+        session.commit()
+
+
+def test_export_happy_path(client_test_resource: TestClient, draft: Status):
+    _add_resources(draft)
+    response = client_test_resource.get("/test_resources/v0/export")
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    resources = [json.loads(line) for line in lines]
+    assert [r["title"] for r in resources] == ["first", "second", "fourth"]
+    assert [r["identifier"] for r in resources] == [1, 2, 4]
+    assert resources[0]["aiod_entry"]["status"] == "draft"
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3])
+def test_export_batches(
+    client_test_resource: TestClient, draft: Status, monkeypatch: pytest.MonkeyPatch, batch_size
+):
+    _add_resources(draft)
+    monkeypatch.setattr(resource_router, "EXPORT_BATCH_SIZE", batch_size)
+    response = client_test_resource.get("/test_resources/v0/export")
+    assert response.status_code == 200, response.text
+    resources = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["identifier"] for r in resources] == [1, 2, 4]
+
+
+def test_export_platform(client_test_resource: TestClient, draft: Status):
+    _add_resources(draft)
+    response = client_test_resource.get("/test_resources/v0/export", params={"platform": "openml"})
+    assert response.status_code == 200, response.text
+    resources = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["title"] for r in resources] == ["second"]
+
+
+def test_export_modified_since(client_test_resource: TestClient, draft: Status):
+    _add_resources(draft)
+    with DbSession() as session:
+        resource = session.get(TestResource, 4)
+        resource.aiod_entry.date_modified = datetime.datetime(2030, 1, 1)
+        session.commit()
+    params = {"modified_since": "2029-12-31T00:00:00"}
+    response = client_test_resource.get("/test_resources/v0/export", params=params)
+    assert response.status_code == 200, response.text
+    resources = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["title"] for r in resources] == ["fourth"]
+
+
+def test_export_empty(client_test_resource: TestClient):
+    response = client_test_resource.get("/test_resources/v0/export")
+    assert response.status_code == 200, response.text
+    assert response.text == ""
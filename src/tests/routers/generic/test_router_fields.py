@@ -0,0 +1,68 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from tests.routers.generic.test_router_eager_loading import count_queries
+
+
+@pytest.fixture
+def datasets(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.introspect = mocked_privileged_token
+    for i in range(3):
+        body = copy.deepcopy(body_asset) | {"platform_resource_identifier": str(i)}
+        response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+
+
+def test_get_fields(client: TestClient, engine: Engine, datasets):
+    full = client.get("/datasets/v1/2").json()
+    with count_queries(engine) as statements_full:
+        client.get("/datasets/v1", params={"limit": 3})
+    with count_queries(engine) as statements:
+        response = client.get("/datasets/v1", params={"fields": "name,keyword,aiod_entry"})
+    assert response.status_code == 200, response.json()
+    assert len(statements) == 3, "The datasets, their keywords and their aiod_entry"
+    assert len(statements_full) > 10
+    assert response.json()[1] == {
+        "identifier": 2,
+        "name": full["name"],
+        "keyword": full["keyword"],
+        "aiod_entry": full["aiod_entry"],
+    }
+    assert response.headers["ETag"] != client.get("/datasets/v1").headers["ETag"]
+
+    response = client.get("/datasets/v1/2", params={"fields": "alternate_name, platform"})
+    assert response.status_code == 200, response.json()
+    assert response.json() == {
+        "identifier": 2,
+        "platform": "example",
+        "alternate_name": full["alternate_name"],
+    }
+    response = client.get("/platforms/example/datasets/v1/1", params={"fields": "name"})
+    assert response.json() == {"identifier": 2, "name": "The name"}
+    response = client.get("/platforms/example/datasets/v1", params={"fields": "name"})
+    assert [dataset["identifier"] for dataset in response.json()] == [1, 2, 3]
+
+
+def test_get_fields_not_modified(client: TestClient, datasets):
+    response = client.get("/datasets/v1/1", params={"fields": "name"})
+    etag = response.headers["ETag"]
+    response = client.get(
+        "/datasets/v1/1", params={"fields": "name"}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    response = client.get("/datasets/v1/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_get_fields_invalid(client: TestClient, datasets):
+    response = client.get("/datasets/v1/1", params={"fields": "name,unknown"})
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"].startswith("Unknown fields ['unknown'].")
+    response = client.get("/datasets/v1", params={"fields": "name", "schema": "schema.org"})
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == "The fields can only be selected in the aiod schema."
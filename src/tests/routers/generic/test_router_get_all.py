@@ -1,3 +1,4 @@
+from sqlalchemy.engine import Engine
 from starlette.testclient import TestClient
 
 from database.model.concept.status import Status
@@ -27,3 +28,47 @@ def test_get_all_happy_path(client_test_resource: TestClient, draft: Status):
     assert response_2["identifier"] == 2
     assert response_2["title"] == "My second test resource"
     assert "deprecated" not in response.headers
+
+
+def test_get_all_cursor(client_test_resource: TestClient, draft: Status):
+    with DbSession() as session:
+        session.add_all(
+            [
+                factory(title=f"resource {i}", status=draft, platform_resource_identifier=str(i))
+                for i in range(5)
+            ]
+        )
+        session.commit()
+    response = client_test_resource.get("/test_resources/v0", params={"limit": 2})
+    assert response.status_code == 200, response.json()
+    assert [r["identifier"] for r in response.json()] == [1, 2]
+
+    titles = []
+    cursor = response.headers["next-cursor"]
+    while cursor is not None:
+        response = client_test_resource.get(
+            "/test_resources/v0", params={"limit": 2, "cursor": cursor}
+        )
+        assert response.status_code == 200, response.json()
+        titles.extend(r["title"] for r in response.json())
+        cursor = response.headers.get("next-cursor")
+    assert titles == ["resource 2", "resource 3", "resource 4"]
+
+
+def test_get_all_invalid_cursor(client_test_resource: TestClient):
+    response = client_test_resource.get("/test_resources/v0", params={"cursor": "invalid"})
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == (
+        "Invalid cursor invalid. Please use a cursor returned by a previous request."
+    )
+
+
+def test_get_all_cursor_and_offset(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine
+):
+    response = client_test_resource.get("/test_resources/v0", params={"limit": 1})
+    assert response.status_code == 200, response.json()
+    params = {"cursor": response.headers["next-cursor"], "offset": 1}
+    response = client_test_resource.get("/test_resources/v0", params=params)
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == "The offset cannot be used in combination with a cursor."
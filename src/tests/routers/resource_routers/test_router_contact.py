@@ -212,6 +212,7 @@ def test_email_privacy_for_ai4europe_cms(
     assert response_json["email"] == ["******"]
 
     keycloak_openid.introspect = mocked_ai4europe_cms_token
+    headers = {"Authorization": "Fake token of another user"}
 
     response = client.get(endpoint_from_fixture2, headers=headers)
     response_json = response.json()
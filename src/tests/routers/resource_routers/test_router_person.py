@@ -101,6 +101,7 @@ def test_privacy_for_ai4europe_cms(
         assert person_dict["surname"] == "******"
 
     keycloak_openid.introspect = mocked_ai4europe_cms_token
+    headers = {"Authorization": "Fake token of another user"}
     response = client.get(endpoint, headers=headers)
     response_json = response.json()
     response_json = [response_json] if isinstance(response_json, dict) else response_json
@@ -1,13 +1,18 @@
+import copy
+import datetime
 import json
 from unittest.mock import Mock
 
 import pytest
 from elasticsearch import Elasticsearch
+from sqlalchemy.engine import Engine
 from starlette.testclient import TestClient
 
 import routers.search_routers as sr
+from routers import search_router
 from authentication import keycloak_openid
 from routers.search_routers.elasticsearch import ElasticsearchSingleton
+from tests.routers.generic.test_router_eager_loading import count_queries
 from tests.testutils.paths import path_test_resources
 
 
@@ -147,3 +152,166 @@ def mock_elasticsearch(filename_mock: str):
     mocked_elasticsearch = Elasticsearch("https://example.com:9200")
     mocked_elasticsearch.search = Mock(return_value=mocked_results)
     ElasticsearchSingleton().patch(mocked_elasticsearch)
+
+
+def test_search_platforms_without_database(client: TestClient, engine: Engine):
+    mock_elasticsearch(filename_mock="dataset_search.json")
+    params = {"search_query": "description", "platforms": ["example"]}
+    response = client.get("/search/datasets/v1", params=params)
+    assert response.status_code == 200, response.json()
+
+    with count_queries(engine) as statements:
+        response = client.get("/search/datasets/v1", params=params)
+    assert response.status_code == 200, response.json()
+    assert len(statements) == 0, "The platforms are cached"
+
+
+def test_search_cursor(client: TestClient):
+    mock_elasticsearch(filename_mock="dataset_search.json")
+    es_client = ElasticsearchSingleton().client
+    first_page = es_client.search.return_value | {"pit_id": "pit_2"}
+    last_page = first_page | {"pit_id": "pit_3", "hits": {"total": {"value": 1}, "hits": []}}
+    es_client.search = Mock(side_effect=[first_page, last_page])
+    es_client.open_point_in_time = Mock(return_value={"id": "pit_1"})
+    es_client.close_point_in_time = Mock()
+
+    params = {"search_query": "description", "limit": 1, "cursor": "*"}
+    response = client.get("/search/datasets/v1", params=params)
+    assert response.status_code == 200, response.json()
+    assert [r["identifier"] for r in response.json()["resources"]] == [1]
+    assert es_client.search.call_args.kwargs["pit"]["id"] == "pit_1"
+    assert es_client.search.call_args.kwargs["search_after"] is None
+    next_cursor = response.json()["next_cursor"]
+
+    params = {"search_query": "description", "limit": 1, "cursor": next_cursor}
+    response = client.get("/search/datasets/v1", params=params)
+    assert response.status_code == 200, response.json()
+    assert response.json()["resources"] == []
+    assert response.json()["next_cursor"] is None
+    assert es_client.search.call_args.kwargs["pit"]["id"] == "pit_2"
+    assert es_client.search.call_args.kwargs["search_after"] == [1]
+    es_client.close_point_in_time.assert_called_once_with(id="pit_3")
+
+
+@pytest.mark.parametrize(
+    "params,detail",
+    [
+        ({"cursor": "invalid"}, "Invalid cursor."),
+        ({"cursor": "*", "offset": 10}, "The offset cannot be used together with a cursor."),
+        (
+            {"offset": 9_999, "limit": 2},
+            "The offset plus limit cannot exceed 10000. Use the cursor to page through more "
+            "results.",
+        ),
+    ],
+)
+def test_search_bad_pagination(client: TestClient, params: dict, detail: str):
+    mock_elasticsearch(filename_mock="dataset_search.json")
+    response = client.get("/search/datasets/v1", params={"search_query": "description"} | params)
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == detail
+
+
+def test_search_facets(client: TestClient):
+    mock_elasticsearch(filename_mock="dataset_search.json")
+    es_client = ElasticsearchSingleton().client
+    es_client.search.return_value["aggregations"] = {
+        "platform": {"buckets": [{"key": "zenodo", "doc_count": 3}]},
+        "license": {"buckets": [{"key": "cc0", "doc_count": 2}, {"key": "mit", "doc_count": 1}]},
+    }
+    (hit,) = es_client.search.return_value["hits"]["hits"]
+    hit["_source"] |= {"keyword": ["facet"], "license": "cc0"}  # Only indexed for the facets
+
+    params = {"search_query": "description", "facets": ["platform", "license"]}
+    response = client.get("/search/datasets/v1", params=params)
+    assert response.status_code == 200, response.json()
+    assert response.json()["facets"] == {
+        "platform": [{"value": "zenodo", "count": 3}],
+        "license": [{"value": "cc0", "count": 2}, {"value": "mit", "count": 1}],
+    }
+    aggregations = es_client.search.call_args.kwargs["aggregations"]
+    assert aggregations["platform"] == {"terms": {"field": "platform.keyword", "size": 25}}
+    assert aggregations["license"] == {"terms": {"field": "license", "size": 25}}
+    (resource,) = response.json()["resources"]
+    assert resource["keyword"] == [] and resource["license"] is None, "Not returned"
+
+    response = client.get("/search/datasets/v1", params={"search_query": "description"})
+    assert response.json()["facets"] is None
+    assert es_client.search.call_args.kwargs["aggregations"] is None
+
+
+def test_search_facets_not_available(client: TestClient):
+    mock_elasticsearch(filename_mock="event_search.json")
+    params = {"search_query": "description", "facets": ["license"]}
+    response = client.get("/search/events/v1", params=params)
+    assert response.status_code == 422, response.json()
+
+
+def test_search_get_all_order_and_cache(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    for i in range(3):
+        body = copy.deepcopy(body_asset) | {"platform_resource_identifier": str(i)}
+        response = client.post("/datasets/v1", json=body, headers=headers)
+        assert response.status_code == 200, response.json()
+    mock_elasticsearch(filename_mock="dataset_search.json")
+    es_client = ElasticsearchSingleton().client
+    (hit,) = es_client.search.return_value["hits"]["hits"]
+    es_client.search.return_value["hits"]["hits"] = [
+        hit | {"_source": hit["_source"] | {"identifier": i}} for i in (3, 1, 2)
+    ]
+    params = {"search_query": "description", "get_all": True}
+
+    response = client.get("/search/datasets/v1", params=params)
+    assert response.status_code == 200, response.json()
+    assert [r["identifier"] for r in response.json()["resources"]] == [3, 1, 2], "Hit order"
+
+    with count_queries(engine) as statements:
+        response = client.get("/search/datasets/v1", params=params)
+    assert [r["identifier"] for r in response.json()["resources"]] == [3, 1, 2]
+    assert len(statements) == 1, "Only the versions are queried, the read models are cached"
+
+    body = copy.deepcopy(body_asset) | {"platform_resource_identifier": "0", "name": "new"}
+    response = client.put("/datasets/v1/1", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    response = client.get("/search/datasets/v1", params=params)
+    assert [r["name"] for r in response.json()["resources"]] == ["The name", "new", "The name"]
+
+
+def test_search_get_all_cache_inverse_relation(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    response = client.post("/datasets/v1", json=body_asset, headers=headers)
+    assert response.status_code == 200, response.json()
+    mock_elasticsearch(filename_mock="dataset_search.json")
+    params = {"search_query": "description", "get_all": True}
+    response = client.get("/search/datasets/v1", params=params)
+    assert response.json()["resources"][0]["has_part"] == []
+
+    parent = client.get("/datasets/v1/1").json()["ai_resource_identifier"]
+    body = copy.deepcopy(body_asset) | {"platform_resource_identifier": "2", "is_part_of": [parent]}
+    response = client.post("/datasets/v1", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    child = client.get("/datasets/v1/2").json()["ai_resource_identifier"]
+    response = client.get("/search/datasets/v1", params=params)
+    assert response.json()["resources"][0]["has_part"] == [child]
+
+    body["is_part_of"] = []
+    response = client.put("/datasets/v1/2", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+
+
+def test_read_model_cache_expiry(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(search_router.time, "monotonic", lambda: now)
+    cache = search_router.ReadModelCache(max_size=10, max_age=60)
+    key = ("dataset", 1, datetime.datetime(2024, 1, 1))
+    read_model = Mock()
+    cache.put(key, read_model)
+    assert cache.get(key) is read_model
+    now += 60
+    assert cache.get(key) is None
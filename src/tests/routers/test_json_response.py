@@ -0,0 +1,64 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from pydantic import BaseModel
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from routers import json_response
+from routers.json_response import to_jsonable
+from tests.routers.search_routers.test_search_routers import mock_elasticsearch
+
+
+class Base(BaseModel):
+    name: str
+    note: str | None = None
+
+
+class Extended(Base):
+    identifier: int
+
+
+class Parent(BaseModel):
+    children: list[Base]
+
+
+def test_to_jsonable_declared_types():
+    parent = Parent(children=[Extended(name="child", identifier=1)])
+    assert to_jsonable(parent, exclude_none=True) == {"children": [{"name": "child"}]}
+    assert to_jsonable(parent, declared_types=False) == {
+        "children": [{"name": "child", "note": None, "identifier": 1}]
+    }
+
+
+@pytest.fixture
+def datasets(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.introspect = mocked_privileged_token
+    for i in range(2):
+        body = copy.deepcopy(body_asset) | {"platform_resource_identifier": str(i)}
+        response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+    response = client.post(
+        "/events/v1", json={"name": "A name."}, headers={"Authorization": "Fake token"}
+    )
+    assert response.status_code == 200, response.json()
+
+
+@pytest.mark.parametrize(
+    "path,params",
+    [
+        ("/datasets/v1/1", {}),
+        ("/datasets/v1", {}),
+        ("/datasets/v1/1", {"schema": "schema.org"}),
+        ("/search/events/v1", {"search_query": "description", "get_all": True}),
+    ],
+)
+def test_same_as_response_model(client: TestClient, datasets, monkeypatch, path, params):
+    mock_elasticsearch(filename_mock="event_search.json")
+    default = client.get(path, params=params)
+    monkeypatch.setattr(json_response, "FAST_JSON_ENABLED", True)
+    fast = client.get(path, params=params)
+    assert fast.status_code == default.status_code == 200, fast.json()
+    assert fast.json() == default.json()
+    assert fast.headers.get("ETag") == default.headers.get("ETag")
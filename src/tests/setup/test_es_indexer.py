@@ -0,0 +1,124 @@
+import copy
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.outbox import search_index_outbox
+from database.outbox.search_index_outbox import SearchIndexEvent
+from database.session import DbSession
+from routers.search_routers import SearchRouterDatasets
+from setup.es_indexer.indexer import Indexer, OutboxConsumer
+from tests.testutils.fake_elasticsearch import FakeElasticsearch
+
+
+@pytest.fixture
+def datasets(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.introspect = mocked_privileged_token
+    for i in range(5):
+        body = copy.deepcopy(body_asset)
+        body["platform_resource_identifier"] = str(i)
+        body["issn"] = "20493630"
+        response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+
+
+def test_indexer(client: TestClient, engine: Engine, datasets, body_asset: dict):
+    es_client, state = FakeElasticsearch(), {}
+    indexer = Indexer(es_client, [SearchRouterDatasets()], state, batch_size=2)  # type: ignore
+    with DbSession() as session:
+        assert indexer.run_once(session) == 5
+    assert len(es_client.requests) == 3, "5 documents in batches of 2"
+    assert set(es_client.documents) == {f"dataset_{i}" for i in range(1, 6)}
+    document = es_client.documents["dataset_1"]
+    assert document["name"] == "The name"
+    assert document["platform"] == "example"
+    assert document["description_plain"] == "A description."
+    assert document["issn"] == "20493630"
+    assert document["keyword"] == ["tag1", "tag2"]
+    assert document["license"] == "https://creativecommons.org/licenses/by/4.0/"
+    assert datetime.fromisoformat(document["date_modified"])
+    assert state["dataset"]["date_modified"][1] == 5
+
+    with DbSession() as session:
+        assert indexer.run_once(session) == 0, "Nothing changed"
+
+    body = copy.deepcopy(body_asset) | {"name": "Another name"}
+    response = client.put("/datasets/v1/2", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    response = client.delete("/datasets/v1/3", headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    es_client.requests.clear()
+    with DbSession() as session:
+        assert indexer.run_once(session) == 2
+    assert [list(operations[0]) for operations in es_client.requests] == [["index"], ["delete"]]
+    assert es_client.documents["dataset_2"]["name"] == "Another name"
+    assert "dataset_3" not in es_client.documents
+
+
+def test_indexer_failure(client: TestClient, engine: Engine, datasets):
+    es_client = Mock()
+    es_client.bulk.return_value = {
+        "errors": True,
+        "items": [{"index": {"status": 429, "error": {"type": "es_rejected_execution_exception"}}}],
+    }
+    state: dict = {}
+    indexer = Indexer(es_client, [SearchRouterDatasets()], state=state, batch_size=2)
+    with DbSession() as session:
+        with pytest.raises(RuntimeError):
+            indexer.run_once(session)
+    assert "date_modified" not in state["dataset"], "The high-water mark should not advance"
+
+
+def test_outbox_consumer(
+    client: TestClient,
+    engine: Engine,
+    monkeypatch,
+    mocked_privileged_token: Mock,
+    body_asset: dict,
+):
+    monkeypatch.setattr(search_index_outbox, "OUTBOX_ENABLED", True)
+    keycloak_openid.introspect = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    for i in range(3):
+        body = copy.deepcopy(body_asset) | {"platform_resource_identifier": str(i)}
+        response = client.post("/datasets/v1", json=body, headers=headers)
+        assert response.status_code == 200, response.json()
+    es_client = FakeElasticsearch()
+    consumer = OutboxConsumer(es_client, [SearchRouterDatasets()], batch_size=2)  # type: ignore
+    with DbSession() as session:
+        assert consumer.run_once(session) == 3
+        assert consumer.run_once(session) == 0, "The outbox is drained"
+    assert set(es_client.documents) == {"dataset_1", "dataset_2", "dataset_3"}
+
+    body = copy.deepcopy(body_asset) | {"platform_resource_identifier": "0", "keyword": ["tag3"]}
+    response = client.put("/datasets/v1/1", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    response = client.delete("/datasets/v1/2", headers=headers)
+    assert response.status_code == 200, response.json()
+    response = client.post("/persons/v1", json={"name": "Jane"}, headers=headers)
+    assert response.status_code == 200, response.json()
+    es_client.requests.clear()
+    with DbSession() as session:
+        assert consumer.run_once(session) == 2
+    assert [list(operations[0]) for operations in es_client.requests] == [["index"], ["delete"]]
+    assert set(es_client.documents) == {"dataset_1", "dataset_3"}
+    assert es_client.documents["dataset_1"]["keyword"] == ["tag3"]
+
+
+def test_outbox_consumer_failure(client: TestClient, engine: Engine, monkeypatch, datasets):
+    monkeypatch.setattr(search_index_outbox, "OUTBOX_ENABLED", True)
+    response = client.delete("/datasets/v1/1", headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    es_client = Mock()
+    es_client.bulk.side_effect = ConnectionError()
+    consumer = OutboxConsumer(es_client, [SearchRouterDatasets()])
+    with DbSession() as session:
+        with pytest.raises(ConnectionError):
+            consumer.run_once(session)
+    with DbSession() as session:
+        assert len(session.scalars(select(SearchIndexEvent)).all()) == 1, "Not consumed"
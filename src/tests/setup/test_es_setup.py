@@ -0,0 +1,40 @@
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.engine import Engine
+
+from routers.search_routers import router_list
+from setup.es_setup import generate_elasticsearch_indices
+from setup.es_setup.definitions import GLOBAL_FIELDS, generate_mapping
+from tests.testutils.fake_elasticsearch import FakeElasticsearch
+
+
+@pytest.fixture
+def es_client(monkeypatch) -> FakeElasticsearch:
+    es_client = FakeElasticsearch()
+    singleton = Mock(return_value=Mock(client=es_client))
+    monkeypatch.setattr(generate_elasticsearch_indices, "ElasticsearchSingleton", singleton)
+    return es_client
+
+
+def test_generate_indices(engine: Engine, es_client: FakeElasticsearch):
+    generate_elasticsearch_indices.main()
+    assert es_client.aliases == {router.es_index: f"{router.es_index}_v1" for router in router_list}
+
+    generate_elasticsearch_indices.main()
+    assert set(es_client.index_documents) == set(es_client.aliases.values()), "Left untouched"
+
+
+def test_generate_indices_outdated_mapping(engine: Engine, es_client: FakeElasticsearch):
+    for router in router_list:
+        mapping = generate_mapping(router.indexed_fields ^ GLOBAL_FIELDS)["mappings"]
+        if router.es_index == "dataset":
+            del mapping["properties"]["keyword"]  # Created before the facets
+        es_client.indices.create(
+            index=f"{router.es_index}_v1", mappings=mapping, aliases={router.es_index: {}}
+        )
+
+    generate_elasticsearch_indices.main()
+    assert es_client.aliases["dataset"] == "dataset_v2"
+    assert es_client.mappings["dataset_v2"]["properties"]["keyword"] == {"type": "keyword"}
+    assert es_client.aliases["event"] == "event_v1"
@@ -0,0 +1,62 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.session import DbSession
+from routers.search_routers import SearchRouterDatasets
+from setup.es_indexer.reindex import reindex
+from tests.testutils.fake_elasticsearch import FakeElasticsearch
+
+
+@pytest.fixture
+def datasets(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.introspect = mocked_privileged_token
+    for i in range(3):
+        body = copy.deepcopy(body_asset) | {"platform_resource_identifier": str(i)}
+        response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+
+
+def test_reindex_unversioned_index(client: TestClient, engine: Engine, datasets):
+    es_client = FakeElasticsearch()
+    es_client.indices.create(index="dataset", mappings={})  # Created before versioning
+
+    with DbSession() as session:
+        assert reindex(es_client, session, SearchRouterDatasets()) == "dataset_v1"  # type: ignore
+
+    assert es_client.aliases == {"dataset": "dataset_v1"}
+    assert set(es_client.index_documents) == {"dataset_v1"}, "The old index is removed"
+    assert set(es_client.documents) == {"dataset_1", "dataset_2", "dataset_3"}
+    assert es_client.settings["dataset_v1"] == {"number_of_replicas": "1"}
+
+
+def test_reindex_alias(client: TestClient, engine: Engine, datasets, body_asset: dict):
+    es_client = FakeElasticsearch()
+    es_client.indices.create(index="dataset_v1", mappings={}, aliases={"dataset": {}})
+    es_client.indices.put_settings(index="dataset_v1", settings={"number_of_replicas": "2"})
+
+    def change_during_load(index: str, settings: dict):
+        assert es_client.aliases == {"dataset": "dataset_v1"}, "Still searching the old index"
+        assert settings["refresh_interval"] is None, "Called when the load is complete"
+        assert es_client.settings[index] == {"number_of_replicas": 0, "refresh_interval": "-1"}
+        body = copy.deepcopy(body_asset) | {"platform_resource_identifier": "0", "name": "new"}
+        response = client.put("/datasets/v1/1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+        response = client.delete("/datasets/v1/2", headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+        put_settings(index=index, settings=settings)
+
+    put_settings = es_client.indices.put_settings
+    es_client.indices.put_settings = change_during_load  # type: ignore
+    with DbSession() as session:
+        assert reindex(es_client, session, SearchRouterDatasets()) == "dataset_v2"  # type: ignore
+
+    assert es_client.aliases == {"dataset": "dataset_v2"}
+    assert set(es_client.index_documents) == {"dataset_v2"}
+    assert set(es_client.documents) == {"dataset_1", "dataset_3"}
+    assert es_client.documents["dataset_1"]["name"] == "new"
+    assert es_client.settings["dataset_v2"] == {"number_of_replicas": "2"}
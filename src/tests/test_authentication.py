@@ -1,15 +1,29 @@
 """Unittests for the behaviour of get_user_or_raise()."""
 
 import inspect
+import threading
+import time
 from unittest.mock import Mock
 
 import pytest
 from fastapi import HTTPException
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
 from keycloak import KeycloakError
 from starlette import status
 
 
-from authentication import get_user_or_raise, keycloak_openid, User
+from authentication import (
+    get_user_or_raise,
+    get_user_or_none,
+    jwks_verifier,
+    keycloak_openid,
+    User,
+    token_cache,
+    TokenCache,
+)
+from config import KEYCLOAK_CONFIG
 from tests.testutils.mock_keycloak import MockedKeycloak, TestUserType
 
 
@@ -86,3 +100,139 @@ async def test_keycloak_error():
         await get_user_or_raise(token="Bearer mocked")
     assert exception_info.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert exception_info.value.detail == "Invalid authentication token"
+
+
+@pytest.mark.asyncio
+async def test_token_cache():
+    userinfo = {"active": True, "username": "user", "realm_access": {"roles": ["role"]}}
+    keycloak_openid.introspect = Mock(return_value=userinfo)
+    for _ in range(3):
+        user = await get_user_or_raise(token="Bearer mocked")
+        assert user == User(name="user", roles={"role"})
+    assert keycloak_openid.introspect.call_count == 1
+    assert (token_cache.hits, token_cache.misses) == (2, 1)
+
+    await get_user_or_raise(token="Bearer another")
+    assert keycloak_openid.introspect.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_token_cache_capped_at_expiry():
+    userinfo = {"active": True, "username": "user", "exp": time.time() - 1}
+    keycloak_openid.introspect = Mock(return_value=userinfo)
+    await get_user_or_raise(token="Bearer mocked")
+    await get_user_or_raise(token="Bearer mocked")
+    assert keycloak_openid.introspect.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_token_cache_inactive_user():
+    keycloak_openid.introspect = Mock(return_value={"active": False})
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exception_info:
+            await get_user_or_raise(token="Bearer mocked")
+        assert exception_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+    assert keycloak_openid.introspect.call_count == 1
+
+
+def test_token_cache_lru():
+    cache = TokenCache(max_size=2, ttl=60, negative_ttl=10)
+    user = User(name="user", roles=set())
+    cache.put("1", user)
+    cache.put("2", None)
+    assert cache.get("1") == user
+    cache.put("3", user)
+    assert cache.get("1") == user
+    assert cache.get("3") == user
+    with pytest.raises(KeyError):
+        cache.get("2")
+
+
+def _key_pair(key_id: str) -> tuple[str, dict]:
+    """A private key in PEM format and the corresponding public JWK, as keycloak would return."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    public_jwk = jwk.construct(public_pem, algorithm="RS256").to_dict()
+    return private_pem, {**public_jwk, "kid": key_id, "use": "sig"}
+
+
+def _token(private_pem: str, key_id: str, expires_in: float = 300, **claims) -> str:
+    claims = {
+        "preferred_username": "user",
+        "realm_access": {"roles": ["edit_aiod_resources"]},
+        "exp": int(time.time() + expires_in),
+        "iss": jwks_verifier.issuer,
+        "aud": ["account", jwks_verifier.audience],
+        "typ": "Bearer",
+    } | claims
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": key_id})
+
+
+@pytest.fixture
+def offline_verification(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setitem(KEYCLOAK_CONFIG, "token_verification", "offline")
+    jwks_verifier.clear()
+    keycloak_openid.introspect = Mock(side_effect=AssertionError("No introspection expected"))
+    yield
+    jwks_verifier.clear()
+
+
+@pytest.mark.asyncio
+async def test_offline_verification(offline_verification):
+    private_pem, public_jwk = _key_pair("key1")
+
+    def certs():
+        assert threading.current_thread() is not threading.main_thread(), "Blocking request"
+        return {"keys": [public_jwk]}
+
+    keycloak_openid.certs = Mock(side_effect=certs)
+    for _ in range(2):
+        user = await get_user_or_raise(token="Bearer " + _token(private_pem, "key1"))
+        assert user == User(name="user", roles={"edit_aiod_resources"})
+    assert keycloak_openid.certs.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_offline_verification_key_rotation(
+    offline_verification, monkeypatch: pytest.MonkeyPatch
+):
+    private_pem_1, public_jwk_1 = _key_pair("key1")
+    private_pem_2, public_jwk_2 = _key_pair("key2")
+    keycloak_openid.certs = Mock(return_value={"keys": [public_jwk_1]})
+    await get_user_or_raise(token="Bearer " + _token(private_pem_1, "key1"))
+
+    keycloak_openid.certs = Mock(return_value={"keys": [public_jwk_1, public_jwk_2]})
+    monkeypatch.setattr(jwks_verifier, "min_seconds_between_fetches", 0)
+    user = await get_user_or_raise(token="Bearer " + _token(private_pem_2, "key2"))
+    assert user.name == "user"
+    assert keycloak_openid.certs.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_offline_verification_invalid_token(offline_verification):
+    private_pem, public_jwk = _key_pair("key1")
+    other_private_pem, _ = _key_pair("key1")
+    keycloak_openid.certs = Mock(return_value={"keys": [public_jwk]})
+    for token in (
+        _token(other_private_pem, "key1"),
+        _token(private_pem, "key1", expires_in=-10),
+        _token(private_pem, "unknown_key"),
+        _token(private_pem, "key1", iss="https://example.com/realms/other"),
+        _token(private_pem, "key1", aud="another-client"),
+        _token(private_pem, "key1", aud=None),
+        _token(private_pem, "key1", typ="ID"),
+        _token(private_pem, "key1", typ="Refresh"),
+        _token(private_pem, "key1", typ=None),
+        "not a token",
+    ):
+        assert await get_user_or_none(token="Bearer " + token) is None
+        with pytest.raises(HTTPException) as exception_info:
+            await get_user_or_raise(token="Bearer " + token)
+        assert exception_info.value.status_code == status.HTTP_401_UNAUTHORIZED
@@ -8,6 +8,7 @@ from fastapi import FastAPI
 from pytest_asyncio.plugin import SubRequest
 from sqlalchemy import event
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import create_engine, SQLModel, Session, select
 from starlette.testclient import TestClient
 
@@ -15,8 +16,10 @@ from database.deletion.triggers import add_delete_triggers
 from database.model.concept.concept import AIoDConcept
 from database.model.platform.platform import Platform
 from database.model.platform.platform_names import PlatformName
-from database.session import EngineSingleton
+from database.model.platform.platform_registry import platform_registry
+from database.session import AsyncEngineSingleton, EngineSingleton
 from main import add_routes
+from routers.search_router import read_model_cache
 from tests.testutils.test_resource import RouterTestResource, factory
 
 
@@ -30,12 +33,14 @@ def deletion_triggers() -> Type[AIoDConcept]:
 @pytest.fixture(scope="session")
 def engine(deletion_triggers) -> Iterator[Engine]:
     """
-    Create a SqlAlchemy engine for tests, backed by a temporary sqlite file.
+    Create a SqlAlchemy engine for tests, backed by a temporary sqlite file. The async engine,
+    used by the read endpoints, is backed by the same file.
     """
     temporary_file = tempfile.NamedTemporaryFile()
     engine = create_engine(f"sqlite:///{temporary_file.name}?check_same_thread=False")
     AIoDConcept.metadata.create_all(engine)
     EngineSingleton().patch(engine)
+    AsyncEngineSingleton().patch(create_async_engine(f"sqlite+aiosqlite:///{temporary_file.name}"))
 
     # Yielding is essential, the temporary file will be closed after the engine is used
     yield engine
@@ -77,6 +82,8 @@ def clear_db(request, engine: Engine):
         for table in reversed(SQLModel.metadata.sorted_tables):
             connection.execute(table.delete())
         transaction.commit()
+    platform_registry.invalidate()  # The platforms were deleted without using the ORM
+    read_model_cache.clear()
 
 
 @event.listens_for(Engine, "connect")
@@ -0,0 +1,107 @@
+import fnmatch
+
+
+class FakeElasticsearch:
+    """
+    Keeps the documents in memory, and records the _bulk requests. Supports the management of
+    indices and aliases as used by the es-indexer.
+    """
+
+    def __init__(self):
+        self.index_documents: dict[str, dict[str, dict]] = {}
+        self.aliases: dict[str, str] = {}
+        self.settings: dict[str, dict] = {}
+        self.mappings: dict[str, dict] = {}
+        self.requests: list[list[dict]] = []
+        self.indices = FakeIndicesClient(self)
+
+    @property
+    def documents(self) -> dict[str, dict]:
+        """All documents, of all indices"""
+        return {
+            id_: document
+            for documents in self.index_documents.values()
+            for id_, document in documents.items()
+        }
+
+    def resolve(self, name: str) -> str:
+        return self.aliases.get(name, name)
+
+    def bulk(self, operations: list[dict]) -> dict:
+        self.requests.append(operations)
+        items = []
+        operations_iter = iter(operations)
+        for operation in operations_iter:
+            ((action, metadata),) = operation.items()
+            documents = self.index_documents.setdefault(self.resolve(metadata["_index"]), {})
+            if action == "index":
+                documents[metadata["_id"]] = next(operations_iter)
+                items.append({action: {"_id": metadata["_id"], "status": 200}})
+            elif metadata["_id"] in documents:
+                del documents[metadata["_id"]]
+                items.append({action: {"_id": metadata["_id"], "status": 200}})
+            else:
+                error = {"type": "not_found"}
+                items.append({action: {"_id": metadata["_id"], "status": 404, "error": error}})
+        return {"errors": any("error" in item[action] for item in items), "items": items}
+
+
+class FakeIndicesClient:
+    def __init__(self, es: FakeElasticsearch):
+        self.es = es
+
+    def exists(self, index: str) -> bool:
+        return index in self.es.aliases or index in self.es.index_documents
+
+    def exists_alias(self, name: str) -> bool:
+        return name in self.es.aliases
+
+    def get(self, index: str) -> dict:
+        return {
+            name: {"settings": self.es.settings.get(name, {})}
+            for name in self.es.index_documents
+            if fnmatch.fnmatch(name, index)
+        }
+
+    def get_alias(self, name: str) -> dict:
+        return {self.es.aliases[name]: {"aliases": {name: {}}}}
+
+    def get_settings(self, index: str, name: str) -> dict:
+        settings = {"number_of_replicas": "1"} | self.es.settings.get(index, {})
+        return {index: {"settings": {"index": settings}}}
+
+    def get_mapping(self, index: str) -> dict:
+        name = self.es.resolve(index)
+        return {name: {"mappings": self.es.mappings.get(name, {})}}
+
+    def create(self, index: str, mappings: dict, settings: dict | None = None, aliases=None):
+        assert not self.exists(index), "resource_already_exists_exception"
+        self.es.index_documents[index] = {}
+        self.es.mappings[index] = mappings
+        self.es.settings[index] = dict(settings or {})
+        for alias in aliases or {}:
+            self.es.aliases[alias] = index
+
+    def put_settings(self, index: str, settings: dict):
+        for key, value in settings.items():
+            if value is None:
+                self.es.settings.setdefault(index, {}).pop(key, None)
+            else:
+                self.es.settings.setdefault(index, {})[key] = value
+
+    def refresh(self, index: str):
+        pass
+
+    def update_aliases(self, actions: list[dict]):
+        for action in actions:
+            ((type_, arguments),) = action.items()
+            if type_ == "remove_index":
+                del self.es.index_documents[arguments["index"]]
+                self.es.settings.pop(arguments["index"], None)
+                self.es.mappings.pop(arguments["index"], None)
+                for alias, index in list(self.es.aliases.items()):
+                    if index == arguments["index"]:
+                        del self.es.aliases[alias]
+            elif type_ == "add":
+                assert arguments["alias"] not in self.es.index_documents, "invalid_alias_name"
+                self.es.aliases[arguments["alias"]] = arguments["index"]